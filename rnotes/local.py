@@ -0,0 +1,371 @@
+"""This module implements the query of the data from a local clone of the repository"""
+from __future__ import annotations
+import json
+import logging
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+from functools import cached_property
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Iterator, Optional
+
+sys.path.insert(0, ".")
+from rnotes.query import GithubPullRequest, GithubRepository, PullRequestStore
+
+
+__docformat__ = "google"
+
+
+MERGE_COMMIT_REGEX = re.compile(r"^Merge pull request #(?P<number>\d+) from \S+")
+"Subject of a merge commit of a pull request"
+SQUASH_COMMIT_REGEX = re.compile(r"^(?P<title>.*) \(#(?P<number>\d+)\)$")
+"Subject of a squash (or rebase) commit of a pull request"
+REMOTE_URL_REGEX = re.compile(r"^(?:\w+://)?(?:[^@/]+@)?(?P<host>[^:/]+)[:/](?P<name>[^/]+/[^/]+?)(?:\.git)?/?$")
+"URL of a remote (https or ssh)"
+
+
+class LocalRepository:
+    """Query the pull requests from a local clone of the repository (same interface as GithubRepository).
+
+    The range of the tags is resolved with git, and the pull requests are found by their merge commits or squash commits.
+    The bodies of the pull requests are read from a local store or an exported snapshot, and only the missing bodies
+    are fetched from GitHub.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        store: PullRequestStore = None,
+        snapshot_path: str | Path = None,
+        github_repository: Callable[[], GithubRepository] = None,
+        pull_request_filter: Callable[[GithubPullRequest], bool] = None,
+    ) -> None:
+        """
+        Args:
+            path (str | Path): path of the local clone.
+            store (PullRequestStore, optional): local store of the pull requests. Defaults to None.
+            snapshot_path (str | Path, optional): exported snapshot of the pull requests (.json), as a list of objects
+                with the keys: "number", "title", "url" (or "html_url"), "author" (or "user.login") and "body". Defaults to None.
+            github_repository (Callable[[], GithubRepository], optional): function that returns the GithubRepository, that
+                is called once, only if there are missing bodies (the GithubRepository is closed with this instance).
+                Defaults to None (missing bodies stay empty).
+            pull_request_filter (Callable[[GithubPullRequest], bool], optional): filter of the pull requests by their
+                metadata (title, author, number, merge time). It's applied after the GitHub's metadata is filled (with
+                the bodies), so the authors are GitHub logins as in GithubRepository (the git names of the authors are
+                kept only for the pull requests that were not found). Defaults to None (all).
+        """
+        self._path = Path(path)
+        self._store = store
+        self._snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._github_repository = github_repository
+        self._pull_request_filter = pull_request_filter
+        self._tmp_dir: Optional[TemporaryDirectory] = None
+        self._github: Optional[GithubRepository] = None
+
+    def __enter__(self) -> LocalRepository:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the GithubRepository of the missing bodies, if it was created, and remove the temp directory of the copied
+        files (same interface as GithubRepository)."""
+        if self._github is not None:
+            self._github.close()
+            self._github = None
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+    def get_github_repository(self) -> GithubRepository:
+        """
+        Returns:
+            GithubRepository: the GithubRepository of the missing bodies (created on the first call).
+        """
+        self._github = self._github or self._github_repository()
+        return self._github
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns:
+            Path: path of the local clone.
+        """
+        return self._path
+
+    def git(self, *args: str) -> str:
+        """Run a git command in the local clone.
+
+        Args:
+            *args (str): the arguments of the git command.
+
+        Returns:
+            str: the output of the command.
+        """
+        return subprocess.run(
+            ["git", "-C", str(self._path), *args], check=True, capture_output=True, text=True
+        ).stdout
+
+    @cached_property
+    def pull_request_url(self) -> str:
+        """
+        Returns:
+            str: URL prefix of the pull requests (based on the "origin" remote).
+        """
+        remote = self.git("remote", "get-url", "origin").strip()
+        match = REMOTE_URL_REGEX.match(remote)
+        assert match, f"Failed to parse the URL of the remote 'origin': '{remote}'"
+        return f"https://{match['host']}/{match['name']}/pull/"
+
+    @cached_property
+    def snapshot(self) -> dict[int, GithubPullRequest]:
+        """
+        Returns:
+            dict[int, GithubPullRequest]: the pull requests of the exported snapshot, by number.
+        """
+        if self._snapshot_path is None:
+            return {}
+        logging.info("Loading the pull requests snapshot from: %s", self._snapshot_path.resolve())
+        return {
+            item["number"]: GithubPullRequest(
+                name=item["title"],
+                url=item.get("url") or item.get("html_url"),
+                author=item.get("author") or (item.get("user") or {}).get("login"),
+                comment=item["body"],
+                number=item["number"],
+            )
+            for item in json.loads(self._snapshot_path.read_text())
+        }
+
+    def get_commit_sha(self, reference: str) -> str:
+        """
+        Args:
+            reference (str): tag name, branch name or commit sha.
+
+        Returns:
+            str: the sha of the commit of the given reference.
+        """
+        return self.git("rev-parse", "--verify", f"{reference}^{{commit}}").strip()
+
+    def get_merged_pull_requests(self, base: str, head: str) -> list[GithubPullRequest]:
+        """Find the pull requests of the commits between the given 2 references, by their merge/squash commits (without bodies).
+
+        Only the first-parent history of `head` is scanned (the commits of the main line), so commits of merged branches
+        that happen to look like squash commits (for example, cherry-picks with "(#123)" in their subject) are ignored.
+        The author of a merge commit is the one who merged it, so the author of the pull request is taken from the head
+        of the merged branch (the second parent) instead.
+
+        Args:
+            base (str): tag name, branch name or commit sha to start from.
+            head (str): tag name, branch name or commit sha to end at.
+
+        Returns:
+            list[GithubPullRequest]: the pull requests, ordered by the commit time.
+        """
+        log = self.git("log", "--first-parent", "--reverse", "--format=%H%x1f%P%x1f%s%x1f%b%x1f%an%x1f%cI%x1e", f"{base}..{head}")
+        records = [record.strip("\n").split("\x1f") for record in filter(str.strip, log.split("\x1e"))]
+        merged_heads = [
+            parents.split()[1]
+            for _, parents, subject, *_ in records
+            if len(parents.split()) > 1 and MERGE_COMMIT_REGEX.match(subject)
+        ]
+        head_authors = self.get_authors(merged_heads)
+        pull_requests: dict[int, GithubPullRequest] = {}
+        for _, parents, subject, body, author, date in records:
+            if match := MERGE_COMMIT_REGEX.match(subject):
+                title = body.strip().split("\n")[0] if body.strip() else subject
+                author = head_authors.get(parents.split()[-1], author)
+            elif match := SQUASH_COMMIT_REGEX.match(subject):
+                title = match["title"]
+            else:
+                continue
+            number = int(match["number"])
+            merged_at = datetime.fromisoformat(date).astimezone(timezone.utc).replace(tzinfo=None)
+            pull_requests.setdefault(
+                number,
+                GithubPullRequest(
+                    name=title,
+                    url=f"{self.pull_request_url}{number}",
+                    author=author,
+                    comment=None,
+                    number=number,
+                    merged_at=merged_at,
+                ),
+            )
+        logging.info("Found %s pull requests between: '%s'..'%s' (local)", len(pull_requests), base, head)
+        return list(pull_requests.values())
+
+    def get_authors(self, shas: list[str]) -> dict[str, str]:
+        """
+        Args:
+            shas (list[str]): commits sha.
+
+        Returns:
+            dict[str, str]: mapping between the sha to the name of the author of the commit (with a single git command).
+        """
+        if not shas:
+            return {}
+        log = self.git("log", "--no-walk=unsorted", "--format=%H%x1f%an", *shas)
+        return dict(line.split("\x1f", 1) for line in log.splitlines() if line)
+
+    def get_commit_dates(self, shas: list[str]) -> dict[str, datetime]:
+        """
+        Args:
+            shas (list[str]): commits sha.
+
+        Returns:
+            dict[str, datetime]: mapping between the sha to the (author) date of the commit (with a single git command).
+        """
+        if not shas:
+            return {}
+        log = self.git("log", "--no-walk=unsorted", "--format=%H%x1f%aI", *dict.fromkeys(shas))
+        return {
+            sha: datetime.fromisoformat(date).astimezone(timezone.utc).replace(tzinfo=None)
+            for sha, date in (line.split("\x1f", 1) for line in log.splitlines() if line)
+        }
+
+    def fill_bodies(self, pull_requests: list[GithubPullRequest]) -> list[GithubPullRequest]:
+        """Fill the bodies (and the GitHub's metadata) of the given pull requests, from the store, the snapshot or GitHub.
+
+        Args:
+            pull_requests (list[GithubPullRequest]): the pull requests (without bodies).
+
+        Returns:
+            list[GithubPullRequest]: the same pull requests, with the bodies that found.
+        """
+        numbers = [pull_request.number for pull_request in pull_requests]
+        found = self.snapshot | (self._store.get_pull_requests_by_numbers(numbers) if self._store else {})
+        missing = [number for number in numbers if number not in found]
+        if missing and self._github_repository:
+            logging.info("Fetching %s missing pull requests bodies from GitHub", len(missing))
+            for pull_request in self.get_github_repository().get_pull_requests_by_numbers(missing):
+                found[pull_request.number] = pull_request
+                if self._store and pull_request.merged_at:
+                    self._store.add(pull_request, updated_at=pull_request.merged_at)
+        elif missing:
+            logging.warning("Didn't find the bodies of %s pull requests: %s", len(missing), missing)
+        for pull_request in pull_requests:
+            if source := found.get(pull_request.number):
+                pull_request.name = source.name or pull_request.name
+                pull_request.url = source.url or pull_request.url
+                pull_request.author = source.author or pull_request.author
+                pull_request.comment = source.comment
+        return pull_requests
+
+    def select(self, pull_requests: list[GithubPullRequest]) -> list[GithubPullRequest]:
+        """
+        Args:
+            pull_requests (list[GithubPullRequest]): the pull requests (with the GitHub's metadata, see `fill_bodies`).
+
+        Returns:
+            list[GithubPullRequest]: the pull requests that passed the filter of the repository.
+        """
+        if self._pull_request_filter is None:
+            return pull_requests
+        return [pull_request for pull_request in pull_requests if self._pull_request_filter(pull_request)]
+
+    def get_pull_requests(self, from_tag_name: str, to_tag_name: str = None) -> list[GithubPullRequest]:
+        """Get all the pull requests of the commits between the given 2 tags.
+
+        Args:
+            from_tag_name (str): tag to start the query.
+            to_tag_name (str, optional): tag to end the query. Defaults to None (HEAD).
+
+        Returns:
+            list[GithubPullRequest]: List of all the pull requests (GithubPullRequest object) between the 2 tags.
+        """
+        return self.get_pull_requests_by_commit(self.get_commit_sha(from_tag_name), self.get_commit_sha(to_tag_name or "HEAD"))
+
+    def iter_pull_requests(self, from_tag_name: str, to_tag_name: str = None) -> Iterator[GithubPullRequest]:
+        """Same as `get_pull_requests` (the range is resolved locally at once, so there is nothing to stream).
+
+        Args:
+            from_tag_name (str): tag to start the query.
+            to_tag_name (str, optional): tag to end the query. Defaults to None (HEAD).
+
+        Yields:
+            GithubPullRequest: the pull requests between the 2 tags.
+        """
+        yield from self.get_pull_requests(from_tag_name=from_tag_name, to_tag_name=to_tag_name)
+
+    def get_tag_names(self, pattern: str = "*") -> list[str]:
+        """
+        Args:
+            pattern (str, optional): shell-style pattern of the tags names (for example: "v1.*"). Defaults to "*" (all).
+
+        Returns:
+            list[str]: the names of the tags that match the pattern, ordered by the (author) dates of their commits, as in
+                GithubRepository (not by the dates of the annotated tags).
+        """
+        tag_names = self.git("tag", "--list", pattern).split()
+        if not tag_names:
+            return []
+        shas = self.git("rev-parse", *(f"{tag_name}^{{commit}}" for tag_name in tag_names)).split()
+        dates = self.get_commit_dates(shas)
+        return [tag_name for tag_name, _ in sorted(zip(tag_names, shas), key=lambda item: dates[item[1]])]
+
+    def get_pull_requests_by_ranges(self, tag_names: list[str]) -> list[list[GithubPullRequest]]:
+        """Get the pull requests of every range of consecutive tags (for example, [v1, v2, v3]: v1..v2 and v2..v3).
+
+        The ranges are resolved locally, and the bodies of all the ranges are filled at once.
+
+        Args:
+            tag_names (list[str]): the names of the tags, ordered by the dates of their commits.
+
+        Returns:
+            list[list[GithubPullRequest]]: the pull requests of every range (len(tag_names) - 1 ranges).
+        """
+        assert len(tag_names) >= 2, f"At least 2 tags are needed, got: {tag_names}"
+        ranges = [self.get_merged_pull_requests(base=base, head=head) for base, head in zip(tag_names, tag_names[1:])]
+        self.fill_bodies([pull_request for pull_requests in ranges for pull_request in pull_requests])
+        return [self.select(pull_requests) for pull_requests in ranges]
+
+    def get_pull_requests_by_commit(self, commit_sha_from: str, commit_sha_to: str) -> list[GithubPullRequest]:
+        """Get all the pull requests of the commits between the given 2 commits sha.
+
+        Args:
+            commit_sha_from (str): commit to start the query.
+            commit_sha_to (str): commit to end the query.
+
+        Returns:
+            list[GithubPullRequest]: List of all the pull requests (GithubPullRequest object) between the 2 commits.
+        """
+        return self.select(self.fill_bodies(self.get_merged_pull_requests(base=commit_sha_from, head=commit_sha_to)))
+
+    def read_file(self, relative_path: str, reference: str = None) -> Optional[str]:
+        """Read a single file (as in the given reference).
+
+        Args:
+            relative_path (str): path of the file, relative to the top of the repository.
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None ("HEAD").
+
+        Returns:
+            Optional[str]: the content of the file if found, else None.
+        """
+        try:
+            return self.git("show", f"{reference or 'HEAD'}:{relative_path}")
+        except subprocess.CalledProcessError:
+            logging.warning("Didn't find the path for: <top of the repository>/%s", relative_path)
+            return None
+
+    def download_file(self, relative_path: str, reference: str = None) -> Optional[Path]:
+        """Copy a single file (as in the given reference) to a temp directory (that is removed when this instance is
+        closed), and returns the new path.
+
+        Args:
+            relative_path (str): path of the file, relative to the top of the repository.
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None ("HEAD").
+
+        Returns:
+            Optional[Path]: Path object of the file if found, else None.
+        """
+        content = self.read_file(relative_path, reference=reference)
+        if content is None:
+            return None
+        self._tmp_dir = self._tmp_dir or TemporaryDirectory(prefix="rnotes-")
+        new_path = Path(self._tmp_dir.name) / Path(relative_path).name
+        new_path.write_text(content)
+        return new_path
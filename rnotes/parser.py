@@ -1,22 +1,39 @@
 """This module implements the parser of pull requests comments"""
 from __future__ import annotations
+import hashlib
+import json
+import pickle
+import platform
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from parsimonious import ParseError
 from rich.logging import logging
 from functools import cached_property
 from enum import Enum
+from importlib.metadata import version
+from typing import Any, Iterable, Iterator, Optional, Union
 from parsimonious.grammar import Grammar
-from parsimonious.nodes import NodeVisitor
+from parsimonious.expressions import Expression, Literal, Regex, Sequence
+from parsimonious.nodes import Node, NodeVisitor
 import sys
 
 sys.path.insert(0, ".")
-from rnotes.utils import eval_file
+from rnotes.utils import DiskCache, eval_file, get_process_context
 from rnotes.query import GithubPullRequest
 
 
 __docformat__ = "google"
 
 
+HEADING_REGEX = re.compile(r"^[ \t]*#", re.MULTILINE)
+"Markdown heading line (the end of a section of the comment)"
+AUTHOR = "author"
+"Key of the author of the pull request in the comments after parsing (it's not a token of the grammar)"
+PARALLEL_THRESHOLD = 64
+"Minimal number of comments to parse on processes (fewer comments are parsed serially, it's faster than starting processes)"
+
+
 class Tokens(str, Enum):
     """Pre define tokens for the parser"""
 
@@ -31,6 +48,192 @@ class Tokens(str, Enum):
     IMAGE_MD = "image_md"
 
 
+class CachedParseError(ParseError):
+    """ParseError that restored from the cache or from a worker process (with the type and the message of the original
+    error)"""
+
+    def __init__(self, type_name: str, message: str) -> None:
+        """
+        Args:
+            type_name (str): the name of the type of the original error (for example, "IncompleteParseError").
+            message (str): the message of the original error.
+        """
+        super().__init__(text="")
+        self.type_name = type_name
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def get_error_type_name(error: ParseError) -> str:
+    """
+    Args:
+        error (ParseError): the parse error.
+
+    Returns:
+        str: the name of the type of the error (of the original error, if it's a CachedParseError).
+    """
+    return error.type_name if isinstance(error, CachedParseError) else type(error).__name__
+
+
+class ParseCache(DiskCache):
+    """Persistent cache of the results of the parser (the tokens, or the parse error), by the grammar and the comment"""
+
+    @staticmethod
+    def key(grammar_hash: str, comment_text: str) -> str:
+        """
+        Args:
+            grammar_hash (str): hash of the source of the grammar.
+            comment_text (str): the text of the comment (as given to the parser).
+
+        Returns:
+            str: key of the result in the cache.
+        """
+        return f"{grammar_hash}:{hashlib.sha256(comment_text.encode()).hexdigest()}"
+
+    def get_result(self, grammar_hash: str, comment_text: str) -> Optional[Union[dict[str, str], CachedParseError]]:
+        """
+        Args:
+            grammar_hash (str): hash of the source of the grammar.
+            comment_text (str): the text of the comment (as given to the parser).
+
+        Returns:
+            Optional[Union[dict[str, str], CachedParseError]]: the tokens or the parse error, if found, else None.
+        """
+        value = self.get(self.key(grammar_hash, comment_text))
+        if value is None:
+            return None
+        result = json.loads(value)
+        if "error" in result:
+            return CachedParseError(type_name=result["error"], message=result["message"])
+        return result["tokens"]
+
+    def set_result(self, grammar_hash: str, comment_text: str, result: Union[dict[str, str], ParseError]) -> None:
+        """Store the given result of the parser.
+
+        Args:
+            grammar_hash (str): hash of the source of the grammar.
+            comment_text (str): the text of the comment (as given to the parser).
+            result (Union[dict[str, str], ParseError]): the tokens or the parse error.
+        """
+        if isinstance(result, ParseError):
+            value = {"error": get_error_type_name(result), "message": str(result)}
+        else:
+            value = {"tokens": result}
+        self.set(self.key(grammar_hash, comment_text), json.dumps(value).encode())
+
+
+class GrammarCache(DiskCache):
+    """Persistent cache of the loaded grammar files (the compiled grammar and the ordering lists), by the source of the
+    grammar file.
+
+    The values are pickled, so a warm start skips both executing the grammar file and compiling its rules. The cache is
+    a directory of the user (as the grammar file that is executed on a cold start), and an entry that fails to load
+    (for example, of another version of parsimonious) is a miss.
+    """
+
+    @staticmethod
+    def key(source: str) -> str:
+        """
+        Args:
+            source (str): the source of the grammar file.
+
+        Returns:
+            str: key of the grammar in the cache (the compiled grammar depends on the versions of python and parsimonious
+                too).
+        """
+        versions = f"python=={platform.python_version()}:parsimonious=={version('parsimonious')}"
+        return f"{versions}:{hashlib.sha256(source.encode()).hexdigest()}"
+
+    def get_grammar(self, source: str) -> Optional[tuple[Grammar, Optional[list[str]], Optional[list[str]]]]:
+        """
+        Args:
+            source (str): the source of the grammar file.
+
+        Returns:
+            Optional[tuple[Grammar, Optional[list[str]], Optional[list[str]]]]: the grammar, all the topics and all
+                the types (as returned by `load_grammar_file`), if found, else None.
+        """
+        value = self.get(self.key(source))
+        if value is None:
+            return None
+        try:
+            return pickle.loads(value)
+        except Exception as error:  # pylint: disable=broad-except
+            logging.debug("Failed to load the cached grammar (%s), the grammar file is loaded again", error)
+            return None
+
+    def set_grammar(self, source: str, grammar: tuple[Grammar, Optional[list[str]], Optional[list[str]]]) -> None:
+        """Store the given loaded grammar file.
+
+        Args:
+            source (str): the source of the grammar file.
+            grammar (tuple[Grammar, Optional[list[str]], Optional[list[str]]]): the grammar, all the topics and all
+                the types (as returned by `load_grammar_file`).
+        """
+        try:
+            value = pickle.dumps(grammar)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            logging.debug("The ordering lists of the grammar can't be pickled, the grammar is not cached")
+            return
+        self.set(self.key(source), value)
+
+
+class TokenExtractor:
+    """Extract the tokens from a parse tree, by walking only the nodes of the expressions that may contain a token.
+
+    The expressions of the grammar that can't contain a token (for example, the markdown characters and the rest of the
+    comment) are found once, from the rules of the grammar, and their subtrees are skipped.
+    """
+
+    def __init__(self, grammar: Grammar) -> None:
+        """
+        Args:
+            grammar (Grammar): the grammar object.
+        """
+        names = {token.value for token in Tokens}
+        expressions: dict[int, Expression] = {}
+        stack = list(grammar.values())
+        while stack:
+            expression = stack.pop()
+            if id(expression) not in expressions:
+                expressions[id(expression)] = expression
+                stack.extend(getattr(expression, "members", ()))
+        relevant = {id(expression) for expression in expressions.values() if expression.name in names}
+        changed = True
+        while changed:
+            changed = False
+            for expression in expressions.values():
+                if id(expression) not in relevant and any(
+                    id(member) in relevant for member in getattr(expression, "members", ())
+                ):
+                    relevant.add(id(expression))
+                    changed = True
+        self._expressions = expressions
+        self._relevant = relevant
+
+    def extract(self, tree: Node) -> dict[str, str]:
+        """
+        Args:
+            tree (Node): the parse tree of a comment.
+
+        Returns:
+            dict[str, str]: Mapping between the pre define tokens to their values (same as `CommentParser.SyntaxTreeBuilder`).
+        """
+        tokens = {token.value: None for token in Tokens}
+        self._visit(tree, tokens)
+        return tokens
+
+    def _visit(self, node: Node, tokens: dict[str, str]) -> None:
+        """Store the tokens of the given node (the children first, as the NodeVisitor does, so the outer token wins)."""
+        for child in node.children:
+            if id(child.expr) in self._relevant:
+                self._visit(child, tokens)
+        if node.expr_name in tokens:
+            tokens[node.expr_name] = node.text
+
+
 class CommentParser:
     """The parser for the pull requests comment"""
 
@@ -59,12 +262,55 @@ class CommentParser:
                 self.leaf_name_to_value[node.expr_name] = node.text
             return visited_children or node
 
-    def __init__(self, grammar: Grammar) -> None:
+    def __init__(
+        self, grammar: Grammar, cache: ParseCache = None, processes: int = 1, chunk_size: int = 16, window_size: int = None
+    ) -> None:
         """
         Args:
             grammar (Grammar): the grammar object.
+            cache (ParseCache, optional): cache of the results of the parser. Defaults to None (no cache).
+            processes (int, optional): number of processes that parse the comments in `parse_pull_requests` (every
+                process loads the grammar once, and the processes are reused until `close`). Defaults to 1 (serial).
+            chunk_size (int, optional): number of comments that are sent to a process at once. Defaults to 16.
+            window_size (int, optional): If given, only the section of the comment that the grammar cares about is parsed
+                (from the line of the first literal of the grammar, for example "Release notes:", until the next markdown
+                heading line), truncated to this number of characters, so the time and the memory of the parser are
+                bounded regardless of the size of the comment. Defaults to None (the whole comment).
         """
         self._grammar = grammar
+        self._cache = cache
+        self._processes = processes
+        self._chunk_size = chunk_size
+        self._window_size = window_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> CommentParser:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the processes of the parser (if they were started)."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        Returns:
+            ProcessPoolExecutor: the processes of the parser, that are started on the first use and reused by all the
+                calls of `parse_comments` until `close` (every process loads the grammar once).
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes,
+                mp_context=get_process_context(),
+                initializer=_init_worker,
+                initargs=(str(self._grammar),),
+            )
+        return self._executor
 
     @property
     def grammar(self):
@@ -74,56 +320,273 @@ class CommentParser:
         """
         return self._grammar
 
+    @cached_property
+    def extractor(self) -> TokenExtractor:
+        """
+        Returns:
+            TokenExtractor: the extractor of the tokens from the parse trees of the grammar.
+        """
+        return TokenExtractor(self._grammar)
+
+    @cached_property
+    def grammar_hash(self) -> str:
+        """
+        Returns:
+            str: hash of the source of the grammar (all its rules).
+        """
+        return hashlib.sha256(str(self._grammar).encode()).hexdigest()
+
     def parse_comment(self, comment_text: str) -> dict[str, str]:
-        """Parsing a single comment.
+        """Parsing a single comment (or get the result from the cache, if there is one).
 
         Args:
             comment_text (str): the text of the comment.
 
+        Raises:
+            ParseError: if the comment doesn't match the grammar (CachedParseError, if the error is from the cache).
+
         Returns:
             dict[str, str]: Mapping between the pre define token to the value as appears in the comment text.
         """
-        tree = self._grammar.parse(comment_text)
-        builder = CommentParser.SyntaxTreeBuilder()
-        builder.visit(tree)
-        comment = builder.leaf_name_to_value
-        return comment
+        result = self._get_result(comment_text)
+        if isinstance(result, ParseError):
+            raise result
+        return result
 
-    def parse_pull_requests(self, pull_requests: list[GithubPullRequest]) -> list[dict[str, str]]:
-        """Parse all the given pull requests.
+    def _get_result(self, comment_text: str) -> Union[dict[str, str], ParseError]:
+        """Get the result of a single comment from the cache, or parse it (and store the result in the cache).
+
+        Returns:
+            Union[dict[str, str], ParseError]: the tokens, or the parse error.
+        """
+        result = self._cache.get_result(self.grammar_hash, comment_text) if self._cache is not None else None
+        return result if result is not None else self._parse_and_cache(comment_text)
+
+    def _parse_comment(self, comment_text: str) -> dict[str, str]:
+        """Parsing a single comment (without the cache), see `parse_comment`."""
+        return self.extractor.extract(self._grammar.parse(comment_text))
+
+    def _parse_and_cache(self, comment_text: str) -> Union[dict[str, str], ParseError]:
+        """Parsing a single comment, and store the result in the cache (if there is one).
+
+        Returns:
+            Union[dict[str, str], ParseError]: the tokens, or the parse error.
+        """
+        try:
+            result = self._parse_comment(comment_text)
+        except ParseError as error:
+            result = error
+        self._store(comment_text, result)
+        return result
+
+    def _store(self, comment_text: str, result: Union[dict[str, str], ParseError]) -> None:
+        """Store the result of the given comment in the cache (if there is one)."""
+        if self._cache is not None:
+            self._cache.set_result(self.grammar_hash, comment_text, result)
+
+    def parse_comments(self, comments_texts: list[Optional[str]]) -> list[Optional[Union[dict[str, str], ParseError]]]:
+        """Parse the given comments (on processes, if there are enough comments that are not in the cache).
 
         Args:
-            pull_requests (list[GithubPullRequest]): List of GithubPullRequest objects.
+            comments_texts (list[Optional[str]]): the texts of the comments (None for missing comments).
 
         Returns:
-            list[dict[str, str]]: All the comments after parsing (list of the results as defined in the method: `parse_comment`)
+            list[Optional[Union[dict[str, str], ParseError]]]: the tokens or the parse error of every comment, in the
+                order of the given comments (None for missing comments).
         """
-        all_comments: list[dict[str, str]] = []
-        for pull_request in pull_requests:
-            try:
-                if not pull_request.comment:
-                    logging.error(
-                        "Ignored the pull request: '%s' (url: '%s'), \nreason: first comment is empty",
-                        pull_request.name,
-                        pull_request.url,
-                    )
-                    continue
-                comment_text = " ".join(pull_request.comment.split())
-                logging.info("Parsing PR: '%s' (url: '%s')", pull_request.name, pull_request.url)
-                comment = self.parse_comment(comment_text=comment_text)
-                if comment.get(Tokens.INCLUDE, "").lower() == "no":
-                    logging.info("Ignored (as expected) the pull request: '%s' (url: '%s')", pull_request.name, pull_request.url)
-                    continue
-                all_comments.append(comment)
-            except ParseError as error:
-                logging.error(
-                    "Failed to parse the pull request: '%s' (url: '%s'), \nreason: %s: \"%s\"",
+        results: list[Optional[Union[dict[str, str], ParseError]]] = [None] * len(comments_texts)
+        indexes: list[int] = []
+        for index, comment_text in enumerate(comments_texts):
+            if comment_text is None:
+                continue
+            cached = self._cache.get_result(self.grammar_hash, comment_text) if self._cache is not None else None
+            if cached is None:
+                indexes.append(index)
+            else:
+                results[index] = cached
+        if self._processes <= 1 or len(indexes) < PARALLEL_THRESHOLD:
+            for index in indexes:
+                results[index] = self._parse_and_cache(comments_texts[index])
+            return results
+        logging.info("Parsing %s comments on %s processes", len(indexes), self._processes)
+        texts = [comments_texts[index] for index in indexes]
+        for index, result in zip(indexes, self.executor.map(_parse_in_worker, texts, chunksize=self._chunk_size)):
+            if isinstance(result, tuple):
+                result = CachedParseError(*result)
+            self._store(comments_texts[index], result)
+            results[index] = result
+        return results
+
+    @cached_property
+    def section_marker(self) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: the first literal of the default rule of the grammar (the start of the section of the comment
+                that the grammar cares about), or None if the default rule doesn't start with a literal.
+        """
+        expression = self._grammar.default_rule
+        for member in expression.members if isinstance(expression, Sequence) else (expression,):
+            if isinstance(member, Literal) and member.literal:
+                return member.literal
+            if not isinstance(member, Regex):
+                break
+        return None
+
+    def get_window(self, comment: str) -> tuple[str, bool]:
+        """Get the section of the given comment that the grammar cares about (see `window_size`).
+
+        Args:
+            comment (str): the first comment of a pull request.
+
+        Returns:
+            tuple[str, bool]: the section of the comment, and True if it was truncated to `window_size`.
+        """
+        start = comment.find(self.section_marker) if self.section_marker else -1
+        start = comment.rfind("\n", 0, start) + 1 if start > 0 else 0
+        line_end = comment.find("\n", start)
+        match = HEADING_REGEX.search(comment, line_end + 1) if line_end != -1 else None
+        end = match.start() if match else len(comment)
+        if end - start > self._window_size:
+            return comment[start : start + self._window_size], True
+        return comment[start:end], False
+
+    def get_comment_text(self, pull_request: GithubPullRequest) -> Optional[str]:
+        """
+        Args:
+            pull_request (GithubPullRequest): the pull request.
+
+        Returns:
+            Optional[str]: the text of the first comment of the pull request (as given to the parser), or None if empty.
+        """
+        if not pull_request.comment:
+            return None
+        comment = pull_request.comment
+        if self._window_size is not None:
+            comment, truncated = self.get_window(comment)
+            if truncated:
+                logging.warning(
+                    "Truncated the comment of the pull request: '%s' (url: '%s') to %s characters",
                     pull_request.name,
                     pull_request.url,
-                    type(error).__name__,
-                    str(error).replace("\n", ""),
+                    self._window_size,
                 )
-        return all_comments
+        return " ".join(comment.split())
+
+    @staticmethod
+    def _select(
+        pull_request: GithubPullRequest, result: Optional[Union[dict[str, str], ParseError]]
+    ) -> Optional[dict[str, str]]:
+        """Log the result of the given pull request.
+
+        Args:
+            pull_request (GithubPullRequest): the pull request.
+            result (Optional[Union[dict[str, str], ParseError]]): the result of its comment (None if the comment is empty).
+
+        Returns:
+            Optional[dict[str, str]]: the comment after parsing (with the author of the pull request), if the pull request
+                is included, else None.
+        """
+        if result is None:
+            logging.error(
+                "Ignored the pull request: '%s' (url: '%s'), \nreason: first comment is empty",
+                pull_request.name,
+                pull_request.url,
+            )
+            return None
+        logging.info("Parsing PR: '%s' (url: '%s')", pull_request.name, pull_request.url)
+        if isinstance(result, ParseError):
+            logging.error(
+                "Failed to parse the pull request: '%s' (url: '%s'), \nreason: %s: \"%s\"",
+                pull_request.name,
+                pull_request.url,
+                get_error_type_name(result),
+                str(result).replace("\n", ""),
+            )
+            return None
+        if result.get(Tokens.INCLUDE, "").lower() == "no":
+            logging.info("Ignored (as expected) the pull request: '%s' (url: '%s')", pull_request.name, pull_request.url)
+            return None
+        return result | {AUTHOR: pull_request.author}
+
+    def parse_pull_requests(self, pull_requests: list[GithubPullRequest]) -> list[dict[str, str]]:
+        """Parse all the given pull requests (on processes, see `parse_comments`).
+
+        Args:
+            pull_requests (list[GithubPullRequest]): List of GithubPullRequest objects.
+
+        Returns:
+            list[dict[str, str]]: All the comments after parsing (list of the results as defined in the method: `parse_comment`,
+                with the AUTHOR of the pull request)
+        """
+        pull_requests = list(pull_requests)
+        results = self.parse_comments([self.get_comment_text(pull_request) for pull_request in pull_requests])
+        return [
+            comment
+            for pull_request, result in zip(pull_requests, results)
+            if (comment := self._select(pull_request, result)) is not None
+        ]
+
+    def parse_ranges(self, ranges: list[list[GithubPullRequest]]) -> list[list[dict[str, str]]]:
+        """Parse the pull requests of all the given ranges in a single pass (see `parse_pull_requests`), so the comments
+        of all the ranges are spread over the processes at once.
+
+        Args:
+            ranges (list[list[GithubPullRequest]]): the pull requests of every range.
+
+        Returns:
+            list[list[dict[str, str]]]: the comments after parsing of every range (as in `parse_pull_requests`).
+        """
+        ranges = [list(pull_requests) for pull_requests in ranges]
+        results = iter(self.parse_comments([self.get_comment_text(pr) for pull_requests in ranges for pr in pull_requests]))
+        return [
+            [comment for pull_request in pull_requests if (comment := self._select(pull_request, next(results))) is not None]
+            for pull_requests in ranges
+        ]
+
+    def iter_parse_pull_requests(self, pull_requests: Iterable[GithubPullRequest]) -> Iterator[dict[str, str]]:
+        """Parse the given pull requests one by one, as they arrive (streaming version of `parse_pull_requests`).
+
+        Args:
+            pull_requests (Iterable[GithubPullRequest]): GithubPullRequest objects (for example, a generator).
+
+        Yields:
+            dict[str, str]: the comments after parsing (as defined in the method: `parse_comment`, with the AUTHOR of the
+                pull request), of the included pull requests.
+        """
+        for pull_request in pull_requests:
+            comment_text = self.get_comment_text(pull_request)
+            result = self._get_result(comment_text) if comment_text is not None else None
+            if (comment := self._select(pull_request, result)) is not None:
+                yield comment
+
+
+_worker_parser: CommentParser = None
+"The parser of the current worker process (of `CommentParser.parse_comments`)"
+
+
+def _init_worker(grammar_text: str) -> None:
+    """Load the grammar once in the current worker process.
+
+    Args:
+        grammar_text (str): the rules of the grammar.
+    """
+    global _worker_parser
+    _worker_parser = CommentParser(grammar=loads_grammar(grammar_text))
+
+
+def _parse_in_worker(comment_text: str) -> Union[dict[str, str], tuple[str, str]]:
+    """Parse a single comment in the current worker process.
+
+    Args:
+        comment_text (str): the text of the comment.
+
+    Returns:
+        Union[dict[str, str], tuple[str, str]]: the tokens, or the type name and the message of the parse error.
+    """
+    try:
+        return _worker_parser.parse_comment(comment_text)
+    except ParseError as error:
+        return get_error_type_name(error), str(error)
 
 
 def loads_grammar(text: str) -> Grammar:
@@ -138,18 +601,48 @@ def loads_grammar(text: str) -> Grammar:
     return Grammar(text)
 
 
-def load_grammar(path: str | Path) -> Grammar:
+def load_grammar(path: str | Path, source: str = None) -> Grammar:
     """Load the given grammar file.
 
     Args:
         path (str | Path): Path to the grammar (.py) file.
+        source (str, optional): The source of the grammar file (in memory), instead of reading the path
+            (the path is used only as the name of the file). Defaults to None.
 
     Returns:
         Grammar: the Grammar object.
     """
+    grammar, _, _ = load_grammar_file(path, source=source)
+    return grammar
+
+
+def load_grammar_file(
+    path: str | Path, source: str = None, cache: GrammarCache = None
+) -> tuple[Grammar, Optional[list[str]], Optional[list[str]]]:
+    """Load the given grammar file (executed once), with its ordering lists: `all_topics` and `all_types`.
+
+    Args:
+        path (str | Path): Path to the grammar (.py) file.
+        source (str, optional): The source of the grammar file (in memory), instead of reading the path
+            (the path is used only as the name of the file). Defaults to None.
+        cache (GrammarCache, optional): cache of the loaded grammar files (if the source is in the cache, the file is not
+            executed and the grammar is not compiled). Defaults to None (no cache).
+
+    Returns:
+        tuple[Grammar, Optional[list[str]], Optional[list[str]]]: the Grammar object, all the topics and all the types
+            (None if not defined in the file).
+    """
     path = path if path is None or isinstance(path, Path) else Path(path)
-    assert path.exists(), f"No such file: {path.resolve()}"
-    grammar_str = eval_file(path)
-    assert isinstance(grammar_str, str), f"File: {path.resolve()} must ends with a python string " "that represents the grammar"
-    logging.info("Loading the grammar file from: %s", path.resolve())
-    return loads_grammar(grammar_str)
+    assert source is not None or path.exists(), f"No such file: {path.resolve()}"
+    logging.info("Loading the grammar file from: %s", path if source is not None else path.resolve())
+    source = source if source is not None else path.read_text()
+    if cache is not None and (grammar := cache.get_grammar(source)) is not None:
+        logging.debug("Loaded the grammar from the cache: %s", cache.directory)
+        return grammar
+    identifiers: dict[str, Any] = {}
+    grammar_str = eval_file(path, identifiers=identifiers, source=source)
+    assert isinstance(grammar_str, str), f"File: {path} must ends with a python string " "that represents the grammar"
+    grammar = loads_grammar(grammar_str), identifiers.get("all_topics"), identifiers.get("all_types")
+    if cache is not None:
+        cache.set_grammar(source, grammar)
+    return grammar
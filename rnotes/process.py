@@ -1,12 +1,19 @@
 """This module process of the comments to Issues objects"""
 from __future__ import annotations
+import json
 import logging
 import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
 from functools import cached_property
 from dataclasses import dataclass, field
+from itertools import compress
+from pathlib import Path
+from typing import Any, Iterable, Optional
 
 sys.path.insert(0, ".")
-from rnotes.parser import Tokens
+from rnotes.parser import AUTHOR, Tokens
 
 
 __docformat__ = "google"
@@ -24,6 +31,7 @@ class Issue:
     topic: str
     type: str
     image: str
+    author: str = None
 
     def from_comment(comment: dict[str, str]) -> Issue:
         """Convert a dictionary that represents the pull request's first comment.
@@ -43,6 +51,7 @@ class Issue:
             topic=Issue.clean_text(comment[Tokens.TOPIC]),
             type=Issue.clean_text(comment[Tokens.TYPE]),
             image=comment[Tokens.IMAGE_MD],
+            author=comment.get(AUTHOR),
         )
 
     @staticmethod
@@ -61,21 +70,127 @@ class Topic:
     "Mapping type to issues, for example: {'Bug': [Issue1, Issue2, ...], 'Enhancement': [Issue1, Issue2, ...], ...}"
 
 
+def get_ranks(names: Optional[Iterable[str]]) -> dict[str, int]:
+    """
+    Args:
+        names (Optional[Iterable[str]]): names by order (for example, of topics).
+
+    Returns:
+        dict[str, int]: Mapping between every name to its rank (the index of its first appearance).
+    """
+    ranks: dict[str, int] = {}
+    for rank, name in enumerate(names or ()):
+        ranks.setdefault(name, rank)
+    return ranks
+
+
+def remove_item(items: list, item: Any, lo: int = 0, hi: int = None) -> int:
+    """Remove the given item (the same object, not an equal object) from the given list.
+
+    Args:
+        items (list): the list.
+        item (Any): the item to remove.
+        lo (int, optional): the start of the range to search the item in. Defaults to 0.
+        hi (int, optional): the end of the range to search the item in. Defaults to None (the end of the list).
+
+    Returns:
+        int: the index of the removed item.
+    """
+    for index in range(lo, len(items) if hi is None else hi):
+        if items[index] is item:
+            del items[index]
+            return index
+    raise AssertionError(f"No such item: {item}")
+
+
 class ReleaseData:
-    """The proceed data with all the issues, topics, highlights, etc."""
+    """The proceed data with all the issues, topics, highlights, etc.
+
+    The issues are indexed in a single pass (by topic, type, author and highlight), so every view and lookup is built
+    from the indexes instead of scanning all the issues. Issues can be added and removed later (for example, a preview of
+    the release notes so far): every list is searched by bisect (the lists in the order of the issues by the sequence
+    numbers of the issues, and the sorted lists by their keys), and only the affected views are rebuilt.
+    """
 
-    def __init__(self, issues: list[Issue], order_by_topics: list[str] = None, order_by_types: list[str] = None):
+    def __init__(self, issues: Iterable[Issue], order_by_topics: list[str] = None, order_by_types: list[str] = None):
         """
         Args:
-            issues (list[Issue]): list of Issues objects.
+            issues (Iterable[Issue]): Issues objects (a list, or a generator that is consumed once).
             order_by_topics (list[str], optional): topics names by object, that will be
-                appeared in this order in the release notes. Defaults to None.
+                appeared in this order in the release notes (other topics are appeared last). Defaults to None.
             order_by_types (list[str], optional): issues names by object, that will be
-                appeared in this order in the release notes Defaults to None.
+                appeared in this order in the release notes (other types are appeared last). Defaults to None.
         """
-        self._issues = issues
         self._order_by_topics = order_by_topics
         self._order_by_types = order_by_types
+        self._topic_ranks = get_ranks(order_by_topics)
+        self._type_ranks = get_ranks(order_by_types)
+        self._issues: list[Issue] = []
+        self._topic_to_issues: dict[str, list[Issue]] = {}
+        self._type_to_issues: dict[str, list[Issue]] = {}
+        self._author_to_issues: dict[str, list[Issue]] = {}
+        # The sequence numbers (the order of the issues) of every list in the order of the issues, and of every issue:
+        self._next_sequence = 0
+        self._sequences: dict[int, list[int]] = {}
+        self._issue_sequences: list[int] = []
+        self._topic_to_sequences: dict[str, list[int]] = {}
+        self._type_to_sequences: dict[str, list[int]] = {}
+        self._author_to_sequences: dict[str, list[int]] = {}
+        for issue in issues:
+            self._index(issue)
+        # The sorted lists (and their keys, by the same order) of every topic and of the highlights:
+        self._topic_to_sorted_issues: dict[str, list[Issue]] = {}
+        self._topic_to_keys: dict[str, list[tuple[int, Any]]] = {}
+        for topic_name, topic_issues in self._topic_to_issues.items():
+            self._topic_to_sorted_issues[topic_name] = sorted(topic_issues, key=self._issue_key)
+            self._topic_to_keys[topic_name] = list(map(self._issue_key, self._topic_to_sorted_issues[topic_name]))
+        self._highlights = sorted((issue for issue in self._issues if issue.highlight), key=lambda issue: issue.ticket_number)
+        self._highlight_keys = [issue.ticket_number for issue in self._highlights]
+        self._topic_views: dict[str, Topic] = {}
+
+    def _index(self, issue: Issue) -> None:
+        """Add the given issue to the indexes (by the order of the issues, with its sequence number)."""
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._sequences.setdefault(id(issue), []).append(sequence)
+        self._issues.append(issue)
+        self._issue_sequences.append(sequence)
+        for index, sequences, name in self._ordered_indexes(issue):
+            index.setdefault(name, []).append(issue)
+            sequences.setdefault(name, []).append(sequence)
+
+    def _unindex(self, issue: Issue) -> None:
+        """Remove the given issue from the indexes (by the order of the issues), by bisect on its sequence number."""
+        assert id(issue) in self._sequences, f"No such item: {issue}"
+        sequence = self._sequences[id(issue)].pop()
+        if not self._sequences[id(issue)]:
+            del self._sequences[id(issue)]
+        position = bisect_left(self._issue_sequences, sequence)
+        del self._issues[position], self._issue_sequences[position]
+        for index, sequences, name in self._ordered_indexes(issue):
+            position = bisect_left(sequences[name], sequence)
+            del index[name][position], sequences[name][position]
+            if not index[name]:
+                del index[name], sequences[name]
+
+    def _ordered_indexes(self, issue: Issue) -> tuple[tuple[dict[str, list[Issue]], dict[str, list[int]], str], ...]:
+        """
+        Returns:
+            tuple[tuple[dict[str, list[Issue]], dict[str, list[int]], str], ...]: the indexes in the order of the issues
+                (by topic, type and author), with their sequence numbers, and the name of the given issue in every index.
+        """
+        return (
+            (self._topic_to_issues, self._topic_to_sequences, issue.topic),
+            (self._type_to_issues, self._type_to_sequences, issue.type),
+            (self._author_to_issues, self._author_to_sequences, issue.author),
+        )
+
+    def _issue_key(self, issue: Issue) -> tuple[int, Any]:
+        """
+        Returns:
+            tuple[int, Any]: the key of the given issue in its topic (the rank of its type, and its ticket number).
+        """
+        return (self.type_rank(issue.type) if self._order_by_types else 0), issue.ticket_number
 
     @property
     def issues(self) -> list[Issue]:
@@ -85,45 +200,125 @@ class ReleaseData:
         """
         return self._issues
 
-    @cached_property
+    def topic_rank(self, topic_name: str) -> int:
+        """
+        Args:
+            topic_name (str): name of the topic.
+
+        Returns:
+            int: the rank of the topic in `order_by_topics` (topics that are not in it are ranked last).
+        """
+        return self._topic_ranks.get(topic_name, len(self._topic_ranks))
+
+    def type_rank(self, type_of_issue: str) -> int:
+        """
+        Args:
+            type_of_issue (str): type of the issue (for example, "Bug").
+
+        Returns:
+            int: the rank of the type in `order_by_types` (types that are not in it are ranked last).
+        """
+        return self._type_ranks.get(type_of_issue, len(self._type_ranks))
+
+    def add_issue(self, issue: Issue) -> None:
+        """Add a single issue (O(log n) to find its place in the sorted lists), and invalidate the views of its topic.
+
+        Args:
+            issue (Issue): the Issue object.
+        """
+        self._index(issue)
+        keys = self._topic_to_keys.setdefault(issue.topic, [])
+        if not keys:
+            self.__dict__.pop("topic_names", None)
+        key = self._issue_key(issue)
+        index = bisect_right(keys, key)
+        keys.insert(index, key)
+        self._topic_to_sorted_issues.setdefault(issue.topic, []).insert(index, issue)
+        self._topic_views.pop(issue.topic, None)
+        if issue.highlight:
+            index = bisect_right(self._highlight_keys, issue.ticket_number)
+            self._highlight_keys.insert(index, issue.ticket_number)
+            self._highlights.insert(index, issue)
+        self.__dict__.pop("table", None)
+
+    def remove_issue(self, issue: Issue) -> None:
+        """Remove a single issue (the same object that was added, O(log n) to find it in every list), and invalidate the
+        views of its topic.
+
+        Args:
+            issue (Issue): the Issue object.
+        """
+        self._unindex(issue)
+        key = self._issue_key(issue)
+        keys = self._topic_to_keys[issue.topic]
+        index = remove_item(
+            self._topic_to_sorted_issues[issue.topic], issue, bisect_left(keys, key), bisect_right(keys, key)
+        )
+        del keys[index]
+        if not keys:
+            del self._topic_to_keys[issue.topic], self._topic_to_sorted_issues[issue.topic]
+            self.__dict__.pop("topic_names", None)
+        self._topic_views.pop(issue.topic, None)
+        if issue.highlight:
+            lo = bisect_left(self._highlight_keys, issue.ticket_number)
+            hi = bisect_right(self._highlight_keys, issue.ticket_number)
+            del self._highlight_keys[remove_item(self._highlights, issue, lo, hi)]
+        self.__dict__.pop("table", None)
+
+    @property
     def highlights(self) -> list[Issue]:
         """
         Returns:
             list[Issue]: All the issues that marked as highlight.
         """
-        issues = [issue for issue in self._issues if issue.highlight]
-        logging.debug("%s highlights items found", len(issues))
-        return sorted(issues, key=lambda issue: issue.ticket_number)
+        return self._highlights
 
     @cached_property
+    def topic_names(self) -> list[str]:
+        """
+        Returns:
+            list[str]: the names of all the topics, by their order in the release notes.
+        """
+        topic_names = sorted(self._topic_to_sorted_issues)
+        if self._order_by_topics:
+            topic_names.sort(key=self.topic_rank)
+        logging.debug("%s topics found: %s", len(topic_names), ", ".join(map(lambda val: f"'{val}'", topic_names)))
+        return topic_names
+
+    def get_topic(self, topic_name: str) -> Topic:
+        """
+        Args:
+            topic_name (str): name of the topic.
+
+        Returns:
+            Topic: the topic object (built once, until its issues are changed).
+        """
+        topic = self._topic_views.get(topic_name)
+        if topic is None:
+            topic = self._topic_views[topic_name] = Topic(name=topic_name)
+            for issue in self._topic_to_sorted_issues.get(topic_name, []):
+                topic.type_to_issues.setdefault(issue.type, []).append(issue)
+        return topic
+
+    @property
     def topics(self) -> list[Topic]:
         """Constructs and returns all the topics.
 
         Returns:
             list[Topic]: List (ordered) of all the topics objects.
         """
-        topic_names = sorted({issue.topic for issue in self._issues})
-        if self._order_by_topics:
-            topic_names = sorted(topic_names, key=lambda name: self._order_by_topics.index(name))
-        topics: list[Topic] = []
-        for topic_name in topic_names:
-            topic = Topic(name=topic_name)
-            issues = sorted(
-                filter(
-                    lambda issue: issue.topic == topic_name,
-                    self._issues,
-                ),
-                key=lambda issue: issue.ticket_number,
-            )
-            if self._order_by_types:
-                issues = sorted(issues, key=lambda issue: (self._order_by_types.index(issue.type), issue.ticket_number))
-            for issue in issues:
-                topic.type_to_issues.setdefault(issue.type, []).append(issue)
-            topics.append(topic)
-        logging.debug("%s topics found: %s", len(topic_names), ", ".join(map(lambda val: f"'{val}'", topic_names)))
-        return topics
+        return [self.get_topic(topic_name) for topic_name in self.topic_names]
+
+    def issues_by_topic(self, topic_name: str) -> list[Issue]:
+        """
+        Args:
+            topic_name (str): name of the topic.
+
+        Returns:
+            list[Issue]: All the issues of the given topic.
+        """
+        return self._topic_to_issues.get(topic_name, [])
 
-    @cached_property
     def issues_by_type(self, type_of_issue: str) -> list[Issue]:
         """
         Args:
@@ -132,15 +327,216 @@ class ReleaseData:
         Returns:
             list[Issue]: All the issues the marked with the given type_of_issue.
         """
-        return [issue for issue in self._issues if issue.type == type_of_issue]
+        return self._type_to_issues.get(type_of_issue, [])
+
+    def issues_by_author(self, author: str) -> list[Issue]:
+        """
+        Args:
+            author (str): login of the author of the pull requests.
+
+        Returns:
+            list[Issue]: All the issues of the given author.
+        """
+        return self._author_to_issues.get(author, [])
+
+    @property
+    def type_to_issue(self) -> dict[str, list[Issue]]:
+        """
+        Returns:
+            dict[str, list[Issue]]: Mapping between the type to all the issues that has this issue.
+        """
+        return self._type_to_issues
+
+    @property
+    def author_to_issues(self) -> dict[str, list[Issue]]:
+        """
+        Returns:
+            dict[str, list[Issue]]: Mapping between the author to all the issues of the author.
+        """
+        return self._author_to_issues
 
     @cached_property
-    def type_to_issue(self) -> dict[str, Issue]:
+    def table(self) -> IssueTable:
+        """
+        Returns:
+            IssueTable: columnar table of all the issues (for statistics, for example: `table.count_by("type")`).
+        """
+        table = IssueTable()
+        table.add_issues(self._issues)
+        return table
+
+
+class Categories:
+    """Categorical coding of strings: every distinct string (interned) gets a code, by the order of its first appearance"""
+
+    def __init__(self) -> None:
+        self._names: list[Optional[str]] = []
+        self._codes: dict[Optional[str], int] = {}
+
+    @property
+    def names(self) -> list[Optional[str]]:
+        """
+        Returns:
+            list[Optional[str]]: the names, by their codes.
+        """
+        return self._names
+
+    def code(self, name: Optional[str]) -> int:
+        """
+        Args:
+            name (Optional[str]): the name (for example, of a topic).
+
+        Returns:
+            int: the code of the name (a new code, if it's a new name).
+        """
+        code = self._codes.get(name)
+        if code is None:
+            name = sys.intern(name) if isinstance(name, str) else name
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class IssueTable:
+    """Columnar table of issues (of one or more releases), for statistics across releases.
+
+    Every column is an array: the strings columns are categorical coded (see `Categories`), so a table of many issues
+    takes a few bytes per issue, and the statistics are counted over the arrays of the codes at once.
+    """
+
+    CATEGORICAL_COLUMNS = ("release", "topic", "type", "author")
+    "The columns of the strings (categorical coded)"
+
+    def __init__(self) -> None:
+        self._categories = {column: Categories() for column in IssueTable.CATEGORICAL_COLUMNS}
+        self._columns = {column: array("I") for column in IssueTable.CATEGORICAL_COLUMNS}
+        self._highlight = array("B")
+
+    def __len__(self) -> int:
+        return len(self._highlight)
+
+    def add_issues(self, issues: Iterable[Issue], release: str = None) -> None:
+        """Add the given issues to the table.
+
+        Args:
+            issues (Iterable[Issue]): Issues objects.
+            release (str, optional): name of the release of the issues (for example, the version name). Defaults to None.
+        """
+        release_code = self._categories["release"].code(release)
+        topic_code, type_code, author_code = (self._categories[column].code for column in ("topic", "type", "author"))
+        for issue in issues:
+            self._columns["release"].append(release_code)
+            self._columns["topic"].append(topic_code(issue.topic))
+            self._columns["type"].append(type_code(issue.type))
+            self._columns["author"].append(author_code(issue.author))
+            self._highlight.append(issue.highlight)
+
+    def names(self, column: str) -> list[Optional[str]]:
+        """
+        Args:
+            column (str): name of a categorical column (for example, "topic").
+
+        Returns:
+            list[Optional[str]]: all the distinct values of the column, by the order of their first appearance.
+        """
+        return self._categories[column].names
+
+    def count_by(self, *columns: str, highlights: bool = False) -> dict[Any, int]:
+        """Count the issues by the values of the given columns (group-by count).
+
+        Args:
+            *columns (str): names of categorical columns (for example, "release", "type").
+            highlights (bool, optional): If True, only the highlights are counted. Defaults to False.
+
+        Returns:
+            dict[Any, int]: Mapping between the value (a tuple of values, if there are more columns) to the number of
+                the issues, by the order of the first appearance.
+        """
+        assert columns, "At least 1 column is needed"
+        codes = zip(*(self._columns[column] for column in columns)) if len(columns) > 1 else self._columns[columns[0]]
+        counts = Counter(compress(codes, self._highlight) if highlights else codes)
+        names = [self._categories[column].names for column in columns]
+        if len(columns) == 1:
+            return {names[0][code]: count for code, count in sorted(counts.items())}
+        return {
+            tuple(column_names[code] for column_names, code in zip(names, key)): count
+            for key, count in sorted(counts.items())
+        }
+
+    def histogram(self, column: str) -> list[tuple[Optional[str], int]]:
+        """
+        Args:
+            column (str): name of a categorical column (for example, "author").
+
+        Returns:
+            list[tuple[Optional[str], int]]: the values of the column with their numbers of issues (the most common first).
+        """
+        return sorted(self.count_by(column).items(), key=lambda item: -item[1])
+
+    def highlight_ratio(self, column: str = None) -> float | dict[Optional[str], float]:
+        """
+        Args:
+            column (str, optional): name of a categorical column (for example, "release"). Defaults to None (all).
+
+        Returns:
+            float | dict[Optional[str], float]: the ratio of the highlights (of every value of the column, if given).
+        """
+        if column is None:
+            return sum(self._highlight) / len(self) if len(self) else 0.0
+        highlights = self.count_by(column, highlights=True)
+        return {name: highlights.get(name, 0) / count for name, count in self.count_by(column).items()}
+
+    def statistics(self) -> dict[str, Any]:
         """
         Returns:
-            dict[str, Issue]: Mapping between the type to all the issues that has this issue.
+            dict[str, Any]: the statistics of the issues (counts by type, topic and author, and the highlights), of all
+                the issues, and of every release (if there are more releases).
+        """
+
+        def nest(counts: dict[tuple[str, str], int]) -> dict[str, dict[str, int]]:
+            nested: dict[str, dict[str, int]] = {}
+            for (release, name), count in counts.items():
+                nested.setdefault(release, {})[name] = count
+            return nested
+
+        statistics = dict(
+            issues=len(self),
+            highlights=sum(self._highlight),
+            highlight_ratio=self.highlight_ratio(),
+            by_type=self.count_by("type"),
+            by_topic=self.count_by("topic"),
+            by_author=self.count_by("author"),
+        )
+        if len(self._categories["release"]) > 1:
+            issues = self.count_by("release")
+            highlights = self.count_by("release", highlights=True)
+            by_type, by_topic, by_author = (nest(self.count_by("release", column)) for column in ("type", "topic", "author"))
+            statistics["by_release"] = {
+                release: dict(
+                    issues=count,
+                    highlights=highlights.get(release, 0),
+                    highlight_ratio=highlights.get(release, 0) / count,
+                    by_type=by_type[release],
+                    by_topic=by_topic[release],
+                    by_author=by_author[release],
+                )
+                for release, count in issues.items()
+            }
+        return statistics
+
+    def to_json(self, path: str | Path) -> Path:
+        """Export the statistics of the issues to a JSON file.
+
+        Args:
+            path (str | Path): path of the JSON file.
+
+        Returns:
+            Path: the path of the JSON file.
         """
-        res = {}
-        for issue in self._issues:
-            res.setdefault(issue.type, []).append(issue)
-        return res
+        path = Path(path)
+        path.write_text(json.dumps(self.statistics(), indent=2))
+        logging.info("Statistics path: %s", path.resolve())
+        return path
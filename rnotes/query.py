@@ -1,45 +1,929 @@
 """This module implements the query of the data from GitHub"""
+from __future__ import annotations
+import hashlib
+import json
 import logging
 import os
-from pathlib import Path
+import sqlite3
 import sys
-from functools import cached_property
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
-from tempfile import mkdtemp
-from github import Github, UnknownObjectException
+import tempfile
+import threading
+from bisect import bisect_left
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from enum import Enum
+from fnmatch import fnmatch
+from functools import cached_property, partial
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import quote, urlparse
+import requests
+from github import Github, GithubException, UnknownObjectException
+from github.Requester import Requester, RequestsResponse
+from github.PaginatedList import PaginatedList
 from github.PullRequest import PullRequest
 from github.Tag import Tag
 from github.Repository import Repository
 
 sys.path.insert(0, ".")
-from rnotes.utils import LogLevel
+from rnotes.utils import DEFAULT_CACHE_SIZE, ContentStore, DiskCache, LogLevel, get_cache_dir
+from rnotes.scheduler import DEFAULT_SCHEDULER, RequestScheduler
+from rnotes.transport import GithubClient
 
 
 __docformat__ = "google"
 
 
-@dataclass
+NOT_LOADED = type("NotLoaded", (), {"__repr__": lambda self: "NOT_LOADED"})()
+"Marker of a body (comment) of a pull request that was not fetched yet"
+
+
 class GithubPullRequest:
-    """Pull request object to store the basic information of the pull request"""
+    """Pull request object to store the basic information of the pull request.
+
+    The record is compact (slotted, without the GitHub objects it was created from), and its body (`comment`) can be
+    loaded on demand: if the comment is NOT_LOADED, it is loaded by `load_comment` on the first access.
+    """
+
+    __slots__ = ("name", "url", "author", "number", "merged_at", "_comment", "_load_comment")
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        author: str,
+        comment: Optional[str],
+        number: int = None,
+        merged_at: datetime = None,
+        load_comment: Callable[[int], Optional[str]] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): the title of the pull request.
+            url (str): the URL of the pull request.
+            author (str): the login of the author.
+            comment (Optional[str]): the body (first comment) of the pull request, or NOT_LOADED.
+            number (int, optional): the number of the pull request. Defaults to None.
+            merged_at (datetime, optional): the merge time of the pull request. Defaults to None.
+            load_comment (Callable[[int], Optional[str]], optional): function that loads the body by the number (called
+                once, on the first access to a NOT_LOADED comment). Defaults to None.
+        """
+        self.name = name
+        self.url = url
+        self.author = author
+        self.number = number
+        self.merged_at = merged_at
+        self._comment = comment
+        self._load_comment = load_comment
+
+    @property
+    def comment(self) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: the body (first comment) of the pull request (loaded on the first access, if needed).
+        """
+        if self._comment is NOT_LOADED:
+            self._comment = self._load_comment(self.number) if self._load_comment else None
+            self._load_comment = None
+        return self._comment
+
+    @comment.setter
+    def comment(self, comment: Optional[str]) -> None:
+        self._comment = comment
+        self._load_comment = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Returns:
+            bool: True if the body of the pull request is loaded.
+        """
+        return self._comment is not NOT_LOADED
+
+    def set_loader(self, load_comment: Callable[[int], Optional[str]]) -> None:
+        """Set the function that loads the body (if it is not loaded yet).
+
+        Args:
+            load_comment (Callable[[int], Optional[str]]): function that loads the body by the number of the pull request.
+        """
+        self._load_comment = load_comment
+
+    def _fields(self) -> tuple:
+        return (self.name, self.url, self.author, self._comment, self.number, self.merged_at)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"GithubPullRequest(name={self.name!r}, url={self.url!r}, author={self.author!r}, comment={self._comment!r}, "
+            f"number={self.number!r}, merged_at={self.merged_at!r})"
+        )
+
+
+class QueryEngine(str, Enum):
+    """Engines that can be used to fetch the pull requests from GitHub"""
+
+    REST = "rest"
+    "PyGithub's REST API, page after page of all the closed pull requests"
+    GRAPHQL = "graphql"
+    "GitHub's GraphQL API, 100 pull requests (with all the needed fields) per request"
+    SEARCH = "search"
+    "GitHub's search API, only the pull requests that merged in the window (split to sub windows, due to the results limit)"
+    COMPARE = "compare"
+    "GitHub's compare API, only the pull requests of the commits between the 2 tags (instead of the dates of the tags)"
+
+
+SEARCH_RESULTS_LIMIT = 1000
+"Maximal number of results that GitHub's search API returns for a single query"
+
+
+PULL_REQUESTS_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: MERGED, first: 100, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes { number title url author { __typename login } body mergedAt updatedAt }
+    }
+  }
+}
+"""
+
+
+PULL_REQUESTS_METADATA_GRAPHQL_QUERY = PULL_REQUESTS_GRAPHQL_QUERY.replace(" body ", " ")
+"Same as PULL_REQUESTS_GRAPHQL_QUERY, without the bodies (that are loaded on demand)"
+
+
+DIRECTORY_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $expression: String!) {
+  repository(owner: $owner, name: $name) {
+    object(expression: $expression) {
+      ... on Tree { entries { name type oid object { ... on Blob { text isBinary isTruncated } } } }
+    }
+  }
+}
+"""
+"GraphQL query of all the files (and their contents) of a directory, at a reference (expression: '<reference>:<directory>')"
+
+
+COMMITS_PULL_REQUESTS_BATCH_SIZE = 50
+"Number of commits (or pull requests) in a single GraphQL query of pull requests"
+
+
+def commits_pull_requests_graphql_query(shas: list[str], body: bool = True) -> str:
+    """
+    Args:
+        shas (list[str]): the commits sha.
+        body (bool, optional): If False, the bodies of the pull requests are not queried. Defaults to True.
+
+    Returns:
+        str: GraphQL query of the pull requests that associated with each of the given commits (aliased "c<index>").
+    """
+    commits = "\n".join(
+        f'    c{index}: object(oid: "{sha}") {{ ... on Commit {{ associatedPullRequests(first: 10) {{ '
+        f"nodes {{ number title url author {{ __typename login }} {'body ' if body else ''}mergedAt }} }} }} }}"
+        for index, sha in enumerate(shas)
+    )
+    return f"query($owner: String!, $name: String!) {{\n  repository(owner: $owner, name: $name) {{\n{commits}\n  }}\n}}"
+
+
+def pull_requests_graphql_query(numbers: list[int]) -> str:
+    """
+    Args:
+        numbers (list[int]): the pull requests numbers.
+
+    Returns:
+        str: GraphQL query of the given pull requests (aliased "p<number>").
+    """
+    pull_requests = "\n".join(
+        f"    p{number}: pullRequest(number: {int(number)}) {{ number title url author {{ __typename login }} body mergedAt }}"
+        for number in numbers
+    )
+    return f"query($owner: String!, $name: String!) {{\n  repository(owner: $owner, name: $name) {{\n{pull_requests}\n  }}\n}}"
+
+
+def parse_github_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a datetime string as returned by GitHub (for example: "2023-04-19T10:15:00Z").
+
+    Args:
+        value (Optional[str]): the datetime string.
+
+    Returns:
+        Optional[datetime]: naive datetime object in UTC (same as PyGithub), or None if value is None.
+    """
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+class ResponseCache(DiskCache):
+    """Persistent cache of GitHub's responses (body and headers), stored by the request"""
+
+    def get_response(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        Args:
+            key (str): key of the request.
+
+        Returns:
+            Optional[dict[str, Any]]: the cached response (with the keys: "headers", "body") if found, else None.
+        """
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_response(self, key: str, headers: dict[str, str], body: str) -> None:
+        """Store the given response.
+
+        Args:
+            key (str): key of the request.
+            headers (dict[str, str]): headers of the response.
+            body (str): body of the response.
+        """
+        self.set(key, json.dumps({"headers": headers, "body": body}).encode())
+
+
+class CachedResponse:
+    """Mimic the httplib response object (same as github.Requester.RequestsResponse) for a cached response"""
+
+    def __init__(self, status: int, headers: dict[str, str], text: str) -> None:
+        """
+        Args:
+            status (int): status code of the response.
+            headers (dict[str, str]): headers of the response.
+            text (str): body of the response.
+        """
+        self.status = status
+        self.headers = headers
+        self.text = text
+
+    def getheaders(self):
+        """
+        Returns:
+            The headers of the response, as (name, value) pairs.
+        """
+        return self.headers.items()
+
+    def read(self) -> str:
+        """
+        Returns:
+            str: the body of the response.
+        """
+        return self.text
+
+
+class CachedConnection:
+    """Mimic the httplib connection object (same as github.Requester.HTTPSRequestsConnectionClass), that sends
+    conditional requests (ETag/Last-Modified) for GET requests, and serves the not modified (304) responses from the cache.
+
+    The HTTP sessions (keep-alive connections) are shared between all the connections to the same host, and the current
+    request is kept per thread, so a single connection can be used by PyGithub from many threads. If a scheduler is given,
+    every request is sent under the scheduler.
+    """
+
+    _sessions: dict[tuple, requests.Session] = {}
+    "Shared HTTP sessions, by (protocol, host, port)"
+
+    def __init__(
+        self,
+        host: str,
+        port: int = None,
+        strict: bool = False,
+        timeout: int = None,
+        retry: Any = None,
+        pool_size: int = None,
+        protocol: str = "https",
+        cache: ResponseCache = None,
+        scheduler: RequestScheduler = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Args:
+            host (str): the host name.
+            port (int, optional): the port. Defaults to the default port of the protocol.
+            strict (bool, optional): unused (same as httplib). Defaults to False.
+            timeout (int, optional): timeout of every request. Defaults to None.
+            retry (Any, optional): retries of every request (int or urllib3 Retry object). Defaults to requests's default.
+            pool_size (int, optional): size of the connections pool. Defaults to requests's default.
+            protocol (str, optional): "https" or "http". Defaults to "https".
+            cache (ResponseCache, optional): the cache of the responses. Defaults to None (no cache).
+            scheduler (RequestScheduler, optional): the scheduler of the requests. Defaults to None (no scheduler).
+            **kwargs (Any): "verify" (bool) - whether to verify the TLS certificate.
+        """
+        self.host = host
+        self.protocol = protocol
+        self.port = port if port else (443 if protocol == "https" else 80)
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.session = self._get_session(protocol, host, self.port, retry, pool_size)
+        self._local = threading.local()
+
+    @classmethod
+    def _get_session(cls, protocol: str, host: str, port: int, retry: Any, pool_size: int) -> requests.Session:
+        """
+        Returns:
+            requests.Session: the shared HTTP session of the given host (created if not exists).
+        """
+        key = (protocol, host, port)
+        if key not in cls._sessions:
+            session = requests.Session()
+            pool_size = pool_size or requests.adapters.DEFAULT_POOLSIZE
+            adapter = requests.adapters.HTTPAdapter(
+                max_retries=requests.adapters.DEFAULT_RETRIES if retry is None else retry,
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+            )
+            session.mount(f"{protocol}://", adapter)
+            cls._sessions[key] = session
+        return cls._sessions[key]
+
+    def request(self, verb: str, url: str, input: Any, headers: dict[str, str]) -> None:  # pylint: disable=redefined-builtin
+        """Store the request of the current thread (it will be sent in `getresponse`), same as httplib."""
+        self._local.request = (verb, url, input, headers)
+
+    def cache_key(self, verb: str, url: str, headers: dict[str, str]) -> str:
+        """
+        Args:
+            verb (str): the HTTP method of the request.
+            url (str): the URL (path) of the request.
+            headers (dict[str, str]): headers of the request.
+
+        Returns:
+            str: key of the request in the cache (the token is hashed, since responses depend on permissions).
+        """
+        token = hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest()
+        return f"{verb} {self.protocol}://{self.host}:{self.port}{url} {headers.get('Accept', '')} {token}"
+
+    def _send(self, verb: str, url: str, data: Any, headers: dict[str, str]) -> requests.Response:
+        """Send the given request.
+
+        Args:
+            verb (str): the HTTP method of the request.
+            url (str): the URL (path) of the request.
+            data (Any): the body of the request.
+            headers (dict[str, str]): headers of the request.
+
+        Returns:
+            requests.Response: the response.
+        """
+        send = partial(
+            self.session.request,
+            verb,
+            f"{self.protocol}://{self.host}:{self.port}{url}",
+            headers=headers,
+            data=data,
+            timeout=self.timeout,
+            verify=self.verify,
+            allow_redirects=False,
+        )
+        return self.scheduler.execute(url, send) if self.scheduler else send()
+
+    def getresponse(self):
+        """Send the request of the current thread, and returns the response (from the cache, if it was not modified)."""
+        verb, url, data, headers = self._local.request
+        if self.cache is None or verb != "GET":
+            return RequestsResponse(self._send(verb, url, data, headers))
+        key = self.cache_key(verb, url, headers)
+        cached = self.cache.get_response(key)
+        headers = dict(headers)
+        if cached is not None:
+            if "etag" in cached["headers"]:
+                headers["If-None-Match"] = cached["headers"]["etag"]
+            if "last-modified" in cached["headers"]:
+                headers["If-Modified-Since"] = cached["headers"]["last-modified"]
+        response = self._send(verb, url, data, headers)
+        if response.status_code == 304 and cached is not None:
+            logging.debug("Not modified (served from the cache): %s", url)
+            self.cache.set_response(key, cached["headers"], cached["body"])
+            response_headers = cached["headers"] | {
+                name.lower(): value for name, value in response.headers.items() if name.lower().startswith("x-ratelimit")
+            }
+            return CachedResponse(200, response_headers, cached["body"])
+        response_headers = {name.lower(): value for name, value in response.headers.items()}
+        if response.status_code == 200 and ("etag" in response_headers or "last-modified" in response_headers):
+            self.cache.set_response(key, response_headers, response.text)
+        return RequestsResponse(response)
+
+    def close(self) -> None:
+        """Nothing to close, the session is shared (same as httplib)."""
+
+
+@contextmanager
+def cached_connections(cache: Optional[ResponseCache] = None, scheduler: Optional[RequestScheduler] = None) -> Iterator[None]:
+    """Route all the requests of the GitHub instances that are created under the context through the given cache and
+    scheduler. The GitHub instances keep their connections after the context, and PyGithub's default connections are
+    restored on exit, so the other GitHub instances of the process are not affected.
+
+    Note that the CachedConnection is used even without a cache, since unlike PyGithub's default (a single connection
+    per GitHub instance, that sends a single request at a time), it can be used from many threads.
+
+    Args:
+        cache (Optional[ResponseCache], optional): the cache of the responses. Defaults to None (no cache).
+        scheduler (Optional[RequestScheduler], optional): the scheduler of the requests. Defaults to None (no scheduler).
+    """
+    Requester.injectConnectionClasses(
+        partial(CachedConnection, protocol="http", cache=cache, scheduler=scheduler),
+        partial(CachedConnection, protocol="https", cache=cache, scheduler=scheduler),
+    )
+    try:
+        yield
+    finally:
+        Requester.resetConnectionClasses()
+
+
+class TagIndex:
+    """Index of a repository: tag name -> commit sha -> commit date.
+
+    Only the dates of the commits are persistent (a commit never changes, so it's resolved once, and reused by all the
+    next runs). The tags are indexed in memory only, since a tag can be moved or re-created (for example: "nightly", or
+    a force-pushed release tag), so they are resolved again in every run (through the cache of the responses). The index
+    file is saved once, on `close` (or at the end of the context), if commits were added.
+    """
+
+    def __init__(self, path: str | Path = None) -> None:
+        """
+        Args:
+            path (str | Path, optional): path of the index file (.json). Defaults to None (in memory only).
+        """
+        self._path = Path(path) if path else None
+        self._tag_to_sha: dict[str, str] = {}
+        self._sha_to_date: dict[str, str] = {}
+        self._modified = False
+        if self._path and self._path.exists():
+            self._sha_to_date = json.loads(self._path.read_text()).get("commits", {})
+
+    def __enter__(self) -> TagIndex:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def path(self) -> Optional[Path]:
+        """
+        Returns:
+            Optional[Path]: path of the index file, if any.
+        """
+        return self._path
+
+    def get_sha(self, tag_name: str) -> Optional[str]:
+        """
+        Args:
+            tag_name (str): the name of the tag.
+
+        Returns:
+            Optional[str]: the commit sha of the tag, if indexed (in the current run).
+        """
+        return self._tag_to_sha.get(tag_name)
+
+    def get_date(self, sha: str) -> Optional[datetime]:
+        """
+        Args:
+            sha (str): the commit sha.
+
+        Returns:
+            Optional[datetime]: the (author) date of the commit, if indexed.
+        """
+        date = self._sha_to_date.get(sha)
+        return datetime.fromisoformat(date) if date else None
+
+    def add_tag(self, tag_name: str, sha: str) -> None:
+        """Index the given tag (in memory only).
+
+        Args:
+            tag_name (str): the name of the tag.
+            sha (str): the commit sha of the tag.
+        """
+        self._tag_to_sha[tag_name] = sha
+
+    def add_commit(self, sha: str, date: datetime) -> None:
+        """Index the given commit (it's saved on `close`).
+
+        Args:
+            sha (str): the commit sha.
+            date (datetime): the (author) date of the commit.
+        """
+        self._sha_to_date[sha] = date.isoformat()
+        self._modified = True
+
+    def save(self) -> None:
+        """Save the dates of the commits to the index file (if any)."""
+        if self._path is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self._path.parent)
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump({"commits": self._sha_to_date}, file)
+        os.replace(tmp_path, self._path)
+        self._modified = False
+
+    def close(self) -> None:
+        """Save the index file, if commits were added since it was loaded (or saved)."""
+        if self._modified:
+            self.save()
+
+
+def get_graphql_login(author: Optional[dict[str, str]]) -> str:
+    """
+    Args:
+        author (Optional[dict[str, str]]): the author of a GraphQL node (with "__typename" and "login"), None if deleted.
+
+    Returns:
+        str: the login of the author, same as the REST API returns it ("<login>[bot]" for bots, "ghost" if deleted).
+    """
+    if not author:
+        return "ghost"
+    return f"{author['login']}[bot]" if author.get("__typename") == "Bot" else author["login"]
+
+
+def from_graphql_node(node: dict[str, Any]) -> GithubPullRequest:
+    """
+    Args:
+        node (dict[str, Any]): pull request node of a GraphQL response.
+
+    Returns:
+        GithubPullRequest: the basic information of the given pull request.
+    """
+    return GithubPullRequest(
+        name=node["title"],
+        url=node["url"],
+        author=get_graphql_login(node["author"]),
+        comment=node.get("body", NOT_LOADED),
+        number=node["number"],
+        merged_at=parse_github_datetime(node["mergedAt"]),
+    )
+
+
+def from_rest_json(item: dict[str, Any]) -> GithubPullRequest:
+    """
+    Args:
+        item (dict[str, Any]): pull request object of a REST response.
+
+    Returns:
+        GithubPullRequest: the basic information of the given pull request.
+    """
+    return GithubPullRequest(
+        name=item["title"],
+        url=item["html_url"],
+        author=item["user"]["login"] if item["user"] else "ghost",
+        comment=item["body"],
+        number=item["number"],
+        merged_at=parse_github_datetime(item["merged_at"]),
+    )
+
+
+def to_github_pull_request(pull_request: PullRequest) -> GithubPullRequest:
+    """
+    Args:
+        pull_request (PullRequest): github.PullRequest object.
+
+    Returns:
+        GithubPullRequest: the basic information of the given pull request.
+    """
+    return GithubPullRequest(
+        name=pull_request.title,
+        url=pull_request.html_url,
+        author=pull_request.user.login,
+        comment=pull_request.body,
+        number=pull_request.number,
+        merged_at=pull_request.merged_at,
+    )
+
+
+def iter_paginated(paginated_list: PaginatedList, per_page: int = 30) -> Iterator[Any]:
+    """Iterate over the items of a github.PaginatedList page by page, without keeping the items of the previous pages
+    (unlike iterating the PaginatedList itself, that keeps all the items that it fetched).
+
+    Args:
+        paginated_list (PaginatedList): the github.PaginatedList object.
+        per_page (int, optional): the number of items per page (as in the Github instance). Defaults to 30.
+
+    Yields:
+        Any: the items (github objects).
+    """
+    page = 0
+    while True:
+        items = paginated_list.get_page(page)
+        yield from items
+        if len(items) < per_page:
+            return
+        page += 1
+
+
+class BodyLoader:
+    """Load the bodies of pull requests on demand, in batches: the pull requests are attached to the loader, and on the
+    first access to the body of any of them, the bodies of the next batch of the attached pull requests are fetched.
+
+    The batch is fetched outside the lock, so other threads can attach pull requests and fetch other batches meanwhile,
+    and threads that access a body of a batch that is being fetched wait for that fetch (every body is fetched once).
+    """
+
+    def __init__(self, fetch: Callable[[list[int]], dict[int, Optional[str]]], batch_size: int = COMMITS_PULL_REQUESTS_BATCH_SIZE):
+        """
+        Args:
+            fetch (Callable[[list[int]], dict[int, Optional[str]]]): function that fetches the bodies of the given numbers.
+            batch_size (int, optional): number of bodies per fetch. Defaults to COMMITS_PULL_REQUESTS_BATCH_SIZE.
+        """
+        self._fetch = fetch
+        self._batch_size = batch_size
+        self._pending: dict[int, None] = {}
+        self._batches: dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, pull_request: GithubPullRequest) -> GithubPullRequest:
+        """Load the body of the given pull request (if it is not loaded) with this loader.
+
+        Args:
+            pull_request (GithubPullRequest): the pull request.
+
+        Returns:
+            GithubPullRequest: the same pull request.
+        """
+        if not pull_request.is_loaded:
+            with self._lock:
+                self._pending[pull_request.number] = None
+            pull_request.set_loader(self)
+        return pull_request
+
+    def __call__(self, number: int) -> Optional[str]:
+        """
+        Args:
+            number (int): the number of the pull request.
+
+        Returns:
+            Optional[str]: the body of the pull request (fetched with the next pending bodies, if needed).
+        """
+        with self._lock:
+            batch = None
+            if (future := self._batches.get(number)) is None:
+                self._pending.pop(number, None)
+                batch = [number, *islice(self._pending, self._batch_size - 1)]
+                future = Future()
+                for pending in batch:
+                    self._pending.pop(pending, None)
+                    self._batches[pending] = future
+        if batch is not None:
+            try:
+                future.set_result(self._fetch(batch))
+            except BaseException as error:
+                with self._lock:  # the next access to any of the bodies fetches them again
+                    for pending in batch:
+                        if self._batches.get(pending) is future:
+                            del self._batches[pending]
+                        self._pending[pending] = None
+                future.set_exception(error)
+                raise
+        bodies = future.result()
+        with self._lock:
+            self._batches.pop(number, None)
+        return bodies.get(number)
+
+
+class PullRequestStore:
+    """Local mirror (SQLite) of the merged pull requests of a repository, indexed by the merge time.
+
+    The store tracks the dates it covers: all the pull requests that merged after `covered_from` and were updated
+    until `synced_until` (the high-water mark), so every sync fetches only the pull requests updated since the mark.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pull_requests (
+        number INTEGER PRIMARY KEY, title TEXT, url TEXT, author TEXT, body TEXT, merged_at TEXT, updated_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS pull_requests_merged_at ON pull_requests (merged_at);
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        """
+        Args:
+            path (str | Path, optional): path of the database file. Defaults to ":memory:" (in memory database).
+        """
+        self._path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(self.SCHEMA)
+
+    @property
+    def path(self) -> str | Path:
+        """
+        Returns:
+            str | Path: path of the database file.
+        """
+        return self._path
+
+    def _get_meta(self, key: str) -> Optional[datetime]:
+        """
+        Args:
+            key (str): the name of the date.
+
+        Returns:
+            Optional[datetime]: the date, if stored.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    @property
+    def covered_from(self) -> Optional[datetime]:
+        """
+        Returns:
+            Optional[datetime]: all the pull requests that merged after this date are stored
+                (None if never synced, or if the whole history is stored).
+        """
+        return self._get_meta("covered_from")
+
+    @property
+    def synced_until(self) -> Optional[datetime]:
+        """
+        Returns:
+            Optional[datetime]: the high-water mark - the latest update time of the stored pull requests.
+        """
+        return self._get_meta("synced_until")
+
+    def covers(self, from_date: datetime = None) -> bool:
+        """
+        Args:
+            from_date (datetime, optional): the date to check. Defaults to None (the whole history).
+
+        Returns:
+            bool: True if all the pull requests that merged after the given date are stored.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'covered_from'").fetchone()
+        if row is None:
+            return False
+        return row[0] == "" or (from_date is not None and datetime.fromisoformat(row[0]) <= from_date)
+
+    def set_coverage(self, covered_from: Optional[datetime], synced_until: Optional[datetime]) -> None:
+        """Store the dates that the store covers.
+
+        Args:
+            covered_from (Optional[datetime]): all the pull requests that merged after this date are stored (None for all).
+            synced_until (Optional[datetime]): the latest update time of the stored pull requests.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("covered_from", covered_from.isoformat() if covered_from else ""),
+                    ("synced_until", synced_until.isoformat() if synced_until else ""),
+                ],
+            )
+
+    def add(self, pull_request: GithubPullRequest, updated_at: datetime) -> None:
+        """Add (or update) the given pull request.
+
+        Args:
+            pull_request (GithubPullRequest): the pull request (must have a number and a merge time).
+            updated_at (datetime): the update time of the pull request.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pull_requests VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    pull_request.number,
+                    pull_request.name,
+                    pull_request.url,
+                    pull_request.author,
+                    pull_request.comment,
+                    pull_request.merged_at.isoformat(),
+                    updated_at.isoformat(),
+                ),
+            )
+
+    def get_pull_requests_by_numbers(self, numbers: list[int]) -> dict[int, GithubPullRequest]:
+        """Get the given pull requests from the store.
+
+        Args:
+            numbers (list[int]): the pull requests numbers.
+
+        Returns:
+            dict[int, GithubPullRequest]: mapping between the number to the pull request, for the stored pull requests.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT title, url, author, body, number, merged_at FROM pull_requests "
+                f"WHERE number IN ({', '.join('?' * len(numbers))})",
+                list(numbers),
+            ).fetchall()
+        return {row[4]: self._from_row(row) for row in rows}
+
+    def get_bodies(self, numbers: list[int]) -> dict[int, Optional[str]]:
+        """Get the bodies of the given pull requests from the store.
+
+        Args:
+            numbers (list[int]): the pull requests numbers.
+
+        Returns:
+            dict[int, Optional[str]]: mapping between the number to the body, for the stored pull requests.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT number, body FROM pull_requests WHERE number IN ({', '.join('?' * len(numbers))})", list(numbers)
+            ).fetchall()
+        return dict(rows)
+
+    @staticmethod
+    def _from_row(row: tuple) -> GithubPullRequest:
+        """
+        Args:
+            row (tuple): row of the pull_requests table (title, url, author, body, number, merged_at).
+
+        Returns:
+            GithubPullRequest: the pull request.
+        """
+        name, url, author, body, number, merged_at = row
+        return GithubPullRequest(
+            name=name, url=url, author=author, comment=body, number=number, merged_at=datetime.fromisoformat(merged_at)
+        )
+
+    def get_pull_requests(self, from_date: datetime, to_date: datetime = None, body: bool = True) -> list[GithubPullRequest]:
+        """Get all the stored pull requests that merged between the given 2 dates.
 
-    name: str
-    url: str
-    author: str
-    comment: str
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+            body (bool, optional): If False, the bodies are not read (they are NOT_LOADED). Defaults to True.
+
+        Returns:
+            list[GithubPullRequest]: List of all the pull requests between the given 2 dates, ordered by the merge time.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT title, url, author, {'body' if body else 'NULL'}, number, merged_at FROM pull_requests "
+                "WHERE merged_at > ? AND merged_at <= ? ORDER BY merged_at",
+                (from_date.isoformat(), (to_date or datetime.max).isoformat()),
+            ).fetchall()
+        if not body:
+            rows = [(*row[:3], NOT_LOADED, *row[4:]) for row in rows]
+        return [self._from_row(row) for row in rows]
 
 
 class GithubRepository:
     """Wrapper to the github.repository class"""
 
-    def __init__(self, repository: Repository) -> None:
+    def __init__(
+        self,
+        repository: Repository,
+        engine: QueryEngine | str = QueryEngine.REST,
+        tag_index: TagIndex = None,
+        store: PullRequestStore = None,
+        client: GithubClient = None,
+        lazy_bodies: bool = False,
+        pull_request_filter: Callable[[GithubPullRequest], bool] = None,
+    ) -> None:
         """
         Args:
             repository (Repository): github.Repository instance.
+            engine (QueryEngine | str, optional): the engine to fetch the pull requests with. Defaults to QueryEngine.REST.
+            tag_index (TagIndex, optional): index of the tags and commits dates. Defaults to None (in memory index).
+            store (PullRequestStore, optional): local store of the merged pull requests. Defaults to None (no store).
+            client (GithubClient, optional): asyncio transport for the REST requests of the tags, commits, compare,
+                contents and pull requests (concurrent requests, instead of PyGithub's blocking requests one by one).
+                The client is closed with the repository (see `close`). Defaults to None (PyGithub).
+            lazy_bodies (bool, optional): If True, the pull requests are queried without their bodies (where the query
+                allows it: GraphQL, compare and the local store), and the bodies are loaded in batches on the first access,
+                only for the pull requests that passed the filter. Defaults to False.
+            pull_request_filter (Callable[[GithubPullRequest], bool], optional): filter of the pull requests by their
+                metadata (title, author, number, merge time), before their bodies are loaded. Defaults to None (all).
         """
         self._repository = repository
-        self._tmp_dir = Path(mkdtemp())
+        self._engine = QueryEngine(engine)
+        self._tag_index = tag_index or TagIndex()
+        self._store = store
+        self._client = client
+        self._lazy_bodies = lazy_bodies
+        self._pull_request_filter = pull_request_filter
+        self._body_loader = BodyLoader(self.fetch_bodies)
+        self._synced = False
+        self._contents = ContentStore()
+        self._directories: dict[tuple[str, Optional[str]], dict[str, str]] = {}
+        self._directories_lock = threading.Lock()
+        self._tmp_dir: Optional[tempfile.TemporaryDirectory] = None
+
+    def __enter__(self) -> GithubRepository:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Save the index of the tags and commits dates (see `TagIndex.close`), close the connections of the client, and
+        remove the temp directory of the downloaded files."""
+        self._tag_index.close()
+        if self._client is not None:
+            self._client.close()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
 
     @property
     def repository(self) -> Repository:
@@ -49,6 +933,112 @@ class GithubRepository:
         """
         return self._repository
 
+    @property
+    def engine(self) -> QueryEngine:
+        """
+        Returns:
+            QueryEngine: the engine to fetch the pull requests with.
+        """
+        return self._engine
+
+    @property
+    def tag_index(self) -> TagIndex:
+        """
+        Returns:
+            TagIndex: index of the tags and commits dates.
+        """
+        return self._tag_index
+
+    @property
+    def store(self) -> Optional[PullRequestStore]:
+        """
+        Returns:
+            Optional[PullRequestStore]: local store of the merged pull requests, if any.
+        """
+        return self._store
+
+    @property
+    def client(self) -> Optional[GithubClient]:
+        """
+        Returns:
+            Optional[GithubClient]: the asyncio transport of the REST requests, if any.
+        """
+        return self._client
+
+    def fetch_bodies(self, numbers: list[int]) -> dict[int, Optional[str]]:
+        """Fetch the bodies of the given pull requests (from the local store if there is one, else from GitHub).
+
+        Args:
+            numbers (list[int]): the pull requests numbers.
+
+        Returns:
+            dict[int, Optional[str]]: mapping between the number to the body, for the pull requests that found.
+        """
+        bodies = self._store.get_bodies(numbers) if self._store is not None else {}
+        if missing := [number for number in numbers if number not in bodies]:
+            logging.debug("Fetching the bodies of %s pull requests", len(missing))
+            bodies |= {pull_request.number: pull_request.comment for pull_request in self.get_pull_requests_by_numbers(missing)}
+        return bodies
+
+    def select(self, pull_requests: Iterable[GithubPullRequest]) -> Iterator[GithubPullRequest]:
+        """Filter the given pull requests by the filter of the repository, and attach the pull requests without bodies to
+        the loader of the bodies.
+
+        Args:
+            pull_requests (Iterable[GithubPullRequest]): the pull requests.
+
+        Yields:
+            GithubPullRequest: the pull requests that passed the filter.
+        """
+        for pull_request in pull_requests:
+            if self._pull_request_filter is None or self._pull_request_filter(pull_request):
+                yield self._body_loader.attach(pull_request)
+
+    @property
+    def _per_page(self) -> int:
+        """
+        Returns:
+            int: the number of items per page of the REST requests of PyGithub.
+        """
+        return self._repository._requester.per_page  # pylint: disable=protected-access
+
+    @cached_property
+    def graphql_url(self) -> str:
+        """
+        Returns:
+            str: URL of the GraphQL endpoint, based on the REST URL of the repository (supports GitHub Enterprise).
+        """
+        url = urlparse(self._repository.url)
+        prefix = url.path.split("/repos/")[0]
+        prefix = prefix[: -len("/v3")] if prefix.endswith("/v3") else prefix
+        return f"{url.scheme}://{url.netloc}{prefix}/graphql"
+
+    def graphql(self, query: str, partial: bool = False, **variables: Any) -> dict[str, Any]:
+        """Run a single GraphQL query, with the same connection (and token) of the repository.
+
+        Args:
+            query (str): the GraphQL query.
+            partial (bool, optional): If True, errors (for example, objects that not found) are logged and the partial
+                data is returned. Defaults to False.
+            **variables (Any): the variables of the query.
+
+        Raises:
+            GithubException: if the response contains errors (and `partial` is False).
+
+        Returns:
+            dict[str, Any]: the "data" of the response.
+        """
+        requester = self._repository._requester  # pylint: disable=protected-access
+        headers, response = requester.requestJsonAndCheck(
+            "POST", self.graphql_url, input={"query": query, "variables": variables}
+        )
+        if response.get("errors"):
+            if not partial or not response.get("data"):
+                raise GithubException(200, response, headers)
+            for error in response["errors"]:
+                logging.warning("GraphQL error: %s", error.get("message"))
+        return response["data"]
+
     @cached_property
     def tags(self) -> dict[str, Tag]:
         """
@@ -72,27 +1062,155 @@ class GithubRepository:
             return tag
         assert tag, f"No such tag: '{tag_name}'"
 
-    def download_file(self, relative_path: str) -> Optional[Path]:
-        """Download a single file to the temp path as defined in __init__, and returns the new path.
+    def get_tag_sha(self, tag_name: str) -> str:
+        """Get the commit sha of the given tag, by a direct lookup of the tag reference (and the tag object, for annotated tags).
+
+        Args:
+            tag_name (str): the name of the tag.
+
+        Returns:
+            str: the sha of the commit that the tag points to.
+        """
+        if sha := self._tag_index.get_sha(tag_name):
+            return sha
+        logging.info("Fetching the tag: '%s'", tag_name)
+        requester = self._repository._requester  # pylint: disable=protected-access
+        get_json = self._client.get_json if self._client else lambda url: requester.requestJsonAndCheck("GET", url)[1]
+        try:
+            ref = get_json(f"{self._repository.url}/git/ref/tags/{quote(tag_name)}")
+        except UnknownObjectException:
+            ref = None
+        assert ref, f"No such tag: '{tag_name}'"
+        sha, object_type = ref["object"]["sha"], ref["object"]["type"]
+        while object_type == "tag":  # annotated tag
+            tag_object = get_json(f"{self._repository.url}/git/tags/{sha}")["object"]
+            sha, object_type = tag_object["sha"], tag_object["type"]
+        self._tag_index.add_tag(tag_name, sha)
+        return sha
+
+    def get_commit_date(self, sha: str) -> datetime:
+        """Get the (author) date of the given commit.
+
+        Args:
+            sha (str): the commit sha.
+
+        Returns:
+            datetime: the date of the commit.
+        """
+        if date := self._tag_index.get_date(sha):
+            return date
+        if self._client:
+            date = parse_github_datetime(self._client.get_json(f"{self._repository.url}/git/commits/{sha}")["author"]["date"])
+        else:
+            date = self._repository.get_git_commit(sha).author.date
+        self._tag_index.add_commit(sha, date)
+        return date
+
+    def get_tag_date(self, tag_name: str) -> datetime:
+        """
+        Args:
+            tag_name (str): the name of the tag.
+
+        Returns:
+            datetime: the (author) date of the commit of the given tag.
+        """
+        return self.get_commit_date(self.get_tag_sha(tag_name))
+
+    def get_file_content(self, relative_path: str, reference: str = None) -> Optional[bytes]:
+        """Download the content of a single file (a request per file, see `read_file`).
 
         Args:
             relative_path (str): path of the file, relative to the top of the repository.
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None (the default branch).
 
         Returns:
-            Optional[Path]: Path object of the downloaded file if found, else None.
+            Optional[bytes]: the content of the file if found, else None.
         """
         with LogLevel(logging.INFO if "DEBUG" not in os.environ else logging.DEBUG):
-            new_path = self._tmp_dir / Path(relative_path).name
             try:
-                downloaded_file = self._repository.get_contents(relative_path)
+                if self._client:
+                    params = {"ref": reference} if reference else {}
+                    return self._client.get_raw(f"{self._repository.url}/contents/{quote(relative_path)}", **params)
+                if reference:
+                    return self._repository.get_contents(relative_path, ref=reference).decoded_content
+                return self._repository.get_contents(relative_path).decoded_content
             except UnknownObjectException:
                 logging.warning("Didn't find the path for: <top of the repository>/%s", relative_path)
                 return None
-            with open(new_path, "wb") as file:
-                file.write(downloaded_file.decoded_content)
-            return new_path
 
-    def get_pull_requests_between_dates(self, from_date: datetime, to_date: datetime = None) -> set[PullRequest]:
+    def get_directory(self, directory: str = ".rnotes", reference: str = None) -> dict[str, str]:
+        """Get all the files of the given directory (not recursive) at the given reference, with a single GraphQL query.
+        The contents are kept in memory (by their blob sha), and every directory is queried once per instance.
+
+        Args:
+            directory (str, optional): path of the directory, relative to the top of the repository. Defaults to ".rnotes".
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None (the default branch).
+
+        Returns:
+            dict[str, str]: mapping between the paths of the files (relative to the top of the repository) to their blob sha.
+        """
+        with self._directories_lock:
+            if (directory, reference) in self._directories:
+                return self._directories[(directory, reference)]
+            logging.info("Fetching the directory: <top of the repository>/%s (reference: '%s')", directory, reference or "HEAD")
+            data = self.graphql(
+                DIRECTORY_GRAPHQL_QUERY,
+                owner=self._repository.owner.login,
+                name=self._repository.name,
+                expression=f"{reference or 'HEAD'}:{'' if directory == '.' else directory}",  # the root tree is '<reference>:'
+            )
+            files: dict[str, str] = {}
+            for entry in (data["repository"]["object"] or {}).get("entries", []):
+                if entry["type"] != "blob":
+                    continue
+                path = str(PurePosixPath(directory) / entry["name"])
+                blob = entry["object"] or {}
+                if entry["oid"] not in self._contents:
+                    if blob.get("text") is not None and not blob.get("isTruncated"):
+                        self._contents.add(blob["text"].encode(), sha=entry["oid"])
+                    elif (content := self.get_file_content(path, reference=reference)) is not None:
+                        self._contents.add(content, sha=entry["oid"])
+                files[path] = entry["oid"]
+            self._directories[(directory, reference)] = files
+            return files
+
+    def read_file(self, relative_path: str, reference: str = None) -> Optional[str]:
+        """Read a single file (from the directory of the file, that is fetched at once, see `get_directory`).
+
+        Args:
+            relative_path (str): path of the file, relative to the top of the repository.
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None (the default branch).
+
+        Returns:
+            Optional[str]: the content of the file if found, else None.
+        """
+        files = self.get_directory(str(PurePosixPath(relative_path).parent), reference=reference)
+        content = self._contents.get(files[relative_path]) if relative_path in files else None
+        if content is None:
+            logging.warning("Didn't find the path for: <top of the repository>/%s", relative_path)
+            return None
+        return content.decode()
+
+    def download_file(self, relative_path: str, reference: str = None) -> Optional[Path]:
+        """Download a single file to a temp directory (that is removed when this instance is closed), and returns the new
+        path.
+
+        Args:
+            relative_path (str): path of the file, relative to the top of the repository.
+            reference (str, optional): tag name, branch name or commit sha. Defaults to None (the default branch).
+
+        Returns:
+            Optional[Path]: Path object of the downloaded file if found, else None.
+        """
+        content = self.read_file(relative_path, reference=reference)
+        if content is None:
+            return None
+        self._tmp_dir = self._tmp_dir or tempfile.TemporaryDirectory(prefix="rnotes-")
+        new_path = Path(self._tmp_dir.name) / Path(relative_path).name
+        new_path.write_text(content)
+        return new_path
+
+    def get_pull_requests_between_dates(self, from_date: datetime, to_date: datetime = None) -> list[GithubPullRequest]:
         """Get all the pull requested that merged between the given 2 dates.
 
         Args:
@@ -100,23 +1218,384 @@ class GithubRepository:
             to_date (datetime, optional): date to end the query. Defaults to Now.
 
         Returns:
-            set[PullRequest]: Set of all the github.PullRequest objects between the given 2 dates.
+            list[GithubPullRequest]: List of all the pull requests between the given 2 dates (in the order of the query).
         """
         logging.info(
             "Fetching all the pull requests between: ['%s' < PR merged time <= '%s']", from_date, to_date if to_date else "Now"
         )
+        relevant_pulls = list(map(to_github_pull_request, self.iter_pull_requests_rest(from_date=from_date, to_date=to_date)))
+        logging.info("Found %s pull requests", len(relevant_pulls))
+        return relevant_pulls
+
+    def iter_pull_requests_rest(self, from_date: datetime, to_date: datetime = None) -> Iterator[PullRequest]:
+        """Iterate over all the pull requested that merged between the given 2 dates, using the REST API.
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Yields:
+            PullRequest: the github.PullRequest objects between the given 2 dates (in the order of the query, every
+                object is dropped by the iteration as soon as the next one is yielded).
+        """
         to_date = to_date or datetime.max
-        relevant_pulls = set()
         all_pulls = self._repository.get_pulls(state="closed", sort="merged", direction="desc")
-        for pr in all_pulls:
+        for pr in iter_paginated(all_pulls, per_page=self._per_page):
             if pr.merged_at is None:
                 continue
             if from_date < pr.merged_at <= to_date:
-                relevant_pulls.add(pr)
+                yield pr
             if pr.merged_at < from_date:
                 break
-        logging.info("Found %s pull requests", len(relevant_pulls))
-        return relevant_pulls
+
+    def iter_pull_requests_client(self, from_date: datetime, to_date: datetime = None) -> Iterator[GithubPullRequest]:
+        """Iterate over all the pull requested that merged between the given 2 dates, using the REST API with the asyncio
+        transport (pages of the recently updated pull requests are fetched concurrently, until the pages are older than
+        `from_date` - a pull request that merged after this date, was updated after it too).
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Yields:
+            GithubPullRequest: the pull requests between the given 2 dates (in the order of the query).
+        """
+        to_date = to_date or datetime.max
+        pages = self._client.iter_pages(f"{self._repository.url}/pulls", state="closed", sort="updated", direction="desc")
+        for item in pages:
+            if parse_github_datetime(item["updated_at"]) < from_date:
+                break
+            pull_request = from_rest_json(item)
+            if pull_request.merged_at is not None and from_date < pull_request.merged_at <= to_date:
+                yield pull_request
+
+    def iter_graphql_pull_requests(self, body: bool = True) -> Iterator[tuple[GithubPullRequest, datetime]]:
+        """Iterate over all the merged pull requests (100 per request), using the GraphQL API.
+
+        Args:
+            body (bool, optional): If False, the bodies are not queried (they are NOT_LOADED). Defaults to True.
+
+        Yields:
+            tuple[GithubPullRequest, datetime]: the pull request and its update time, the most recently updated first.
+        """
+        cursor = None
+        while True:
+            data = self.graphql(
+                PULL_REQUESTS_GRAPHQL_QUERY if body else PULL_REQUESTS_METADATA_GRAPHQL_QUERY,
+                owner=self._repository.owner.login,
+                name=self._repository.name,
+                cursor=cursor,
+            )
+            pull_requests = data["repository"]["pullRequests"]
+            for node in pull_requests["nodes"]:
+                yield from_graphql_node(node), parse_github_datetime(node["updatedAt"])
+            if not pull_requests["pageInfo"]["hasNextPage"]:
+                return
+            cursor = pull_requests["pageInfo"]["endCursor"]
+
+    def iter_pull_requests_graphql(self, from_date: datetime, to_date: datetime = None) -> Iterator[GithubPullRequest]:
+        """Iterate over all the pull requests that merged between the given 2 dates, using the GraphQL API.
+
+        The pull requests are ordered by their update time (descending), and since a pull request is always
+        updated when it merged, the iteration stops at the first pull request that updated before `from_date`.
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Yields:
+            GithubPullRequest: the pull requests between the given 2 dates (in the order of the query).
+        """
+        to_date = to_date or datetime.max
+        for pull_request, updated_at in self.iter_graphql_pull_requests(body=not self._lazy_bodies):
+            if updated_at <= from_date:
+                return
+            if pull_request.merged_at is not None and from_date < pull_request.merged_at <= to_date:
+                yield pull_request
+
+    def iter_updated_pull_requests(self, since: datetime = None) -> Iterator[tuple[GithubPullRequest, datetime]]:
+        """Iterate over all the merged pull requests that updated (merged, edited, etc.) since the given date.
+
+        Args:
+            since (datetime, optional): the minimal update time. Defaults to None (all the merged pull requests).
+
+        Yields:
+            tuple[GithubPullRequest, datetime]: the pull request and its update time, the most recently updated first.
+        """
+        if self._engine == QueryEngine.GRAPHQL:
+            pull_requests = self.iter_graphql_pull_requests()
+        else:
+            pull_requests = (
+                (to_github_pull_request(pull_request), pull_request.updated_at)
+                for pull_request in iter_paginated(
+                    self._repository.get_pulls(state="closed", sort="updated", direction="desc"), per_page=self._per_page
+                )
+            )
+        for pull_request, updated_at in pull_requests:
+            if since is not None and updated_at < since:
+                return
+            if pull_request.merged_at is not None:
+                yield pull_request, updated_at
+
+    def iter_pull_requests_search(self, from_date: datetime, to_date: datetime = None) -> Iterator[GithubPullRequest]:
+        """Iterate over all the pull requests that merged between the given 2 dates, using the search API.
+
+        Only the pull requests that merged in the window are returned by the server, and since the search API returns
+        up to SEARCH_RESULTS_LIMIT results per query, windows with more results are split into 2 sub windows (recursively).
+        A window that can't be split anymore (a single second) and still has too many results is listed with the GraphQL
+        engine instead (with a warning), so no pull request is dropped.
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Yields:
+            GithubPullRequest: the pull requests between the given 2 dates (in the order of the query).
+        """
+        requester = self._repository._requester  # pylint: disable=protected-access
+        to_date = to_date or datetime.utcnow()
+        windows = [(from_date, to_date)]
+        seen: set[int] = set()
+        while windows:
+            start, end = windows.pop()
+            query = (
+                f"repo:{self._repository.full_name} is:pr is:merged "
+                f"merged:{start:%Y-%m-%dT%H:%M:%S}+00:00..{end:%Y-%m-%dT%H:%M:%S}+00:00"
+            )
+            page = 1
+            while True:
+                _, data = requester.requestJsonAndCheck(
+                    "GET", "/search/issues", parameters={"q": query, "per_page": 100, "page": page}
+                )
+                if page == 1 and data["total_count"] > SEARCH_RESULTS_LIMIT and end - start > timedelta(seconds=1):
+                    middle = (start + (end - start) / 2).replace(microsecond=0)
+                    logging.debug("Too many results (%s), split the window at: '%s'", data["total_count"], middle)
+                    windows += [(middle, end), (start, middle)]
+                    break
+                if page == 1 and data["total_count"] > SEARCH_RESULTS_LIMIT:
+                    logging.warning(
+                        "Too many results (%s) in the window: ['%s'..'%s'], listing it with the GraphQL engine instead",
+                        data["total_count"],
+                        start,
+                        end,
+                    )
+                    window = self.iter_pull_requests_graphql(from_date=start - timedelta(seconds=1), to_date=end)
+                    pull_requests = (pull_request for pull_request in window if pull_request.number not in seen)
+                else:
+                    pull_requests = (
+                        GithubPullRequest(
+                            name=item["title"],
+                            url=item["html_url"],
+                            author=item["user"]["login"] if item["user"] else "ghost",
+                            comment=item["body"],
+                            number=item["number"],
+                            merged_at=parse_github_datetime(item.get("pull_request", {}).get("merged_at") or item["closed_at"]),
+                        )
+                        for item in data["items"]
+                        if item["number"] not in seen
+                    )
+                for pull_request in pull_requests:
+                    if from_date < pull_request.merged_at <= to_date:
+                        seen.add(pull_request.number)
+                        yield pull_request
+                if data["total_count"] > SEARCH_RESULTS_LIMIT or page * 100 >= data["total_count"]:
+                    break
+                page += 1
+
+    def get_commits_between(self, base: str, head: str) -> list[str]:
+        """Get all the commits that reachable from `head` and not from `base`, using the compare API (100 per request).
+
+        Args:
+            base (str): tag name, branch name or commit sha to start from.
+            head (str): tag name, branch name or commit sha to end at.
+
+        Returns:
+            list[str]: the sha of the commits.
+        """
+        url = f"{self._repository.url}/compare/{quote(base)}...{quote(head)}"
+        requester = self._repository._requester  # pylint: disable=protected-access
+        shas: list[str] = []
+        page = 1
+        while True:
+            _, data = requester.requestJsonAndCheck("GET", url, parameters={"per_page": 100, "page": page})
+            shas += [commit["sha"] for commit in data["commits"]]
+            if len(data["commits"]) < 100 or len(shas) >= data["total_commits"]:
+                break
+            if self._client:  # the number of pages is known, fetch the rest of the pages concurrently
+                for commits in self._client.get_pages(url, range(page + 1, -(-data["total_commits"] // 100) + 1)):
+                    shas += [commit["sha"] for commit in commits]
+                break
+            page += 1
+        logging.info("Found %s commits between: '%s'...'%s'", len(shas), base, head)
+        return shas
+
+    def iter_commits_pull_requests(self, shas: list[str], body: bool = True) -> Iterator[tuple[str, GithubPullRequest]]:
+        """Iterate over the merged pull requests that associated with the given commits, using batched GraphQL queries.
+
+        Args:
+            shas (list[str]): the commits sha.
+            body (bool, optional): If False, the bodies are not queried (they are NOT_LOADED). Defaults to True.
+
+        Yields:
+            tuple[str, GithubPullRequest]: the sha of the first given commit that associated with the pull request, and
+                the pull request (every pull request once).
+        """
+        seen: set[int] = set()
+        for index in range(0, len(shas), COMMITS_PULL_REQUESTS_BATCH_SIZE):
+            batch = shas[index : index + COMMITS_PULL_REQUESTS_BATCH_SIZE]
+            query = commits_pull_requests_graphql_query(batch, body=body)
+            data = self.graphql(query, owner=self._repository.owner.login, name=self._repository.name)
+            for alias, commit in data["repository"].items():
+                for node in commit["associatedPullRequests"]["nodes"] if commit else []:
+                    if node["mergedAt"] is None or node["number"] in seen:
+                        continue
+                    seen.add(node["number"])
+                    yield batch[int(alias[1:])], from_graphql_node(node)
+
+    def iter_pull_requests_of_commits(self, shas: list[str], body: bool = True) -> Iterator[GithubPullRequest]:
+        """Iterate over the merged pull requests that associated with the given commits (see `iter_commits_pull_requests`).
+
+        Args:
+            shas (list[str]): the commits sha.
+            body (bool, optional): If False, the bodies are not queried (they are NOT_LOADED). Defaults to True.
+
+        Yields:
+            GithubPullRequest: the pull requests (every pull request once).
+        """
+        for _, pull_request in self.iter_commits_pull_requests(shas, body=body):
+            yield pull_request
+
+    def get_pull_requests_by_numbers(self, numbers: list[int]) -> list[GithubPullRequest]:
+        """Get the given pull requests, using batched GraphQL queries (or concurrent REST requests, with the asyncio transport).
+
+        Args:
+            numbers (list[int]): the pull requests numbers.
+
+        Returns:
+            list[GithubPullRequest]: the pull requests that found (in the order of the given numbers).
+        """
+        if self._client:
+            urls = [f"{self._repository.url}/pulls/{int(number)}" for number in numbers]
+            return [from_rest_json(item) for item in self._client.get_many(urls, missing_ok=True) if item]
+        pull_requests: list[GithubPullRequest] = []
+        for index in range(0, len(numbers), COMMITS_PULL_REQUESTS_BATCH_SIZE):
+            query = pull_requests_graphql_query(numbers[index : index + COMMITS_PULL_REQUESTS_BATCH_SIZE])
+            data = self.graphql(query, partial=True, owner=self._repository.owner.login, name=self._repository.name)
+            pull_requests += [from_graphql_node(node) for node in data["repository"].values() if node]
+        return pull_requests
+
+    def get_pull_requests_between_commits(self, base: str, head: str) -> list[GithubPullRequest]:
+        """Get all the pull requests of the commits between the given 2 references (based on the commits graph).
+
+        Args:
+            base (str): tag name, branch name or commit sha to start from.
+            head (str): tag name, branch name or commit sha to end at.
+
+        Returns:
+            list[GithubPullRequest]: List of all the pull requests between the 2 references, ordered by the merge time.
+        """
+        logging.info("Fetching all the pull requests (compare) of the commits between: '%s'...'%s'", base, head)
+        shas = self.get_commits_between(base=base, head=head)
+        pull_requests = list(self.select(self.iter_pull_requests_of_commits(shas, body=not self._lazy_bodies)))
+        logging.info("Found %s pull requests", len(pull_requests))
+        return sorted(pull_requests, key=lambda pr: pr.merged_at)
+
+    def sync_store(self, from_date: datetime = None) -> None:
+        """Update the local store with all the pull requests that merged or edited since its last sync.
+
+        If the store doesn't cover the given date yet, all the pull requests that updated since this date are fetched
+        (a pull request that merged after this date, was updated after it too).
+
+        Args:
+            from_date (datetime, optional): the store must cover the pull requests that merged after this date.
+                Defaults to None (the whole history of the repository).
+        """
+        covered = self._store.covers(from_date)
+        covered_from, synced_until = self._store.covered_from, self._store.synced_until
+        since = synced_until if covered else from_date
+        logging.info("Syncing the local store of pull requests (updated since: '%s')", since or "Ever")
+        count = 0
+        for pull_request, updated_at in self.iter_updated_pull_requests(since=since):
+            self._store.add(pull_request, updated_at)
+            synced_until = max(synced_until or updated_at, updated_at)
+            count += 1
+        self._store.set_coverage(covered_from=covered_from if covered else from_date, synced_until=synced_until)
+        self._synced = True
+        logging.info("Synced %s pull requests to the local store: %s", count, self._store.path)
+
+    def iter_fetch_pull_requests(self, from_date: datetime, to_date: datetime = None) -> Iterator[GithubPullRequest]:
+        """Iterate over all the pull requested that merged between the given 2 dates, with the engine of the repository.
+
+        The pull requests are yielded as soon as their page arrives (in the order of the query, not by the merge time),
+        so they can be processed while the next pages are fetched. If the repository has a local store, the store is
+        synced (once per instance, or if it doesn't cover the given dates yet), and the pull requests are queried from the store.
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Yields:
+            GithubPullRequest: the pull requests between the given 2 dates.
+        """
+        if self._store is not None:
+            if not self._synced or not self._store.covers(from_date):
+                self.sync_store(from_date=from_date)
+            pull_requests = self._store.get_pull_requests(from_date=from_date, to_date=to_date, body=not self._lazy_bodies)
+            logging.info("Found %s pull requests (local store)", len(pull_requests))
+            yield from self.select(pull_requests)
+            return
+        logging.info(
+            "Fetching all the pull requests (%s) between: ['%s' < PR merged time <= '%s']",
+            self._engine.value,
+            from_date,
+            to_date if to_date else "Now",
+        )
+        if self._engine == QueryEngine.REST and self._client:
+            pull_requests = self.iter_pull_requests_client(from_date=from_date, to_date=to_date)
+        elif self._engine == QueryEngine.REST:
+            pull_requests = map(to_github_pull_request, self.iter_pull_requests_rest(from_date=from_date, to_date=to_date))
+        else:
+            iter_pull_requests = {
+                QueryEngine.GRAPHQL: self.iter_pull_requests_graphql,
+                QueryEngine.SEARCH: self.iter_pull_requests_search,
+            }[self._engine]
+            pull_requests = iter_pull_requests(from_date=from_date, to_date=to_date)
+        count = 0
+        for count, pull_request in enumerate(self.select(pull_requests), start=1):
+            yield pull_request
+        logging.info("Found %s pull requests", count)
+
+    def fetch_pull_requests(self, from_date: datetime, to_date: datetime = None) -> list[GithubPullRequest]:
+        """Get all the pull requested that merged between the given 2 dates, with the engine of the repository.
+
+        Args:
+            from_date (datetime): date to start the query.
+            to_date (datetime, optional): date to end the query. Defaults to Now.
+
+        Returns:
+            list[GithubPullRequest]: List of all the pull requests between the given 2 dates, ordered by the merge time.
+        """
+        return sorted(self.iter_fetch_pull_requests(from_date=from_date, to_date=to_date), key=lambda pr: pr.merged_at)
+
+    def iter_pull_requests(self, from_tag_name: str, to_tag_name: str = None) -> Iterator[GithubPullRequest]:
+        """Iterate over all the pull requested that merged between the given 2 tags, as soon as their page arrives
+        (streaming version of `get_pull_requests`, the pull requests are not ordered by the merge time).
+
+        Args:
+            from_tag_name (str): tag to start the query.
+            to_tag_name (str, optional): tag to end the query. Defaults to None (all the commits from the `from_tag`).
+
+        Yields:
+            GithubPullRequest: the pull requests between the 2 tags.
+        """
+        if self._engine == QueryEngine.COMPARE:
+            head = to_tag_name or self._repository.default_branch
+            shas = self.get_commits_between(base=from_tag_name, head=head)
+            yield from self.select(self.iter_pull_requests_of_commits(shas, body=not self._lazy_bodies))
+            return
+        from_date = self.get_tag_date(tag_name=from_tag_name)
+        to_date = self.get_tag_date(tag_name=to_tag_name) if to_tag_name else None
+        yield from self.iter_fetch_pull_requests(from_date=from_date, to_date=to_date)
 
     def get_pull_requests(self, from_tag_name: str, to_tag_name: str = None) -> list[GithubPullRequest]:
         """Get all the pull requested that merged between the given 2 tags, based on the time that the pull requested merged,
@@ -130,18 +1609,80 @@ class GithubRepository:
             list[GithubPullRequest]: List of all the pull requests (GithubPullRequest object) between the 2 tags.
         """
         with LogLevel(logging.INFO if "DEBUG" not in os.environ else logging.DEBUG):
-            from_date = self.get_tag(tag_name=from_tag_name).commit.commit.author.date
-            to_date = self.get_tag(tag_name=to_tag_name).commit.commit.author.date if to_tag_name else None
-            pull_requests = self.get_pull_requests_between_dates(from_date=from_date, to_date=to_date)
-            return [
-                GithubPullRequest(
-                    name=pull_request.title,
-                    url=pull_request.html_url,
-                    author=pull_request.user.login,
-                    comment=pull_request.body,
+            if self._engine == QueryEngine.COMPARE:
+                return self.get_pull_requests_between_commits(
+                    base=from_tag_name, head=to_tag_name or self._repository.default_branch
                 )
-                for pull_request in sorted(pull_requests, key=lambda pr: pr.merged_at)
-            ]
+            from_date = self.get_tag_date(tag_name=from_tag_name)
+            to_date = self.get_tag_date(tag_name=to_tag_name) if to_tag_name else None
+            return self.fetch_pull_requests(from_date=from_date, to_date=to_date)
+
+    def get_tag_names(self, pattern: str = "*") -> list[str]:
+        """
+        Args:
+            pattern (str, optional): shell-style pattern of the tags names (for example: "v1.*"). Defaults to "*" (all).
+
+        Returns:
+            list[str]: the names of the tags that match the pattern, ordered by the dates of their commits (the commits
+                are taken from the tags listing, and only the dates that are not in the index are fetched).
+        """
+        tags = {tag_name: tag.commit.sha for tag_name, tag in self.tags.items() if fnmatch(tag_name, pattern)}
+        for tag_name, sha in tags.items():
+            self._tag_index.add_tag(tag_name, sha)
+        dates = self.get_commit_dates(list(dict.fromkeys(tags.values())))
+        return sorted(tags, key=lambda tag_name: dates[tags[tag_name]])
+
+    def get_commit_dates(self, shas: list[str]) -> dict[str, datetime]:
+        """Get the (author) dates of the given commits (the dates that are not in the index are fetched concurrently,
+        with the asyncio transport).
+
+        Args:
+            shas (list[str]): the commits sha.
+
+        Returns:
+            dict[str, datetime]: mapping between the sha to the date of the commit.
+        """
+        missing = [sha for sha in shas if self._tag_index.get_date(sha) is None]
+        if missing and self._client:
+            logging.info("Fetching the dates of %s commits", len(missing))
+            commits = self._client.get_many([f"{self._repository.url}/git/commits/{sha}" for sha in missing])
+            for sha, commit in zip(missing, commits):
+                self._tag_index.add_commit(sha, parse_github_datetime(commit["author"]["date"]))
+        return {sha: self.get_commit_date(sha) for sha in shas}
+
+    def get_pull_requests_by_ranges(self, tag_names: list[str]) -> list[list[GithubPullRequest]]:
+        """Get the pull requests of every range of consecutive tags (for example, [v1, v2, v3]: v1..v2 and v2..v3).
+
+        All the pull requests of the whole span are fetched at once, and bucketed to the ranges by the time that every
+        pull request merged (so the cost doesn't depend on the number of ranges). With the compare engine, the pull
+        requests are bucketed by their commits instead: a pull request belongs to the first range that contains one of
+        its commits (so a pull request that merged to a branch after the next tag still belongs to its range).
+
+        Args:
+            tag_names (list[str]): the names of the tags, ordered by the dates of their commits.
+
+        Returns:
+            list[list[GithubPullRequest]]: the pull requests of every range (len(tag_names) - 1 ranges), ordered by the merge time.
+        """
+        assert len(tag_names) >= 2, f"At least 2 tags are needed, got: {tag_names}"
+        ranges: list[list[GithubPullRequest]] = [[] for _ in tag_names[1:]]
+        with LogLevel(logging.INFO if "DEBUG" not in os.environ else logging.DEBUG):
+            if self._engine == QueryEngine.COMPARE:
+                commit_to_range: dict[str, int] = {}
+                for index, (base, head) in enumerate(zip(tag_names, tag_names[1:])):
+                    for sha in self.get_commits_between(base=base, head=head):
+                        commit_to_range.setdefault(sha, index)
+                for sha, pull_request in self.iter_commits_pull_requests(list(commit_to_range), body=not self._lazy_bodies):
+                    ranges[commit_to_range[sha]].append(pull_request)
+                return [sorted(self.select(pull_requests), key=lambda pr: pr.merged_at) for pull_requests in ranges]
+            dates = [self.get_tag_date(tag_name=tag_name) for tag_name in tag_names]
+            assert dates == sorted(dates), f"The tags are not ordered by the dates of their commits: {tag_names}"
+            pull_requests = self.fetch_pull_requests(from_date=dates[0], to_date=dates[-1])
+        for pull_request in pull_requests:
+            index = bisect_left(dates, pull_request.merged_at) - 1
+            if 0 <= index < len(ranges):
+                ranges[index].append(pull_request)
+        return ranges
 
     def get_pull_requests_by_commit(self, commit_sha_from: str, commit_sha_to: str) -> list[GithubPullRequest]:
         """Get all the pull requested that merged between the given 2 commits sha, based on the time that the pull requested merged,
@@ -155,18 +1696,11 @@ class GithubRepository:
             list[GithubPullRequest]: List of all the pull requests (GithubPullRequest object) between the 2 tags.
         """
         with LogLevel(logging.INFO if "DEBUG" not in os.environ else logging.DEBUG):
-            from_date = self._repository.get_commit(sha=commit_sha_from).commit.author.date
-            to_date = self._repository.get_commit(sha=commit_sha_to).commit.author.date
-            pull_requests = self.get_pull_requests_between_dates(from_date=from_date, to_date=to_date)
-            return [
-                GithubPullRequest(
-                    name=pull_request.title,
-                    url=pull_request.html_url,
-                    author=pull_request.user.login,
-                    comment=pull_request.body,
-                )
-                for pull_request in sorted(pull_requests, key=lambda pr: pr.merged_at)
-            ]
+            if self._engine == QueryEngine.COMPARE:
+                return self.get_pull_requests_between_commits(base=commit_sha_from, head=commit_sha_to)
+            from_date = self.get_commit_date(sha=commit_sha_from)
+            to_date = self.get_commit_date(sha=commit_sha_to)
+            return self.fetch_pull_requests(from_date=from_date, to_date=to_date)
 
 
 def get_repository(github: Github, repository_name: str) -> Optional[Repository]:
@@ -186,12 +1720,52 @@ def get_repository(github: Github, repository_name: str) -> Optional[Repository]
         return None
 
 
-def get_github_repository(repository_name: str, token: str = None) -> GithubRepository:
+def get_pull_request_store(repository_name: str) -> PullRequestStore:
+    """Get the local store of the pull requests of the given repository (in "pull_requests" in `get_cache_dir()`).
+
+    Args:
+        repository_name (str): the name of the repository.
+
+    Returns:
+        PullRequestStore: the local store of the pull requests.
+    """
+    return PullRequestStore(get_cache_dir("pull_requests") / f"{repository_name.replace('/', '__')}.sqlite")
+
+
+def get_github_repository(
+    repository_name: str,
+    token: str = None,
+    engine: QueryEngine | str = QueryEngine.REST,
+    use_cache: bool = False,
+    cache_dir: str | Path = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    use_store: bool = False,
+    scheduler: RequestScheduler = None,
+    async_transport: bool = False,
+    lazy_bodies: bool = False,
+    pull_request_filter: Callable[[GithubPullRequest], bool] = None,
+) -> GithubRepository:
     """Get the GithubRepository instance, based on the given repository_name and the token.
 
     Args:
         repository_name (str): the name of the repository.
         token (str, optional): GitHub personal token. Defaults: environment variable: GITHUB_TOKEN.
+        engine (QueryEngine | str, optional): the engine to fetch the pull requests with. Defaults to QueryEngine.REST.
+        use_cache (bool, optional): If True, the GET requests are sent as conditional requests, and the responses that
+            were not modified are served from a cache on the disk. Defaults to False.
+        cache_dir (str | Path, optional): directory of the responses cache. Defaults to "responses" in `get_cache_dir()`.
+        cache_size (int, optional): maximal size (in bytes) of the responses cache. Defaults to DEFAULT_CACHE_SIZE.
+            If `use_cache` is True, the tags index of the repository is also stored in "tags" in `get_cache_dir()`.
+        use_store (bool, optional): If True, the merged pull requests are mirrored to a local store (in "pull_requests"
+            in `get_cache_dir()`), that is synced incrementally and queried for every range of dates. Defaults to False.
+        scheduler (RequestScheduler, optional): the scheduler of all the requests (rate limits and concurrency).
+            Defaults to DEFAULT_SCHEDULER.
+        async_transport (bool, optional): If True, the REST requests of the tags, commits, compare, contents and pull
+            requests are sent concurrently with the asyncio transport (pooled HTTP/2 connections). Defaults to False.
+        lazy_bodies (bool, optional): If True, the bodies of the pull requests are loaded on demand (see GithubRepository).
+            Defaults to False.
+        pull_request_filter (Callable[[GithubPullRequest], bool], optional): filter of the pull requests by their metadata,
+            before their bodies are loaded. Defaults to None (all).
 
     Returns:
         GithubRepository: instance of the GithubRepository.
@@ -206,6 +1780,23 @@ def get_github_repository(repository_name: str, token: str = None) -> GithubRepo
     )
     with LogLevel(logging.INFO if "DEBUG" not in os.environ else logging.DEBUG):
         logging.info("Fetching the repository: '%s'", repository_name)
-        repository = get_repository(github=Github(token), repository_name=repository_name)
+        cache = ResponseCache(directory=cache_dir or get_cache_dir("responses"), max_size=cache_size) if use_cache else None
+        scheduler = scheduler or DEFAULT_SCHEDULER
+        with cached_connections(cache=cache, scheduler=scheduler):
+            repository = get_repository(github=Github(token), repository_name=repository_name)
         assert repository, f"Failed to get the repository: '{repository_name}'"
-        return GithubRepository(repository=repository)
+        tag_index = TagIndex(get_cache_dir("tags") / f"{repository.full_name.replace('/', '__')}.json") if use_cache else None
+        store = get_pull_request_store(repository.full_name) if use_store else None
+        client = None
+        if async_transport:
+            base_url = repository.url.split("/repos/")[0]
+            client = GithubClient(token=token, base_url=base_url, cache=cache, scheduler=scheduler)
+        return GithubRepository(
+            repository=repository,
+            engine=engine,
+            tag_index=tag_index,
+            store=store,
+            client=client,
+            lazy_bodies=lazy_bodies,
+            pull_request_filter=pull_request_filter,
+        )
@@ -1,24 +1,167 @@
 """This module implements the full flow of rnotes"""
 from __future__ import annotations
+import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 import tempfile
+from typing import Any, Callable, Iterable, Optional
 from rich import pretty, traceback
 import fire
 
 sys.path.insert(0, ".")
-from rnotes.utils import eval_file, import_file, init_log, get_file_name, to_html
-from rnotes.query import GithubPullRequest, GithubRepository, get_github_repository
-from rnotes.parser import CommentParser, load_grammar
-from rnotes.process import ReleaseData, Issue
-from rnotes.writer import ReleaseNotesWriter, load_template
+from rnotes.utils import eval_file, get_cache_dir, get_process_context, init_log, get_file_name, to_html
+from rnotes.query import GithubPullRequest, GithubRepository, QueryEngine, get_github_repository, get_pull_request_store
+from rnotes.local import LocalRepository
+from rnotes.scheduler import BudgetManager, RateLimitBudget, RequestScheduler
+from rnotes.parser import CommentParser, GrammarCache, ParseCache, load_grammar_file
+from rnotes.process import IssueTable, ReleaseData, Issue
+from rnotes.writer import ReleaseNotesWriter, compile_templates, load_template
 
 
 __docformat__ = "google"
 
 
+RNOTES_DIRECTORY = ".rnotes"
+"Directory of the input files (grammar, template and additional content) in the repository"
+
+
+def _read_rnotes_file(repository: GithubRepository | LocalRepository, name: str, reference: str = None) -> Optional[str]:
+    """Read a file of the ".rnotes" directory of the repository, in memory (the whole directory is fetched at once).
+
+    Returns:
+        Optional[str]: the content of the file if found, else None.
+    """
+    return repository.read_file(f"{RNOTES_DIRECTORY}/{name}", reference=reference)
+
+
+def _load_grammar(
+    repository: GithubRepository | LocalRepository,
+    grammar_path: str | Path = None,
+    reference: str = None,
+    use_cache: bool = False,
+) -> tuple[Any, dict[str, Any]]:
+    """Load the grammar (read it from the repository at the given reference, if the path not given) and its ordering lists.
+
+    Returns:
+        tuple[Any, dict[str, Any]]: the Grammar object, and the ordering arguments of ReleaseData.
+    """
+    source = None if grammar_path else _read_rnotes_file(repository, "grammar.py", reference)
+    assert grammar_path or source is not None, f"Didn't find the grammar file: {RNOTES_DIRECTORY}/grammar.py"
+    grammar, all_topics, all_types = load_grammar_file(
+        path=grammar_path or f"{RNOTES_DIRECTORY}/grammar.py",
+        source=source,
+        cache=GrammarCache(get_cache_dir("grammars")) if use_cache else None,
+    )
+    return grammar, dict(order_by_topics=all_topics, order_by_types=all_types)
+
+
+def _load_additional_content(
+    repository: GithubRepository | LocalRepository, additional_content_path: str | Path = None, reference: str = None
+) -> dict[str, Any]:
+    """Load the additional content (read it from the repository at the given reference, if the path not given).
+
+    Returns:
+        dict[str, Any]: the additional content (empty if there is no such file).
+    """
+    source = None if additional_content_path else _read_rnotes_file(repository, "additional_content.py", reference)
+    if not additional_content_path and source is None:
+        return {}
+    additional_content_path = additional_content_path or f"{RNOTES_DIRECTORY}/additional_content.py"
+    logging.info("Loading the additional content file from: %s", additional_content_path)
+    additional_content = eval_file(additional_content_path, source=source)
+    assert isinstance(additional_content, dict), f"Failed to eval the file: {additional_content_path} (expected dict)"
+    return additional_content
+
+
+def _load_template(
+    repository: GithubRepository | LocalRepository,
+    release_notes_path: str | Path = None,
+    reference: str = None,
+    use_cache: bool = False,
+    compiled_templates_path: str | Path = None,
+):
+    """Load the release notes template (read it from the repository at the given reference, if the path not given).
+
+    Returns:
+        The template object.
+    """
+    if compiled_templates_path:
+        return load_template(path=release_notes_path or "release_notes.j2", compiled_path=compiled_templates_path)
+    if release_notes_path:
+        return load_template(path=release_notes_path, use_cache=use_cache)
+    source = _read_rnotes_file(repository, "release_notes.j2", reference)
+    assert source is not None, f"Didn't find the release notes template file: {RNOTES_DIRECTORY}/release_notes.j2"
+    return load_template(
+        path=f"{RNOTES_DIRECTORY}/release_notes.j2", sources={"release_notes.j2": source}, use_cache=use_cache
+    )
+
+
+def _get_pull_request_filter(exclude_authors: list[str] = None) -> Optional[Callable[[GithubPullRequest], bool]]:
+    """
+    Returns:
+        Optional[Callable[[GithubPullRequest], bool]]: filter of the pull requests by their metadata, if needed.
+    """
+    if not exclude_authors:
+        return None
+    exclude_authors = set(exclude_authors)
+    return lambda pull_request: pull_request.author not in exclude_authors
+
+
+def _write_release_notes(
+    repository_name: str,
+    release_data: ReleaseData,
+    template: Any,
+    additional_content: dict[str, Any],
+    version_name: str,
+    output_dir: str | Path,
+    file_name: str | Path = None,
+    html: bool = True,
+    statistics: bool = False,
+    stream_render: bool = False,
+) -> Path:
+    """Add the tool name and the version name to the additional content, and write the release notes file (and the HTML,
+    and the statistics JSON).
+
+    Returns:
+        Path: the path of the release notes file.
+    """
+    # Add additional content:
+    tool_name = additional_content.get("tool_name") or repository_name.split("/")[1]
+    additional_content["tool_name"] = tool_name
+    additional_content["version_name"] = version_name
+    # Dump release notes:
+    file_name = file_name or get_file_name(tool_name, version_name)
+    writer = ReleaseNotesWriter(template=template)
+    if stream_render:
+        html_path = writer.write_stream(
+            output_dir=output_dir,
+            file_name=file_name,
+            release_data=release_data,
+            additional_content=additional_content,
+            html=html,
+        )
+    else:
+        writer.write(
+            output_dir=output_dir,
+            file_name=file_name,
+            release_data=release_data,
+            additional_content=additional_content,
+        )
+    path = (Path(output_dir) / file_name).resolve()
+    logging.info("Release notes path: %s", path.resolve())
+    if html:
+        html_path = html_path if stream_render else to_html(path)
+        logging.info("Release notes path (HTML): %s", html_path.resolve())
+    if statistics:
+        release_data.table.to_json(path.with_suffix(".json"))
+    return path
+
+
 def generate_release_notes(
     repository_name: str,
     from_tag: str,
@@ -31,7 +174,23 @@ def generate_release_notes(
     additional_content_path: str | Path = None,
     token: str = None,
     html: bool = True,
-) -> None:
+    engine: str = QueryEngine.REST,
+    use_cache: bool = False,
+    cache_dir: str | Path = None,
+    use_store: bool = False,
+    local_path: str | Path = None,
+    snapshot_path: str | Path = None,
+    stream: bool = False,
+    async_transport: bool = False,
+    scheduler: RequestScheduler = None,
+    lazy_bodies: bool = False,
+    exclude_authors: list[str] = None,
+    processes: int = 1,
+    window_size: int = None,
+    statistics: bool = False,
+    compiled_templates_path: str | Path = None,
+    stream_render: bool = False,
+) -> Path:
     """Create a release notes for the given repository.
 
     Args:
@@ -45,62 +204,338 @@ def generate_release_notes(
         file_name (str | Path, optional): Overwrite the file name of the release notes.
             Defaults to concatenation of the tool name and the version name.
         grammar_path (str | Path, optional): Grammar file (.py).
-            Defaults to the file in ".rnotes" of the given repository.
+            Defaults to the file in ".rnotes" of the given repository (as in `to_tag`).
         release_notes_path (str | Path, optional): Release notes template file (.j2).
-            Defaults to the file in ".rnotes" of the given repository.
+            Defaults to the file in ".rnotes" of the given repository (as in `to_tag`).
         additional_content_path (str | Path, optional): Additional content file (.py)
-            Defaults to the file in ".rnotes" of the given repository.
+            Defaults to the file in ".rnotes" of the given repository (as in `to_tag`).
         token (str, optional): GitHub personal token. Defaults: environment variable: GITHUB_TOKEN
         html (bool, optional): If True, generates html file of the release notes.
+        engine (str, optional): The engine to fetch the pull requests with ("rest", "graphql", "search" or
+            "compare"). Defaults to "rest".
+        use_cache (bool, optional): If True, responses of GitHub that were not modified are served from a cache on the disk,
+            the results of the parser are cached on the disk (by the grammar and the comment), and so are the compiled
+            grammar (by the source of the grammar file) and the compiled template (by its source), all in the environment
+            variable RNOTES_CACHE_DIR (or ~/.cache/rnotes). Defaults to False (opt-in, nothing is stored on the disk).
+        cache_dir (str | Path, optional): Directory of the responses cache.
+            Defaults to "responses" in the environment variable RNOTES_CACHE_DIR (or ~/.cache/rnotes).
+        use_store (bool, optional): If True, the merged pull requests are mirrored to a local SQLite store, that is synced
+            incrementally, so only pull requests that merged or edited since the previous run are fetched. Defaults to False.
+        local_path (str | Path, optional): Local clone of the repository. If given, the pull requests are found by the
+            commits between the 2 tags in the clone, and only the bodies that are not in the local store (or the snapshot)
+            are fetched from GitHub. Defaults to None (query GitHub).
+        snapshot_path (str | Path, optional): Exported snapshot of the pull requests (.json), used with `local_path`.
+        stream (bool, optional): If True, every pull request is parsed and processed as soon as its page arrives (instead of
+            after the last page), and the issues are ordered by their arrival (instead of the merge time). Defaults to False.
+        async_transport (bool, optional): If True, the REST requests to GitHub are sent concurrently over pooled HTTP/2
+            connections (asyncio transport), instead of one by one. Defaults to False.
+        scheduler (RequestScheduler, optional): The scheduler of the requests to GitHub (rate limits and concurrency).
+            Defaults to the default scheduler.
+        lazy_bodies (bool, optional): If True, the pull requests are queried without their bodies (where possible), and
+            the bodies are loaded in batches, only for the pull requests that passed the filters. Defaults to False.
+        exclude_authors (list[str], optional): Pull requests of these authors (for example, bots) are ignored before
+            their bodies are loaded. Defaults to None.
+        processes (int, optional): Number of processes that parse the comments (not used with `stream`).
+            Defaults to 1 (serial).
+        window_size (int, optional): If given, only the release notes section of every comment is parsed, truncated to
+            this number of characters (bounded time and memory for huge comments). Defaults to None (the whole comment).
+        statistics (bool, optional): If True, the statistics of the issues (counts by type, topic and author, and the
+            highlights) are exported to a JSON file, next to the release notes file. Defaults to False.
+        compiled_templates_path (str | Path, optional): Zip file (or directory) of precompiled templates (see the command
+            `compile`), that the release notes template is loaded from (by the name of `release_notes_path`, or
+            "release_notes.j2"). Defaults to None (the template is compiled, and cached on the disk if `use_cache`).
+        stream_render (bool, optional): If True, the release notes file and the HTML file are written while the template
+            is rendered, so the whole document is never kept in memory. The HTML is converted per markdown heading, so the
+            memory is bounded by the largest section: it stays flat only for templates with a heading per topic (with
+            the shipped template, the list of all the topics under "## Changes" is a single section). Defaults to False.
+
+    Returns:
+        Path: the path of the release notes file.
     """
     grammar_path = grammar_path or os.environ.get("RNOTES_GRAMMAR_PATH")
     release_notes_path = release_notes_path or os.environ.get("RNOTES_RELEASE_NOTES_PATH")
     additional_content_path = additional_content_path or os.environ.get("RNOTES_ADDITIONAL_CONTENT_PATH")
-    # Query the GitHub's repository and all comments between the 2 tags:
-    repository: GithubRepository = get_github_repository(repository_name=repository_name, token=token)
-    pull_requests: list[GithubPullRequest] = repository.get_pull_requests(from_tag, to_tag)
-    # Parse all the comments:
-    grammar_path = grammar_path or repository.download_file(".rnotes/grammar.py")
-    grammar = load_grammar(path=grammar_path)
-    parser = CommentParser(grammar=grammar)
-    all_comments = parser.parse_pull_requests(pull_requests=pull_requests)
-    # Process all the comments:
-    issues: list[Issue] = [Issue.from_comment(comment) for comment in all_comments]
-    grammar_module = import_file(grammar_path)
-    release_data = ReleaseData(
-        issues=issues,
-        order_by_topics=grammar_module.all_topics if "all_topics" in grammar_module.__dict__ else None,
-        order_by_types=grammar_module.all_types if "all_types" in grammar_module.__dict__ else None,
+    get_repository = partial(
+        get_github_repository,
+        repository_name=repository_name,
+        token=token,
+        engine=engine,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+        use_store=use_store,
+        async_transport=async_transport,
+        scheduler=scheduler,
+        lazy_bodies=lazy_bodies,
+        pull_request_filter=_get_pull_request_filter(exclude_authors),
     )
-    # Add additional content:
-    additional_content = {}
-    additional_content_path = additional_content_path or Path(repository.download_file(".rnotes/additional_content.py"))
-    if additional_content_path:
-        logging.info("Loading the additional content file from: %s", Path(additional_content_path).resolve())
-        additional_content = eval_file(additional_content_path)
-        assert isinstance(additional_content, dict), f"Failed to eval the file: {additional_content_path} (expected dict)"
-    version_name = version_name or to_tag
-    tool_name = additional_content.get("tool_name") or repository_name.split("/")[1]
-    additional_content["tool_name"] = tool_name
-    additional_content["version_name"] = version_name
-    # Dump release notes:
-    file_name = file_name or get_file_name(tool_name, version_name)
-    release_notes_path = release_notes_path or repository.download_file(".rnotes/release_notes.j2")
-    template = load_template(path=release_notes_path)
-    writer = ReleaseNotesWriter(template=template)
-    output_dir = output_dir or tempfile.mkdtemp()
-    writer.write(
-        output_dir=output_dir,
-        file_name=file_name,
+    if local_path:
+        repository = LocalRepository(
+            path=local_path,
+            store=get_pull_request_store(repository_name) if use_store else None,
+            snapshot_path=snapshot_path,
+            github_repository=get_repository if token or "GITHUB_TOKEN" in os.environ else None,
+            pull_request_filter=_get_pull_request_filter(exclude_authors),
+        )
+    else:
+        repository = get_repository()
+    # Query the GitHub's repository and all comments between the 2 tags, while loading the input files (the stages are
+    # independent, so they run concurrently, and the first error of any stage is raised):
+    with repository, ThreadPoolExecutor(max_workers=4, thread_name_prefix="rnotes") as executor:
+        if not stream:
+            pull_requests_future = executor.submit(repository.get_pull_requests, from_tag, to_tag)
+        grammar_future = executor.submit(_load_grammar, repository, grammar_path, to_tag, use_cache)
+        additional_content_future = executor.submit(_load_additional_content, repository, additional_content_path, to_tag)
+        template_future = executor.submit(
+            _load_template, repository, release_notes_path, to_tag, use_cache, compiled_templates_path
+        )
+        try:
+            grammar, order_by = grammar_future.result()
+            with CommentParser(
+                grammar=grammar,
+                cache=ParseCache(get_cache_dir("parses")) if use_cache else None,
+                processes=processes,
+                window_size=window_size,
+            ) as parser:
+                if stream:
+                    # Parse and process all the comments, as the pull requests arrive:
+                    all_comments = parser.iter_parse_pull_requests(repository.iter_pull_requests(from_tag, to_tag))
+                else:
+                    # Parse all the comments:
+                    pull_requests: list[GithubPullRequest] = pull_requests_future.result()
+                    all_comments = parser.parse_pull_requests(pull_requests=pull_requests)
+                # Process all the comments:
+                issues: Iterable[Issue] = (Issue.from_comment(comment) for comment in all_comments)
+                release_data = ReleaseData(issues=issues, **order_by)
+            additional_content = additional_content_future.result()
+            template = template_future.result()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return _write_release_notes(
+        repository_name=repository_name,
         release_data=release_data,
+        template=template,
         additional_content=additional_content,
+        version_name=version_name or to_tag,
+        output_dir=output_dir or tempfile.mkdtemp(),
+        file_name=file_name,
+        html=html,
+        statistics=statistics,
+        stream_render=stream_render,
     )
-    path = (Path(output_dir) / file_name).resolve()
-    logging.info("Release notes path: %s", path.resolve())
-    if not html:
-        return
-    html_path = to_html(path)
-    logging.info("Release notes path (HTML): %s", html_path.resolve())
+
+
+def generate_release_notes_batch(
+    repository_name: str,
+    tags: list[str] | str,
+    output_dir: str | Path = None,
+    grammar_path: str | Path = None,
+    release_notes_path: str | Path = None,
+    additional_content_path: str | Path = None,
+    token: str = None,
+    html: bool = True,
+    engine: str = QueryEngine.REST,
+    use_cache: bool = False,
+    cache_dir: str | Path = None,
+    use_store: bool = False,
+    local_path: str | Path = None,
+    snapshot_path: str | Path = None,
+    async_transport: bool = False,
+    scheduler: RequestScheduler = None,
+    lazy_bodies: bool = False,
+    exclude_authors: list[str] = None,
+    processes: int = 1,
+    window_size: int = None,
+    statistics: bool = False,
+    compiled_templates_path: str | Path = None,
+    stream_render: bool = False,
+) -> list[Path]:
+    """Create the release notes of every range of consecutive tags (for example, v1.0..v1.1, v1.1..v1.2, ...) for the
+    given repository. The pull requests of the whole span are fetched once and bucketed to the ranges, so every pull
+    request is fetched and parsed once (instead of once per range).
+
+    Args:
+        repository_name (str): Name of the repository.
+        tags (list[str] | str): The tags names, ordered by their dates, or a shell-style pattern of the tags names
+            (for example: "v1.*", all the matching tags are ordered by their dates).
+        output_dir (str | Path, optional): Directory that we want our release notes files to be dumped.
+            Defaults to tmp directory.
+        grammar_path, release_notes_path, additional_content_path, token, html, engine, use_cache, cache_dir, use_store,
+            local_path, snapshot_path, async_transport, scheduler, lazy_bodies, exclude_authors, processes,
+            window_size: same as in `generate_release_notes`.
+        statistics (bool, optional): If True, the statistics of every range are exported to a JSON file next to its
+            release notes file, and the statistics of all the ranges (by release) to "statistics.json". Defaults to False.
+        compiled_templates_path, stream_render: same as in `generate_release_notes`.
+
+    Returns:
+        list[Path]: the paths of the release notes files (one per range, the file name is based on the end tag).
+    """
+    grammar_path = grammar_path or os.environ.get("RNOTES_GRAMMAR_PATH")
+    release_notes_path = release_notes_path or os.environ.get("RNOTES_RELEASE_NOTES_PATH")
+    additional_content_path = additional_content_path or os.environ.get("RNOTES_ADDITIONAL_CONTENT_PATH")
+    get_repository = partial(
+        get_github_repository,
+        repository_name=repository_name,
+        token=token,
+        engine=engine,
+        use_cache=use_cache,
+        cache_dir=cache_dir,
+        use_store=use_store,
+        async_transport=async_transport,
+        scheduler=scheduler,
+        lazy_bodies=lazy_bodies,
+        pull_request_filter=_get_pull_request_filter(exclude_authors),
+    )
+    if local_path:
+        repository = LocalRepository(
+            path=local_path,
+            store=get_pull_request_store(repository_name) if use_store else None,
+            snapshot_path=snapshot_path,
+            github_repository=get_repository if token or "GITHUB_TOKEN" in os.environ else None,
+            pull_request_filter=_get_pull_request_filter(exclude_authors),
+        )
+    else:
+        repository = get_repository()
+    with repository:
+        tag_names = repository.get_tag_names(pattern=tags) if isinstance(tags, str) else list(tags)
+        logging.info("Generating the release notes of %s ranges: %s", max(len(tag_names) - 1, 0), ", ".join(tag_names))
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="rnotes") as executor:
+            ranges_future = executor.submit(repository.get_pull_requests_by_ranges, tag_names)
+            grammar_future = executor.submit(_load_grammar, repository, grammar_path, tag_names[-1], use_cache)
+            additional_content_future = executor.submit(
+                _load_additional_content, repository, additional_content_path, tag_names[-1]
+            )
+            template_future = executor.submit(
+                _load_template, repository, release_notes_path, tag_names[-1], use_cache, compiled_templates_path
+            )
+            try:
+                grammar, order_by = grammar_future.result()
+                ranges: list[list[GithubPullRequest]] = ranges_future.result()
+                additional_content = additional_content_future.result()
+                template = template_future.result()
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        with CommentParser(
+            grammar=grammar,
+            cache=ParseCache(get_cache_dir("parses")) if use_cache else None,
+            processes=processes,
+            window_size=window_size,
+        ) as parser:
+            comments_by_range = parser.parse_ranges(ranges)
+    output_dir = output_dir or tempfile.mkdtemp()
+    paths: list[Path] = []
+    table = IssueTable()
+    for to_tag, comments in zip(tag_names[1:], comments_by_range):
+        release_data = ReleaseData(issues=(Issue.from_comment(comment) for comment in comments), **order_by)
+        paths.append(
+            _write_release_notes(
+                repository_name=repository_name,
+                release_data=release_data,
+                template=template,
+                additional_content=dict(additional_content),
+                version_name=to_tag,
+                output_dir=output_dir,
+                html=html,
+                statistics=statistics,
+                stream_render=stream_render,
+            )
+        )
+        if statistics:
+            table.add_issues(release_data.issues, release=to_tag)
+    if statistics:
+        table.to_json(Path(output_dir) / "statistics.json")
+    return paths
+
+
+_worker_scheduler: RequestScheduler = None
+"The scheduler of the requests of the current worker process (of `generate_release_notes_manifest`)"
+
+
+def _init_worker(budget: RateLimitBudget, level: str) -> None:
+    """Initialize a worker process of `generate_release_notes_manifest`: the log, and a scheduler with the shared budget."""
+    global _worker_scheduler  # pylint: disable=global-statement
+    init_log(level=level)
+    _worker_scheduler = RequestScheduler(budget=budget)
+
+
+def _run_manifest_entry(entry: dict[str, Any]) -> dict[str, Any]:
+    """Generate the release notes of a single entry of the manifest (errors are reported, not raised).
+
+    Returns:
+        dict[str, Any]: the report of the entry, with the keys: "repository_name", "success", "seconds", "paths", "error".
+    """
+    start = time.monotonic()
+    report = dict(repository_name=entry.get("repository_name"), success=False, paths=[], error=None)
+    try:
+        if "tags" in entry:
+            paths = generate_release_notes_batch(**entry, scheduler=_worker_scheduler)
+        else:
+            paths = [generate_release_notes(**entry, scheduler=_worker_scheduler)]
+        report.update(success=True, paths=[str(path) for path in paths])
+    except Exception as error:  # pylint: disable=broad-except
+        logging.exception("Failed to generate the release notes of: '%s'", report["repository_name"])
+        report["error"] = f"{type(error).__name__}: {error}"
+    report["seconds"] = round(time.monotonic() - start, 3)
+    return report
+
+
+def generate_release_notes_manifest(
+    manifest_path: str | Path,
+    output_dir: str | Path = None,
+    max_workers: int = None,
+    log_level: str = "INFO",
+    **defaults: Any,
+) -> list[dict[str, Any]]:
+    """Create the release notes of many repositories, as listed in the given manifest, on a pool of processes.
+
+    All the processes share a single rate limits budget and the caches on the disk, and a failure of a repository
+    doesn't stop the others (it is reported).
+
+    Args:
+        manifest_path (str | Path): The manifest (.json), a list of entries, every entry is the arguments of
+            `generate_release_notes` (for example: {"repository_name": "a/b", "from_tag": "v1", "to_tag": "v2"}), or of
+            `generate_release_notes_batch` (if the entry has the key "tags"). Relative paths in the entries (the keys
+            that end with "_path") are relative to the manifest.
+        output_dir (str | Path, optional): Directory that the release notes files of every repository are dumped to,
+            in a sub directory per repository (unless the entry has "output_dir"). Defaults to tmp directory.
+        max_workers (int, optional): Number of processes. Defaults to the number of CPUs.
+        log_level (str, optional): Level of the log of the processes. Defaults to "INFO".
+        **defaults (Any): Default arguments of all the entries (for example: token, engine, use_store).
+
+    Returns:
+        list[dict[str, Any]]: the report of every entry (in the order of the manifest), with the keys:
+            "repository_name", "success", "seconds", "paths" and "error".
+    """
+    manifest_path = Path(manifest_path)
+    assert manifest_path.exists(), f"No such file: {manifest_path.resolve()}"
+    entries = json.loads(manifest_path.read_text())
+    assert isinstance(entries, list), f"The manifest: {manifest_path.resolve()} must be a list of entries"
+    output_dir = Path(output_dir or tempfile.mkdtemp())
+    for index, entry in enumerate(entries):
+        entry = entries[index] = defaults | entry
+        for key, value in entry.items():
+            if key.endswith("_path") and value:
+                entry[key] = str(manifest_path.parent / value)
+        entry.setdefault("output_dir", str(output_dir / entry["repository_name"].replace("/", "__")))
+    logging.info("Generating the release notes of %s repositories from: %s", len(entries), manifest_path.resolve())
+    context = get_process_context()
+    with BudgetManager(ctx=context) as manager:
+        budget = manager.RateLimitBudget()  # pylint: disable=no-member
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=context, initializer=_init_worker, initargs=(budget, log_level)
+        ) as executor:
+            reports = list(executor.map(_run_manifest_entry, entries))
+    for report in reports:
+        logging.info(
+            "%s '%s' (%.1f seconds)%s",
+            "Succeeded:" if report["success"] else "Failed:",
+            report["repository_name"],
+            report["seconds"],
+            f": {report['error']}" if report["error"] else "",
+        )
+    logging.info("%s/%s repositories succeeded", sum(report["success"] for report in reports), len(reports))
+    return reports
 
 
 if __name__ == "__main__":
@@ -110,5 +545,8 @@ if __name__ == "__main__":
     fire.Fire(
         dict(
             generate=generate_release_notes,
+            batch=generate_release_notes_batch,
+            manifest=generate_release_notes_manifest,
+            compile=compile_templates,
         )
     )
@@ -0,0 +1,274 @@
+"""This module implements the scheduler of the requests to GitHub (rate limits and concurrency)"""
+from __future__ import annotations
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+from typing import Callable, Iterator, Mapping, Optional
+from urllib.parse import urlparse
+import requests
+
+
+__docformat__ = "google"
+
+
+def get_resource(url: str) -> str:
+    """Get the name of the rate limit resource of the given URL (as in the header "x-ratelimit-resource").
+
+    Args:
+        url (str): URL (or path) of the request.
+
+    Returns:
+        str: the name of the resource ("core", "search", "code_search" or "graphql").
+    """
+    path = urlparse(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/code" in path:
+        return "code_search"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+class RateLimitBudget:
+    """Thread safe budget of GitHub's rate limits (remaining requests and reset time), per resource"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._resources: dict[str, list] = {}
+
+    def get(self, resource: str) -> Optional[tuple[int, int, float]]:
+        """
+        Args:
+            resource (str): the name of the resource.
+
+        Returns:
+            Optional[tuple[int, int, float]]: the remaining requests, the limit and the reset time (epoch),
+                or None if unknown.
+        """
+        with self._lock:
+            state = self._resources.get(resource)
+            return tuple(state) if state else None
+
+    def update(self, resource: str, headers: Mapping[str, str]) -> None:
+        """Update the budget from the rate limit headers of a response.
+
+        Args:
+            resource (str): the name of the resource of the request (used if the response doesn't specify it).
+            headers (Mapping[str, str]): the headers of the response.
+        """
+        if "x-ratelimit-remaining" not in headers:
+            return
+        resource = headers.get("x-ratelimit-resource", resource)
+        with self._lock:
+            self._resources[resource] = [
+                int(headers["x-ratelimit-remaining"]),
+                int(headers.get("x-ratelimit-limit", 0)),
+                float(headers.get("x-ratelimit-reset", 0)),
+            ]
+
+    def reserve(self, resource: str, reserve: int = 0) -> float:
+        """Reserve a single request from the budget.
+
+        Args:
+            resource (str): the name of the resource.
+            reserve (int, optional): number of requests to keep in the budget. Defaults to 0.
+
+        Returns:
+            float: 0 if the request was reserved, else the seconds to wait until the budget resets.
+        """
+        with self._lock:
+            state = self._resources.get(resource)
+            if state is None:
+                return 0
+            remaining, _, reset = state
+            now = time.time()
+            if now >= reset:
+                del self._resources[resource]
+                return 0
+            if remaining > reserve:
+                state[0] -= 1
+                return 0
+            return reset - now + 1
+
+
+class BudgetManager(BaseManager):
+    """Manager that serves a RateLimitBudget (`manager.RateLimitBudget()`) from its own process, so a single budget is
+    shared by all the processes of a pool (the proxy of the budget can be passed to the processes)."""
+
+
+BudgetManager.register("RateLimitBudget", RateLimitBudget)
+
+
+class RequestScheduler:
+    """Scheduler of the requests to GitHub.
+
+    Every request waits for a free slot (the concurrency is adaptive: additive increase while the requests are fast and
+    the budget is healthy, multiplicative decrease on slow requests, low budget or throttling), and for the rate limit
+    budget of its resource. Throttled requests (secondary rate limits, or an exhausted budget) are retried after the time
+    GitHub asks for, or after a jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        budget: RateLimitBudget = None,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        initial_concurrency: int = 4,
+        target_latency: float = 2.0,
+        low_budget: float = 0.1,
+        reserve: int = 0,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """
+        Args:
+            budget (RateLimitBudget, optional): the rate limits budget (or a proxy of a budget of BudgetManager).
+                Defaults to a new budget.
+            min_concurrency (int, optional): minimal number of concurrent requests. Defaults to 1.
+            max_concurrency (int, optional): maximal number of concurrent requests. Defaults to 16.
+            initial_concurrency (int, optional): initial number of concurrent requests. Defaults to 4.
+            target_latency (float, optional): requests slower than this (seconds) lower the concurrency. Defaults to 2.0.
+            low_budget (float, optional): remaining fraction of the budget that lowers the concurrency. Defaults to 0.1.
+            reserve (int, optional): number of requests to keep in the budget of every resource. Defaults to 0.
+            max_retries (int, optional): maximal number of retries of a throttled request. Defaults to 5.
+            backoff (float, optional): the first backoff (seconds) of a throttled request. Defaults to 1.0.
+            max_backoff (float, optional): maximal backoff (seconds) of a throttled request. Defaults to 60.0.
+        """
+        self._budget = budget or RateLimitBudget()
+        self._min_concurrency = min_concurrency
+        self._max_concurrency = max_concurrency
+        self._limit = float(max(min_concurrency, min(initial_concurrency, max_concurrency)))
+        self._target_latency = target_latency
+        self._low_budget = low_budget
+        self._reserve = reserve
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def budget(self) -> RateLimitBudget:
+        """
+        Returns:
+            RateLimitBudget: the rate limits budget.
+        """
+        return self._budget
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Returns:
+            int: the current number of allowed concurrent requests.
+        """
+        return int(self._limit)
+
+    @property
+    def max_retries(self) -> int:
+        """
+        Returns:
+            int: maximal number of retries of a throttled request.
+        """
+        return self._max_retries
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        """Wait for a free slot, and hold it under the context."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def _wait_for_budget(self, resource: str) -> None:
+        """Wait until a request of the given resource can be reserved from the budget."""
+        while (wait := self._budget.reserve(resource, self._reserve)) > 0:
+            logging.warning("The rate limit of '%s' is exhausted, waiting %.0f seconds for the reset", resource, wait)
+            time.sleep(wait)
+
+    def _update_limit(self, update: Callable[[float], float]) -> None:
+        """Update the number of allowed concurrent requests (within the bounds), by the given function of the current number.
+
+        The read and the write of the number are done under the lock, so concurrent updates are not lost.
+        """
+        with self._condition:
+            self._limit = max(self._min_concurrency, min(self._max_concurrency, update(self._limit)))
+            self._condition.notify_all()
+
+    def on_response(self, resource: str, latency: float) -> None:
+        """Adapt the concurrency after a successful response (of this scheduler, or of another transport that shares it).
+
+        Args:
+            resource (str): the name of the resource of the request.
+            latency (float): the time (seconds) it took to get the response.
+        """
+        state = self._budget.get(resource)
+        low_budget = state is not None and state[1] > 0 and state[0] / state[1] < self._low_budget
+        if latency > self._target_latency or low_budget:
+            self._update_limit(lambda limit: limit * 0.75)
+        else:
+            self._update_limit(lambda limit: limit + 1 / limit)
+
+    def on_throttled(self) -> None:
+        """Adapt the concurrency after a throttled response (of this scheduler, or of another transport that shares it)."""
+        self._update_limit(lambda limit: limit / 2)
+
+    def throttle_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """
+        Args:
+            response (requests.Response): the response (or any response with: status_code, headers and text).
+            attempt (int): the number of the attempt (0 for the first).
+
+        Returns:
+            Optional[float]: seconds to wait before retrying the request, or None if the request was not throttled.
+        """
+        if response.status_code not in (403, 429):
+            return None
+        if "retry-after" in response.headers:
+            return float(response.headers["retry-after"])
+        if response.headers.get("x-ratelimit-remaining") == "0":
+            return max(0.0, float(response.headers.get("x-ratelimit-reset", 0)) - time.time()) + 1
+        if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            return random.uniform(0.5, 1.0) * min(self._max_backoff, self._backoff * 2**attempt)
+        return None
+
+    def execute(self, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send a request under the scheduler (wait for a slot and for the budget, and retry if throttled).
+
+        Args:
+            url (str): URL (or path) of the request.
+            send (Callable[[], requests.Response]): function that sends the request.
+
+        Returns:
+            requests.Response: the response (the last one, if the request was still throttled after all the retries).
+        """
+        resource = get_resource(url)
+        for attempt in range(self._max_retries + 1):
+            self._wait_for_budget(resource)
+            with self._slot():
+                start = time.monotonic()
+                response = send()
+                latency = time.monotonic() - start
+            self._budget.update(resource, {name.lower(): value for name, value in response.headers.items()})
+            delay = self.throttle_delay(response, attempt)
+            if delay is None:
+                self.on_response(resource, latency)
+                return response
+            self.on_throttled()
+            logging.warning("Throttled by GitHub (status: %s), retrying in %.1f seconds: %s", response.status_code, delay, url)
+            time.sleep(delay)
+        return response
+
+
+DEFAULT_SCHEDULER = RequestScheduler()
+"The scheduler of all the requests to GitHub (unless another scheduler is given)"
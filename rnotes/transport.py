@@ -0,0 +1,352 @@
+"""This module implements an asyncio transport to GitHub's REST API (pooled keep-alive HTTP/2 connections)"""
+from __future__ import annotations
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Iterable, Iterator, Optional
+import httpx
+from github import GithubException, UnknownObjectException
+
+sys.path.insert(0, ".")
+from rnotes.scheduler import DEFAULT_SCHEDULER, RequestScheduler, get_resource
+
+
+__docformat__ = "google"
+
+
+DEFAULT_BASE_URL = "https://api.github.com"
+"URL of GitHub's REST API"
+PAGE_SIZE = 100
+"Maximal number of items per page of GitHub's REST API"
+
+
+class AsyncGithubClient:
+    """Asyncio client of GitHub's REST API.
+
+    All the requests share a pool of keep-alive connections (HTTP/2, if the server supports it, so many requests are
+    multiplexed on a single connection), and many requests are sent concurrently. The number of requests in flight is
+    bounded by the adaptive concurrency of the scheduler (the latencies and the throttled responses of this client update
+    it, as the requests that the scheduler sends). Every request is reserved from the rate limit budget of the scheduler,
+    and throttled requests are retried as the scheduler decides. GET requests are sent as conditional requests if a cache
+    is given (the not modified responses are served from the cache).
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = DEFAULT_BASE_URL,
+        max_connections: int = 32,
+        http2: bool = True,
+        timeout: float = 30.0,
+        cache: Any = None,
+        scheduler: RequestScheduler = None,
+    ) -> None:
+        """
+        Args:
+            token (str): GitHub personal token.
+            base_url (str, optional): URL of the REST API. Defaults to DEFAULT_BASE_URL.
+            max_connections (int, optional): maximal number of connections (and of concurrent requests, the requests in
+                flight are also bounded by the concurrency of the scheduler). Defaults to 32.
+            http2 (bool, optional): If True, HTTP/2 is negotiated with the server. Defaults to True.
+            timeout (float, optional): timeout (seconds) of every request. Defaults to 30.0.
+            cache (Any, optional): the cache of the responses (with the methods `get_response` and `set_response`,
+                as rnotes.query.ResponseCache). Defaults to None (no cache).
+            scheduler (RequestScheduler, optional): the scheduler that owns the rate limits budget and the retries policy.
+                Defaults to DEFAULT_SCHEDULER.
+        """
+        self._token = token
+        self._base_url = base_url.rstrip("/")
+        self._max_connections = max_connections
+        self._http2 = http2
+        self._timeout = timeout
+        self._cache = cache
+        self._scheduler = scheduler or DEFAULT_SCHEDULER
+        self._client: Optional[httpx.AsyncClient] = None
+        self._window: Optional[asyncio.Condition] = None
+        self._in_flight = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns:
+            httpx.AsyncClient: the HTTP client (created on the first use, in the running event loop).
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={
+                    "Authorization": f"token {self._token}",
+                    "Accept": "application/vnd.github+json",
+                    "User-Agent": "rnotes",
+                },
+                http2=self._http2,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=self._max_connections, max_keepalive_connections=self._max_connections),
+            )
+            self._window = asyncio.Condition()
+        return self._client
+
+    @property
+    def concurrency(self) -> int:
+        """
+        Returns:
+            int: the current number of allowed requests in flight (the concurrency of the scheduler, up to the maximal
+                number of connections).
+        """
+        return max(1, min(self._max_connections, self._scheduler.concurrency))
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Wait until the number of requests in flight is below the concurrency, and hold a slot under the context."""
+        async with self._window:
+            await self._window.wait_for(lambda: self._in_flight < self.concurrency)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._window:
+                self._in_flight -= 1
+                self._window.notify_all()
+
+    def cache_key(self, url: str, params: dict[str, Any], accept: str) -> str:
+        """
+        Args:
+            url (str): URL (or path) of the request.
+            params (dict[str, Any]): the query parameters of the request.
+            accept (str): the media type of the request.
+
+        Returns:
+            str: key of the request in the cache (the token is hashed, since responses depend on permissions).
+        """
+        token = hashlib.sha256(self._token.encode()).hexdigest()
+        return f"GET {self.client.build_request('GET', url, params=params).url} {accept} {token}"
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a single request under the concurrency and the rate limits budget of the scheduler, and retry it if it was
+        throttled.
+
+        Args:
+            method (str): the HTTP method.
+            url (str): URL (or path) of the request.
+            **kwargs (Any): the arguments of the request (as in httpx.AsyncClient.request).
+
+        Returns:
+            httpx.Response: the response (the last one, if the request was still throttled after all the retries).
+        """
+        client = self.client
+        resource = get_resource(url)
+        budget = self._scheduler.budget
+        attempt = 0
+        while True:
+            while (wait := budget.reserve(resource)) > 0:
+                logging.warning("The rate limit of '%s' is exhausted, waiting %.0f seconds for the reset", resource, wait)
+                await asyncio.sleep(wait)
+            async with self._slot():
+                start = time.monotonic()
+                response = await client.request(method, url, **kwargs)
+                latency = time.monotonic() - start
+            budget.update(resource, dict(response.headers))
+            delay = self._scheduler.throttle_delay(response, attempt)
+            if delay is None:
+                self._scheduler.on_response(resource, latency)
+                return response
+            self._scheduler.on_throttled()
+            if attempt >= self._scheduler.max_retries:
+                return response
+            logging.warning("Throttled by GitHub (status: %s), retrying in %.1f seconds: %s", response.status_code, delay, url)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(
+        self, url: str, params: dict[str, Any] = None, accept: str = None, raw: bool = False
+    ) -> tuple[dict[str, str], str | bytes]:
+        """Send a GET request (as a conditional request, if there is a cache).
+
+        Args:
+            url (str): URL (or path) of the request.
+            params (dict[str, Any], optional): the query parameters of the request. Defaults to None.
+            accept (str, optional): the media type of the request. Defaults to None (JSON).
+            raw (bool, optional): If True, the body is returned as is (bytes, not decoded), and it is cached as base64.
+                Defaults to False.
+
+        Raises:
+            UnknownObjectException: if the object not found (404).
+            GithubException: on any other error.
+
+        Returns:
+            tuple[dict[str, str], str | bytes]: the headers (lower case names) and the body of the response.
+        """
+        headers = {"Accept": accept} if accept else {}
+        key = self.cache_key(url, params, f"{accept or ''} (base64)" if raw else accept or "") if self._cache is not None else None
+        cached = self._cache.get_response(key) if key else None
+        if cached is not None:
+            if "etag" in cached["headers"]:
+                headers["If-None-Match"] = cached["headers"]["etag"]
+            if "last-modified" in cached["headers"]:
+                headers["If-Modified-Since"] = cached["headers"]["last-modified"]
+        response = await self._send("GET", url, params=params, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            logging.debug("Not modified (served from the cache): %s", url)
+            self._cache.set_response(key, cached["headers"], cached["body"])
+            return cached["headers"], base64.b64decode(cached["body"]) if raw else cached["body"]
+        response_headers = dict(response.headers)
+        if response.status_code >= 400:
+            data = response.json() if "json" in response_headers.get("content-type", "") else response.text
+            exception = UnknownObjectException if response.status_code == 404 else GithubException
+            raise exception(response.status_code, data, response_headers)
+        body = response.content if raw else response.text
+        if key and response.status_code == 200 and ("etag" in response_headers or "last-modified" in response_headers):
+            self._cache.set_response(key, response_headers, base64.b64encode(body).decode() if raw else body)
+        return response_headers, body
+
+    async def get_json(self, url: str, **params: Any) -> Any:
+        """
+        Args:
+            url (str): URL (or path) of the request.
+            **params (Any): the query parameters of the request.
+
+        Returns:
+            Any: the JSON of the response.
+        """
+        _, body = await self.get(url, params=params or None)
+        return json.loads(body)
+
+    async def get_many(self, urls: list[str], missing_ok: bool = False, **params: Any) -> list[Any]:
+        """Get the JSON of the given URLs concurrently.
+
+        Args:
+            urls (list[str]): URLs (or paths) of the requests.
+            missing_ok (bool, optional): If True, objects that not found are returned as None. Defaults to False.
+            **params (Any): the query parameters of every request.
+
+        Returns:
+            list[Any]: the JSON of the responses (in the order of the given URLs).
+        """
+
+        async def get_json(url: str) -> Any:
+            try:
+                return await self.get_json(url, **params)
+            except UnknownObjectException:
+                if not missing_ok:
+                    raise
+                return None
+
+        return await asyncio.gather(*map(get_json, urls))
+
+    async def aclose(self) -> None:
+        """Close all the connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class GithubClient:
+    """Blocking wrapper of AsyncGithubClient, that runs the event loop in a background thread (so it can be used from
+    regular code, and from many threads)."""
+
+    def __init__(self, token: str, base_url: str = DEFAULT_BASE_URL, **kwargs: Any) -> None:
+        """
+        Args:
+            token (str): GitHub personal token.
+            base_url (str, optional): URL of the REST API. Defaults to DEFAULT_BASE_URL.
+            **kwargs (Any): the other arguments of AsyncGithubClient.
+        """
+        self._client = AsyncGithubClient(token=token, base_url=base_url, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="rnotes-transport", daemon=True)
+        self._thread.start()
+
+    @property
+    def async_client(self) -> AsyncGithubClient:
+        """
+        Returns:
+            AsyncGithubClient: the asyncio client.
+        """
+        return self._client
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """Run the given coroutine in the event loop of the client, and wait for its result.
+
+        Args:
+            coroutine (Coroutine): the coroutine (of the asyncio client).
+
+        Returns:
+            Any: the result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get_json(self, url: str, **params: Any) -> Any:
+        """Same as `AsyncGithubClient.get_json`."""
+        return self.run(self._client.get_json(url, **params))
+
+    def get_raw(self, url: str, **params: Any) -> bytes:
+        """
+        Args:
+            url (str): URL (or path) of the request (for example, of a file in the contents API).
+            **params (Any): the query parameters of the request.
+
+        Returns:
+            bytes: the raw content of the response.
+        """
+        _, body = self.run(self._client.get(url, params=params or None, accept="application/vnd.github.raw", raw=True))
+        return body
+
+    def get_many(self, urls: list[str], missing_ok: bool = False, **params: Any) -> list[Any]:
+        """Same as `AsyncGithubClient.get_many`."""
+        return self.run(self._client.get_many(urls, missing_ok=missing_ok, **params))
+
+    def iter_pages(self, url: str, concurrency: int = 8, **params: Any) -> Iterator[Any]:
+        """Iterate over the items of all the pages of the given URL (PAGE_SIZE items per page).
+
+        The pages are fetched in concurrent batches, and no more batches are fetched once the consumer stops iterating
+        (for example, when the rest of the pages are out of the needed range of dates).
+
+        Args:
+            url (str): URL (or path) of the request.
+            concurrency (int, optional): number of pages to fetch concurrently. Defaults to 8.
+            **params (Any): the query parameters of the request.
+
+        Yields:
+            Any: the items of the pages (in the order of the pages).
+        """
+        page = 1
+        while True:
+            for items in self.get_pages(url, range(page, page + concurrency), **params):
+                yield from items
+                if len(items) < PAGE_SIZE:
+                    return
+            page += concurrency
+
+    def get_pages(self, url: str, pages: Iterable[int], **params: Any) -> list[Any]:
+        """Get the given pages of the given URL concurrently (PAGE_SIZE items per page).
+
+        Args:
+            url (str): URL (or path) of the request.
+            pages (Iterable[int]): the numbers of the pages.
+            **params (Any): the query parameters of the request.
+
+        Returns:
+            list[Any]: the JSON of the pages (in the order of the given pages).
+        """
+
+        async def get_pages() -> list[Any]:
+            return await asyncio.gather(
+                *(self._client.get_json(url, **params, per_page=PAGE_SIZE, page=page) for page in pages)
+            )
+
+        return self.run(get_pages())
+
+    def close(self) -> None:
+        """Close all the connections and stop the event loop (once, closing a closed client does nothing)."""
+        if self._loop.is_closed():
+            return
+        self.run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,12 +1,16 @@
 """This module implements utilities functions for rnotes"""
 from __future__ import annotations
 import ast
+import hashlib
+import multiprocessing
 import os
+import re
+import tempfile
 from pathlib import Path
 import importlib.machinery
 import importlib.abc
 from types import ModuleType
-from typing import Any, Union
+from typing import Any, Iterable, Iterator, Optional, TextIO, Union
 import logging
 import markdown
 from rich.logging import RichHandler
@@ -15,6 +19,9 @@ from rich.console import Console
 
 __docformat__ = "google"
 
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+"Default maximal size (in bytes) of every cache on the disk"
+
 
 class LogLevel:
     """Changing the log file under a context"""
@@ -41,6 +48,174 @@ class LogLevel:
             handler.setLevel(self.current_level)
 
 
+class DiskCache:
+    """Persistent key-value store on the disk, with size-based LRU eviction.
+
+    Every value is stored in its own file (named by the hash of the key), and the modification time of the file
+    is used as the last access time, so the cache can be shared between processes and between runs.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        """
+        Args:
+            directory (str | Path): directory of the cache (created if not exists).
+            max_size (int, optional): maximal size (in bytes) of all the values in the cache. Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._size = None
+
+    @property
+    def directory(self) -> Path:
+        """
+        Returns:
+            Path: directory of the cache.
+        """
+        return self._directory
+
+    def _path(self, key: str) -> Path:
+        """
+        Args:
+            key (str): key in the cache.
+
+        Returns:
+            Path: path of the file that stores the value of the given key.
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self._directory / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the value of the given key, and mark it as the most recently used.
+
+        Args:
+            key (str): key in the cache.
+
+        Returns:
+            Optional[bytes]: the value if found, else None.
+        """
+        path = self._path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store the given value, and evict the least recently used values if the cache is too big.
+
+        Args:
+            key (str): key in the cache.
+            value (bytes): the value to store.
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        previous_size = path.stat().st_size if path.exists() else 0
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(value)
+        os.replace(tmp_path, path)
+        if self._size is None:
+            self._size = sum(file.stat().st_size for file in self._directory.glob("*/*"))
+        else:
+            self._size += len(value) - previous_size
+        if self._size > self._max_size:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used values, until the size of the cache is smaller than the maximal size."""
+        files = []
+        for file in self._directory.glob("*/*"):
+            try:
+                files.append((file.stat().st_mtime, file.stat().st_size, file))
+            except FileNotFoundError:
+                continue
+        self._size = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files):
+            if self._size <= self._max_size:
+                break
+            file.unlink(missing_ok=True)
+            self._size -= size
+        logging.debug("Evicted the cache: %s (current size: %s bytes)", self._directory, self._size)
+
+
+class ContentStore:
+    """In memory content-addressed store: every content is stored once, by its git blob sha"""
+
+    def __init__(self) -> None:
+        self._contents: dict[str, bytes] = {}
+
+    @staticmethod
+    def blob_sha(content: bytes) -> str:
+        """
+        Args:
+            content (bytes): the content.
+
+        Returns:
+            str: the git blob sha of the content.
+        """
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+    def add(self, content: bytes, sha: str = None) -> str:
+        """Store the given content.
+
+        Args:
+            content (bytes): the content.
+            sha (str, optional): the git blob sha of the content (as returned by git). Defaults to None (computed).
+
+        Returns:
+            str: the sha of the content.
+        """
+        sha = sha or self.blob_sha(content)
+        self._contents.setdefault(sha, content)
+        return sha
+
+    def get(self, sha: str) -> Optional[bytes]:
+        """
+        Args:
+            sha (str): the git blob sha of the content.
+
+        Returns:
+            Optional[bytes]: the content if stored, else None.
+        """
+        return self._contents.get(sha)
+
+    def __contains__(self, sha: str) -> bool:
+        return sha in self._contents
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+
+def get_cache_dir(name: str = None) -> Path:
+    """Get the directory of the rnotes caches.
+
+    Args:
+        name (str, optional): name of a sub directory (a specific cache). Defaults to None (the top directory).
+
+    Returns:
+        Path: environment variable RNOTES_CACHE_DIR if defined, else ~/.cache/rnotes (or its given sub directory).
+    """
+    directory = Path(os.environ.get("RNOTES_CACHE_DIR") or Path.home() / ".cache" / "rnotes")
+    return directory / name if name else directory
+
+
+def get_process_context() -> multiprocessing.context.BaseContext:
+    """Get the context of the processes pools of rnotes.
+
+    The pools are created while other threads run (the threads of the queries, of the asyncio transport, etc.), and
+    forking a process while threads hold locks can deadlock the child, so the processes are started from a fresh
+    process instead ("forkserver" where available, else "spawn"). As with these start methods on any platform, the
+    main module is imported again by the processes, so scripts must guard their entry point (`if __name__ == "__main__":`).
+
+    Returns:
+        multiprocessing.context.BaseContext: the context of the processes.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
 def init_log(path: str = None, level: str = "NOTSET", jupyter: bool = False) -> None:
     """Initialize a `rich` log.
 
@@ -66,21 +241,22 @@ def init_log(path: str = None, level: str = "NOTSET", jupyter: bool = False) ->
     )
 
 
-def import_file(path: Path) -> ModuleType:
+def import_file(path: Path, source: str = None) -> ModuleType:
     """
     Alias for `exec_file` in module import mode.
 
     Args:
         path: path of file to import.
+        source: the source of the file (in memory), instead of reading `path`.
 
     Returns:
         A module object containing all of the identifiers defined in `path_to_file`,
         upon successful import.
     """
-    return exec_file(path)
+    return exec_file(path, source=source)
 
 
-def eval_file(path: Path, identifiers: dict[str, Any] = None) -> ModuleType:
+def eval_file(path: Path, identifiers: dict[str, Any] = None, source: str = None) -> ModuleType:
     """
     Alias for `exec_file` in module file evaluate mode.
 
@@ -88,6 +264,7 @@ def eval_file(path: Path, identifiers: dict[str, Any] = None) -> ModuleType:
         path: path of file to import.
         identifiers: dictionary used for passing values into and back out of
             the execution of the code.
+        source: the source of the file (in memory), instead of reading `path`.
 
     Returns:
         Assuming the file contains a sequence of Python statement, and the
@@ -98,13 +275,14 @@ def eval_file(path: Path, identifiers: dict[str, Any] = None) -> ModuleType:
         If the last statement is not an expression, then this function will
         behave like `exec_file`.
     """
-    return exec_file(path, identifiers=identifiers or {}, evaluate=True)
+    return exec_file(path, identifiers=identifiers if identifiers is not None else {}, evaluate=True, source=source)
 
 
 def exec_file(
     path: Path,
     identifiers: dict[str, Any] = None,
     evaluate: bool = False,
+    source: str = None,
 ) -> Union[bool, ModuleType]:
     """
     Execute code in a python file.
@@ -115,6 +293,8 @@ def exec_file(
             the execution of the code.
         evaluate: If `True` execute file as an expression and return the value
             of the expression
+        source: the source of the file (in memory), instead of reading `path`
+            (`path` is used only as the name of the file).
 
     Returns:
         When `identifiers` is specified:
@@ -128,7 +308,7 @@ def exec_file(
         the module will be left uncaught.
     """
     path = path if path is None or isinstance(path, Path) else Path(path)
-    if not path.exists():
+    if source is None and not path.exists():
         logging.error("Failed to import file '%s' which does not exist", path)
         return False
 
@@ -143,7 +323,7 @@ def exec_file(
         identifiers["__file__"] = str(path)
         # Execute the module and affect the `identifiers` dictionary
         try:
-            source = loader.get_source(package_name)
+            source = loader.get_source(package_name) if source is None else source
             if evaluate:
                 stmts = list(ast.iter_child_nodes(ast.parse(source)))
                 if not stmts:
@@ -171,6 +351,10 @@ def exec_file(
         return result
     # Load the module
     result = ModuleType(package_name, f"Module loaded by exec_file('{path!s}')")
+    if source is not None:
+        result.__file__ = str(path)
+        exec(compile(source, path, mode="exec"), result.__dict__)  # pylint: disable=exec-used
+        return result
     loader.exec_module(result)
     return result
 
@@ -211,3 +395,122 @@ def to_html(path: Path, suffix: str = "") -> Path:
     html_file_path = Path(os.path.splitext(str_path)[0] + f"{suffix}.html")
     html_file_path.write_text(html_content)
     return html_file_path
+
+
+HTML_BLOCK_REGEX = re.compile(r"^ {0,3}<(?:(?P<comment>!--)|(?P<tag>[a-zA-Z][a-zA-Z0-9]*)\b)")
+"Start of a raw HTML block of markdown (a comment or a tag at the start of the line)"
+BLOCK_LEVEL_ELEMENTS = frozenset(markdown.util.BLOCK_LEVEL_ELEMENTS)
+"The tags that start a raw HTML block of markdown"
+
+
+class MarkdownSplitter:
+    """Decide, line by line, where a markdown text can be split to sections that are converted to the same HTML as the
+    whole text: before a heading line ("#" at the start of the line) that follows a blank line or a heading that started
+    a section, and is not inside (or right after) a raw HTML block. A heading right after a line of a list item or a
+    paragraph may belong to it, so it doesn't start a section."""
+
+    def __init__(self) -> None:
+        self._previous = ""
+        self._previous_split = False
+        self._html_tag: Optional[str] = None
+        self._html_depth = 0
+        self._after_html = False
+
+    def split_before(self, line: str) -> bool:
+        """
+        Args:
+            line (str): the next line of the text.
+
+        Returns:
+            bool: True if a new section can start at the given line.
+        """
+        split = (
+            self._html_tag is None
+            and not self._after_html
+            and line.startswith("#")
+            and (not self._previous.strip() or self._previous_split)
+        )
+        if self._update_html(line):
+            self._after_html = True
+        elif line.strip():
+            self._after_html = False
+        self._previous, self._previous_split = line, split
+        return split
+
+    def _update_html(self, line: str) -> bool:
+        """Track the raw HTML block that the given line opens, continues or closes (returns True if the line is a line of
+        a raw HTML block)."""
+        if self._html_tag is None:
+            match = HTML_BLOCK_REGEX.match(line)
+            if match and match["comment"]:
+                self._html_tag, line = "!--", line[match.end() :]
+            elif match and match["tag"].lower() in BLOCK_LEVEL_ELEMENTS:
+                self._html_tag = match["tag"].lower()
+            else:
+                return False
+        if self._html_tag == "!--":
+            if "-->" in line:
+                self._html_tag = None
+            return True
+        lower = line.lower()
+        self._html_depth += len(re.findall(rf"<{self._html_tag}\b[^>]*(?<!/)>", lower))
+        self._html_depth -= lower.count(f"</{self._html_tag}>")
+        if self._html_depth <= 0:
+            self._html_tag, self._html_depth = None, 0
+        return True
+
+
+def iter_markdown_sections(chunks: Iterable[str]) -> Iterator[str]:
+    """Split a stream of markdown text to sections, before the heading lines where a new block starts for sure (see
+    `MarkdownSplitter`), so every section is converted to the same HTML as in the whole document (except for references
+    to links that are defined in other sections).
+
+    Note that a section is kept in memory as a whole, so the memory is bounded by the largest section, not by the size
+    of a line: it stays flat only for templates with a heading per section (for example, "### topic" lines after blank
+    lines). Headings inside list items ("* ### topic", as in the shipped template) don't split the section, since
+    splitting a list changes its HTML, so all the topics under "## Changes" are a single section.
+
+    Args:
+        chunks (Iterable[str]): the chunks of the markdown text (of any size).
+
+    Yields:
+        str: the sections of the markdown text.
+    """
+    splitter = MarkdownSplitter()
+    section: list[str] = []
+    rest = ""
+    for chunk in chunks:
+        lines = (rest + chunk).split("\n")
+        rest = lines.pop()
+        for line in lines:
+            if splitter.split_before(line) and section:
+                text, section = "\n".join(section), []
+                yield text
+            section.append(line)
+    if splitter.split_before(rest) and section:
+        text, section = "\n".join(section), []
+        yield text
+    section.append(rest)
+    yield "\n".join(section)
+
+
+def write_html(chunks: Iterable[str], file: TextIO, path: Path) -> None:
+    """Converts a stream of .md/.txt text to html, and write it to the given file (same as `to_html`, but only a single
+    section of the text is kept in memory, see `iter_markdown_sections` for the templates that keep the memory flat).
+
+    Args:
+        chunks (Iterable[str]): the chunks of the text.
+        file (TextIO): the html file.
+        path (Path): path of the given (.md/.txt) file.
+    """
+    if path.suffix == ".md":
+        separator = ""
+        for section in iter_markdown_sections(chunks):
+            if html_section := markdown.markdown(section):
+                file.write(separator + html_section)
+                separator = "\n"
+        return
+    file.write("<html>\n<head>\n<title>" + str(path.resolve()) + "</title>\n</head>\n<body>\n<pre>\n")
+    for chunk in chunks:
+        file.write(chunk.replace("<", "&lt;").replace(">", "&gt;"))
+    file.write("\n</pre>\n</body>\n</html>")
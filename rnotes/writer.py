@@ -2,16 +2,24 @@
 from __future__ import annotations
 import sys
 import logging
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from typing import Any, Iterable, Iterator, Optional, TextIO
+from jinja2 import BytecodeCache, DictLoader, Environment, FileSystemLoader, ModuleLoader
+from jinja2.bccache import Bucket
 
 sys.path.insert(0, ".")
 from rnotes.process import ReleaseData
+from rnotes.utils import DiskCache, get_cache_dir, write_html
 
 
 __docformat__ = "google"
 
 
+BUFFER_SIZE = 1024 * 1024
+"Size (in bytes) of the buffers of the files that are written in streaming"
+
+
 class ReleaseNotesWriter:
     """The writer of all the issues and additional content, based on the given template"""
 
@@ -30,6 +38,25 @@ class ReleaseNotesWriter:
         """
         return self._template
 
+    @staticmethod
+    def get_content(release_data: ReleaseData, additional_content: dict[str, str]) -> dict[str, Any]:
+        """
+        Args:
+            release_data (ReleaseData): The ReleaseData object (contains all the Issues).
+            additional_content (dict[str, str]): Additional content to be written.
+
+        Returns:
+            dict[str, Any]: the content of the template.
+        """
+        release_data_content = dict(
+            topics=release_data.topics,
+            highlights=release_data.highlights,
+            type_to_issue=release_data.type_to_issue,
+            release_data=release_data,
+            len=len,
+        )
+        return release_data_content | additional_content
+
     def write(
         self,
         output_dir: str | Path,
@@ -48,31 +75,174 @@ class ReleaseNotesWriter:
         output_dir = Path(output_dir)
         output_dir.mkdir(exist_ok=True, parents=True)
         file_path = output_dir / file_name
-        release_data_content = dict(
-            topics=release_data.topics,
-            highlights=release_data.highlights,
-            type_to_issue=release_data.type_to_issue,
-            len=len,
-        )
         logging.debug("Rendering the Jinja Template with the content")
-        output = self._template.render(**(release_data_content | additional_content))
+        output = self._template.render(**self.get_content(release_data, additional_content))
         logging.debug("Writing release notes to: %s", file_path.resolve())
         file_path.write_text(output)
 
+    def write_stream(
+        self,
+        output_dir: str | Path,
+        file_name: str | Path,
+        release_data: ReleaseData,
+        additional_content: dict[str, str],
+        html: bool = True,
+    ) -> Optional[Path]:
+        """Write the release notes file (and the HTML file) while the template is rendered, so the whole document is never
+        kept in memory (the HTML is converted from the same stream, section by section, see `write_html`). Note that the
+        largest section is kept in memory, so the memory stays flat only for templates with a heading per topic.
+
+        Args:
+            output_dir (str | Path): Directory that we want our release notes file to be dumped.
+            file_name (str | Path): File name of the release notes file.
+            release_data (ReleaseData): The ReleaseData object (contains all the Issues).
+            additional_content (dict[str, str]): Additional content to be written.
+            html (bool, optional): If True, the HTML file is written too (as `to_html`). Defaults to True.
+
+        Returns:
+            Optional[Path]: the path of the HTML file, if written.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True, parents=True)
+        file_path = output_dir / file_name
+        logging.debug("Rendering the Jinja Template with the content to: %s", file_path.resolve())
+        chunks = self._template.generate(**self.get_content(release_data, additional_content))
+        with open(file_path, "w", buffering=BUFFER_SIZE) as file:
+            if not html:
+                file.writelines(chunks)
+                return None
+            html_path = file_path.with_suffix(".html")
+            with open(html_path, "w", buffering=BUFFER_SIZE) as html_file:
+                write_html(_tee(chunks, file), html_file, file_path)
+        return html_path
+
+
+def _tee(chunks: Iterable[str], file: TextIO) -> Iterator[str]:
+    """Write the given chunks to the given file, while they are iterated."""
+    for chunk in chunks:
+        file.write(chunk)
+        yield chunk
+
+
+class TemplateBytecodeCache(BytecodeCache):
+    """Persistent cache of the compiled templates (Jinja bytecode), by the name and the source of the template"""
+
+    def __init__(self, directory: str | Path) -> None:
+        """
+        Args:
+            directory (str | Path): directory of the cache (created if not exists).
+        """
+        self._cache = DiskCache(directory)
+
+    @staticmethod
+    def key(bucket: Bucket) -> str:
+        """
+        Args:
+            bucket (Bucket): the bucket of a template.
+
+        Returns:
+            str: key of the template in the cache (templates with the same name and other sources are kept apart).
+        """
+        return f"{bucket.key}:{bucket.checksum}"
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        value = self._cache.get(self.key(bucket))
+        if value is not None:
+            bucket.bytecode_from_string(value)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        self._cache.set(self.key(bucket), bucket.bytecode_to_string())
+
+
+@lru_cache(maxsize=32)
+def _get_environment(kind: str, value: str | tuple[tuple[str, str], ...], use_cache: bool) -> Environment:
+    """
+    Args:
+        kind (str): the kind of the loader ("directory", "sources" or "compiled").
+        value (str | tuple[tuple[str, str], ...]): the directory (of the templates, or of the precompiled templates), or
+            the sources of the templates (pairs of name and source).
+        use_cache (bool): If True, the compiled templates are cached on the disk.
+
+    Returns:
+        Environment: the environment (shared by all the templates of the same loader in the process).
+    """
+    if kind == "compiled":
+        return Environment(loader=ModuleLoader(value))
+    loader = DictLoader(dict(value)) if kind == "sources" else FileSystemLoader(value)
+    bytecode_cache = TemplateBytecodeCache(get_cache_dir("templates")) if use_cache else None
+    return Environment(loader=loader, bytecode_cache=bytecode_cache)
+
+
+def get_environment(
+    directory: str | Path = None, sources: dict[str, str] = None, compiled_path: str | Path = None, use_cache: bool = False
+) -> Environment:
+    """Get the environment of the given templates (the same environment is returned for the same templates, so every
+    template is compiled once in the process).
+
+    Args:
+        directory (str | Path, optional): directory of the templates. Defaults to None.
+        sources (dict[str, str], optional): the sources of the templates (in memory), by their names. Defaults to None.
+        compiled_path (str | Path, optional): directory (or zip file) of precompiled templates (see `compile_templates`).
+            Defaults to None.
+        use_cache (bool, optional): If True, the compiled templates are cached on the disk (by their sources), see
+            `TemplateBytecodeCache`. Defaults to False.
+
+    Returns:
+        Environment: the environment.
+    """
+    if compiled_path is not None:
+        return _get_environment("compiled", str(Path(compiled_path).resolve()), use_cache)
+    if sources is not None:
+        return _get_environment("sources", tuple(sorted(sources.items())), use_cache)
+    return _get_environment("directory", str(Path(directory).resolve()), use_cache)
+
+
+def compile_templates(
+    templates_dir: str | Path, target: str | Path, zip_file: bool = True, extensions: list[str] = ("j2",)
+) -> Path:
+    """Precompile all the templates of the given directory (to ship them with `load_template(compiled_path=...)`).
+
+    Args:
+        templates_dir (str | Path): directory of the templates.
+        target (str | Path): the zip file (or the directory) of the precompiled templates.
+        zip_file (bool, optional): If True, the precompiled templates are written to a zip file. Defaults to True.
+        extensions (list[str], optional): the extensions of the templates files (other files are ignored).
+            Defaults to ("j2",).
+
+    Returns:
+        Path: the path of the precompiled templates.
+    """
+    target = Path(target)
+    environment = Environment(loader=FileSystemLoader(str(Path(templates_dir).resolve())))
+    environment.compile_templates(str(target), extensions=extensions, zip="deflated" if zip_file else None)
+    logging.info("Precompiled templates path: %s", target.resolve())
+    return target
+
 
-def load_template(path: str | Path):
+def load_template(
+    path: str | Path, sources: dict[str, str] = None, compiled_path: str | Path = None, use_cache: bool = False
+):
     """Load the template file (.j2).
 
     Args:
         path (str | Path): Path to the release notes template file (Jinja).
+        sources (dict[str, str], optional): The sources of the template and the templates it includes (in memory), by
+            their names, instead of reading the directory of the path. Defaults to None.
+        compiled_path (str | Path, optional): Directory (or zip file) of precompiled templates (see `compile_templates`),
+            instead of the sources (only the name of the path is used). Defaults to None.
+        use_cache (bool, optional): If True, the compiled templates are cached on the disk. Defaults to False.
 
     Returns:
         The template object.
     """
     path = path if path is None or isinstance(path, Path) else Path(path)
+    if compiled_path is not None:
+        logging.info("Loading the precompiled release notes template: %s from: %s", path.name, compiled_path)
+        return get_environment(compiled_path=compiled_path).get_template(path.name)
+    if sources is not None:
+        assert path.name in sources, f"No such template: {path.name}"
+        logging.info("Loading the release notes template file from: %s", path)
+        return get_environment(sources=sources, use_cache=use_cache).get_template(path.name)
     assert path.exists(), f"No such file: {path.resolve()}"
     logging.info("Loading the release notes template file from: %s", path.resolve())
-    file_loader = FileSystemLoader(str(path.parent.resolve()))
-    env = Environment(loader=file_loader)
-    template = env.get_template(path.name)
-    return template
+    return get_environment(directory=path.parent, use_cache=use_cache).get_template(path.name)
@@ -0,0 +1,42 @@
+"""Shared fixtures of the regressions tests"""
+import os
+import subprocess
+from pathlib import Path
+import pytest
+
+
+def git(path: Path, *args: str, author: str = "octocat", date: str = "2023-01-01T10:00:00+00:00") -> str:
+    "Run a git command in the given repository, with the given author and date (of the author and of the committer)"
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME=author,
+        GIT_AUTHOR_EMAIL=f"{author}@github.com",
+        GIT_COMMITTER_NAME=author,
+        GIT_COMMITTER_EMAIL=f"{author}@github.com",
+        GIT_AUTHOR_DATE=date,
+        GIT_COMMITTER_DATE=date,
+    )
+    return subprocess.run(["git", "-C", str(path), *args], check=True, capture_output=True, text=True, env=env).stdout
+
+
+@pytest.fixture(name="local_clone")
+def fixture_local_clone(tmp_path):
+    """Local clone with the history (first-parent): v1, merge of pull request #2 (a branch with a "(#9)" commit), squash of
+    pull request #3, v2, squash of pull request #4, v3"""
+    path = tmp_path / "clone"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    git(path, "remote", "add", "origin", "https://github.com/octocat/tool.git")
+    git(path, "commit", "-q", "--allow-empty", "-m", "Initial commit", date="2023-01-01T10:00:00+00:00")
+    git(path, "tag", "v1")
+    git(path, "checkout", "-q", "-b", "feature")
+    git(path, "commit", "-q", "--allow-empty", "-m", "Cherry-pick a fix (#9)", author="bob", date="2023-01-02T10:00:00+00:00")
+    git(path, "commit", "-q", "--allow-empty", "-m", "Add the feature", author="alice", date="2023-01-03T10:00:00+00:00")
+    git(path, "checkout", "-q", "main")
+    message = ["-m", "Merge pull request #2 from alice/feature", "-m", "Add the feature"]
+    git(path, "merge", "-q", "--no-ff", *message, "feature", author="merger", date="2023-01-04T10:00:00+00:00")
+    git(path, "commit", "-q", "--allow-empty", "-m", "Add a flag (#3)", author="carol", date="2023-01-05T10:00:00+00:00")
+    git(path, "tag", "v2")
+    git(path, "commit", "-q", "--allow-empty", "-m", "Fix a bug (#4)", author="dave", date="2023-01-06T10:00:00+00:00")
+    git(path, "tag", "v3")
+    return path
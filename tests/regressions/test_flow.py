@@ -1,11 +1,12 @@
 """Test rnotes (flow)"""
+import json
 import os
 import sys
 import pytest
 from pathlib import Path
 
 sys.path.insert(0, ".")
-from rnotes.rnotes import generate_release_notes
+from rnotes.rnotes import generate_release_notes, generate_release_notes_manifest
 from rnotes.utils import init_log
 
 has_github_token = pytest.mark.skipif(
@@ -42,3 +43,39 @@ class TestFlow:
             golden_path.write_text(result_path.read_text())
             return
         assert result_path.read_text() == golden_path.read_text()
+
+
+class TestManifest:
+    """Test the release notes of many repositories (a pool of processes), from local clones"""
+
+    def test_manifest(self, local_clone, tmp_path, monkeypatch):
+        "Test that every entry of the manifest is generated on the pool, and that a failed entry doesn't stop the others"
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        input_dir = Path("./tests/collaterals").resolve()
+        body = (input_dir / "pull_request_template.md").read_text().replace("```text\n  A", "> A").replace("  ```\n", "")
+        snapshot = [dict(number=number, title=f"PR {number}", url=f"u{number}", author="a", body=body) for number in range(1, 5)]
+        (tmp_path / "snapshot.json").write_text(json.dumps(snapshot))
+        defaults = dict(
+            local_path=str(local_clone),
+            snapshot_path="snapshot.json",
+            grammar_path=str(input_dir / "grammar.py"),
+            release_notes_path=str(input_dir / "release_notes.j2"),
+            additional_content_path=str(input_dir / "additional_content.py"),
+        )
+        entries = [
+            dict(repository_name="octocat/tool", from_tag="v1", to_tag="v2"),
+            dict(repository_name="octocat/missing", from_tag="v1", to_tag="v2", local_path=str(tmp_path / "missing")),
+            dict(repository_name="octocat/batch", tags=["v1", "v2", "v3"]),
+        ]
+        (tmp_path / "manifest.json").write_text(json.dumps(entries))
+        reports = generate_release_notes_manifest(tmp_path / "manifest.json", tmp_path / "output", max_workers=2, **defaults)
+        assert [(report["repository_name"], report["success"]) for report in reports] == [
+            ("octocat/tool", True),
+            ("octocat/missing", False),
+            ("octocat/batch", True),
+        ]
+        assert reports[1]["error"]
+        assert len(reports[0]["paths"]) == 1 and len(reports[2]["paths"]) == 2
+        for path in reports[0]["paths"] + reports[2]["paths"]:
+            assert Path(path).parent.parent == tmp_path / "output"
+            assert "Title of the ticket as appears in HSD" in Path(path).read_text()
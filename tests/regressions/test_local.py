@@ -0,0 +1,55 @@
+"""Test the query of the pull requests from a local clone of the repository"""
+import json
+import sys
+from datetime import datetime
+
+sys.path.insert(0, ".")
+from rnotes.local import LocalRepository
+
+
+class TestLocalRepository:
+    """Test the pull requests that are found by the merge/squash commits of a local clone"""
+
+    def test_merged_pull_requests(self, local_clone):
+        "Test the merge and squash subjects (first-parent only), and the author of a merged branch"
+        pull_requests = LocalRepository(local_clone).get_merged_pull_requests("v1", "v2")
+        assert [(pull_request.number, pull_request.name, pull_request.author) for pull_request in pull_requests] == [
+            (2, "Add the feature", "alice"),
+            (3, "Add a flag", "carol"),
+        ]
+        assert pull_requests[0].url == "https://github.com/octocat/tool/pull/2"
+        assert pull_requests[0].merged_at == datetime(2023, 1, 4, 10)
+
+    def test_ranges(self, local_clone):
+        "Test the listing of the tags (by their dates), and the pull requests of every range of consecutive tags"
+        repository = LocalRepository(local_clone)
+        assert repository.get_tag_names() == ["v1", "v2", "v3"]
+        assert repository.get_tag_names("v[23]") == ["v2", "v3"]
+        ranges = repository.get_pull_requests_by_ranges(repository.get_tag_names())
+        assert [[pull_request.number for pull_request in pull_requests] for pull_requests in ranges] == [[2, 3], [4]]
+        assert [pull_request.number for pull_request in repository.get_pull_requests("v2")] == [4]
+
+    def test_annotated_tag(self, local_clone, monkeypatch):
+        "Test that an annotated tag is ordered by the date of its commit (as GithubRepository), not by the date it was created"
+        monkeypatch.setenv("GIT_COMMITTER_NAME", "octocat")
+        monkeypatch.setenv("GIT_COMMITTER_EMAIL", "octocat@github.com")
+        monkeypatch.setenv("GIT_COMMITTER_DATE", "2023-01-10T10:00:00+00:00")
+        repository = LocalRepository(local_clone)
+        repository.git("tag", "-a", "v1.5", "-m", "Late tag", "v2~1")
+        assert repository.get_tag_names() == ["v1", "v1.5", "v2", "v3"]
+        ranges = repository.get_pull_requests_by_ranges(["v1", "v1.5", "v2"])
+        assert [[pull_request.number for pull_request in pull_requests] for pull_requests in ranges] == [[2], [3]]
+
+    def test_filter_by_login(self, local_clone, tmp_path):
+        "Test that the filter is applied to the GitHub logins of the authors (of the snapshot), not to the git names"
+        snapshot = [
+            dict(number=2, title="Add the feature", url="u2", author="alice-gh", body="Body 2"),
+            dict(number=3, title="Add a flag", url="u3", author="carol-gh", body="Body 3"),
+        ]
+        (tmp_path / "snapshot.json").write_text(json.dumps(snapshot))
+        repository = LocalRepository(
+            local_clone, snapshot_path=tmp_path / "snapshot.json", pull_request_filter=lambda pr: pr.author != "alice-gh"
+        )
+        assert [(pull_request.number, pull_request.author) for pull_request in repository.get_pull_requests("v1", "v2")] == [
+            (3, "carol-gh")
+        ]
@@ -0,0 +1,178 @@
+"""Test the parser of the pull requests comments"""
+import os
+import sys
+import timeit
+from pathlib import Path
+from unittest import mock
+import pytest
+from parsimonious import ParseError
+
+sys.path.insert(0, ".")
+from rnotes.parser import (
+    PARALLEL_THRESHOLD,
+    CachedParseError,
+    CommentParser,
+    GrammarCache,
+    ParseCache,
+    Tokens,
+    load_grammar,
+    load_grammar_file,
+)
+from rnotes.query import GithubPullRequest
+
+
+has_benchmark = pytest.mark.skipif(
+    "RNOTES_BENCHMARK" not in os.environ,
+    reason="RNOTES_BENCHMARK environment variable is not defined",
+)
+
+
+def make_comment(number: int, include: str = "Yes", normalize: bool = True) -> str:
+    "Make a comment of a pull request (normalized, as given to the parser, unless normalize is False)"
+    comment = f"""#
+## Release notes:
+* **Ticket**: [[{number}](https://hsd/#/{number})] - `Ticket title number {number}`
+* **Tag**: `Bug`
+* **Topic**: `Clock automation`
+* **Highlight**: `No`
+* **Add to release notes**: `{include}`
+* **Description**:
+  > A description about the PR {number}, that will eventually be written to the release notes of the tool.
+#
+## Changes:
+* Change 1: ...
+"""
+    return " ".join(comment.split()) if normalize else comment
+
+
+@pytest.fixture(name="grammar", scope="module")
+def fixture_grammar():
+    "The grammar of the collaterals"
+    return load_grammar(Path("./tests/collaterals/grammar.py"))
+
+
+class TestParseCache:
+    """Test the cache of the results of the parser"""
+
+    def test_cached_tokens(self, grammar, tmp_path):
+        "Test that a comment is parsed once, and that the cached tokens are the same as the parsed tokens"
+        parser = CommentParser(grammar=grammar, cache=ParseCache(tmp_path))
+        comment = make_comment(1)
+        expected = CommentParser(grammar=grammar).parse_comment(comment)
+        assert expected[Tokens.TICKET_NUMBER] == "1"
+        assert parser.parse_comment(comment) == expected
+        with mock.patch.object(grammar, "parse", side_effect=AssertionError("parsed again")):
+            assert CommentParser(grammar=grammar, cache=ParseCache(tmp_path)).parse_comment(comment) == expected
+
+    def test_cached_error(self, grammar, tmp_path):
+        "Test that a parse error is cached, with the type and the message of the original error"
+        parser = CommentParser(grammar=grammar, cache=ParseCache(tmp_path))
+        with pytest.raises(ParseError) as error:
+            parser.parse_comment("garbage")
+        with pytest.raises(CachedParseError) as cached_error:
+            parser.parse_comment("garbage")
+        assert cached_error.value.type_name == type(error.value).__name__
+        assert str(cached_error.value) == str(error.value)
+
+
+class TestGrammarCache:
+    """Test the cache of the loaded grammar files"""
+
+    def test_cached_grammar(self, tmp_path):
+        "Test that the grammar file is executed and compiled once (a corrupted entry is a miss), and the cached grammar is equal"
+        path = Path("./tests/collaterals/grammar.py")
+        grammar, all_topics, all_types = load_grammar_file(path, cache=GrammarCache(tmp_path))
+        assert all_topics is None and all_types == ["Bug", "Enhancement"]
+        with mock.patch("rnotes.parser.eval_file", side_effect=AssertionError("executed again")), mock.patch(
+            "rnotes.parser.loads_grammar", side_effect=AssertionError("compiled again")
+        ):
+            cached_grammar, cached_topics, cached_types = load_grammar_file(path, cache=GrammarCache(tmp_path))
+        assert str(cached_grammar) == str(grammar)
+        assert cached_topics == all_topics and cached_types == all_types
+        GrammarCache(tmp_path).set(GrammarCache.key(path.read_text()), b"corrupted")
+        assert str(load_grammar_file(path, cache=GrammarCache(tmp_path))[0]) == str(grammar)
+        comment = make_comment(1)
+        assert CommentParser(grammar=cached_grammar).parse_comment(comment) == CommentParser(grammar=grammar).parse_comment(comment)
+
+
+class TestTokenExtractor:
+    """Test the extractor of the tokens from the parse trees"""
+
+    @staticmethod
+    def parse_long_comment(grammar):
+        "Parse a long comment, and returns the parse tree and a function that visits the whole tree (the baseline)"
+        comment = " ".join([make_comment(1), *(f"* Change {number}: a change in the code." for number in range(2000))])
+        tree = grammar.parse(comment)
+
+        def visit() -> dict[str, str]:
+            builder = CommentParser.SyntaxTreeBuilder()
+            builder.visit(tree)
+            return builder.leaf_name_to_value
+
+        return tree, visit
+
+    def test_same_as_visitor(self, grammar):
+        "Test that the extractor returns the same tokens as the full tree visitor"
+        tree, visit = self.parse_long_comment(grammar)
+        assert CommentParser(grammar=grammar).extractor.extract(tree) == visit()
+
+    @has_benchmark
+    def test_benchmark(self, grammar):
+        "Benchmark the extractor against the full tree visitor (opt-in: the timing depends on the machine)"
+        tree, visit = self.parse_long_comment(grammar)
+        extractor = CommentParser(grammar=grammar).extractor
+        visitor_time = min(timeit.repeat(visit, number=50, repeat=3))
+        extractor_time = min(timeit.repeat(lambda: extractor.extract(tree), number=50, repeat=3))
+        assert extractor_time < visitor_time, f"Visitor: {visitor_time:.4f}s, extractor: {extractor_time:.4f}s"
+
+
+class TestWindow:
+    """Test the parsing of the section of the comments that the grammar cares about"""
+
+    def test_huge_comment(self, grammar):
+        "Test that only the section is parsed (same tokens, up to the trailing spaces), and that it's truncated if needed"
+        comment = make_comment(1, normalize=False) + "\n## Logs:\n" + "ERROR: a pasted line of a log\n" * 4000
+        pull_request = GithubPullRequest(name="PR 1", url="https://github.com/dummy/pull/1", author="author", comment=comment)
+        parser = CommentParser(grammar=grammar, window_size=10_000)
+        assert parser.section_marker == "Release notes:"
+        window = parser.get_comment_text(pull_request)
+        assert window.startswith("## Release notes:") and window.endswith("release notes of the tool.")
+        expected = CommentParser(grammar=grammar).parse_pull_requests([pull_request])
+        assert [{name: value.strip() for name, value in comment.items() if value} for comment in expected] == [
+            {name: value.strip() for name, value in comment.items() if value}
+            for comment in parser.parse_pull_requests([pull_request])
+        ]
+        assert len(CommentParser(grammar=grammar, window_size=100).get_comment_text(pull_request)) <= 100
+
+
+class TestParallelParsing:
+    """Test the parsing of the pull requests on processes"""
+
+    def test_same_as_serial(self, grammar):
+        "Test that the results on processes are the same as the serial results (same order, same ignored pull requests)"
+        pull_requests = [
+            GithubPullRequest(
+                name=f"PR {number}",
+                url=f"https://github.com/dummy/pull/{number}",
+                author="author",
+                comment=None
+                if number % 11 == 0
+                else "garbage"
+                if number % 5 == 0
+                else make_comment(number, include="No" if number % 7 == 0 else "Yes"),
+            )
+            for number in range(1, 2 * PARALLEL_THRESHOLD)
+        ]
+        expected = CommentParser(grammar=grammar).parse_pull_requests(pull_requests)
+        assert [comment[Tokens.TICKET_NUMBER] for comment in expected] == [
+            str(number) for number in range(1, 2 * PARALLEL_THRESHOLD) if number % 5 and number % 7 and number % 11
+        ]
+        with CommentParser(grammar=grammar, processes=2, chunk_size=4) as parser:
+            assert parser.parse_pull_requests(pull_requests) == expected
+            executor = parser.executor
+            assert parser.parse_ranges([pull_requests[:PARALLEL_THRESHOLD], pull_requests[PARALLEL_THRESHOLD:]]) == [
+                CommentParser(grammar=grammar).parse_pull_requests(pull_requests[:PARALLEL_THRESHOLD]),
+                CommentParser(grammar=grammar).parse_pull_requests(pull_requests[PARALLEL_THRESHOLD:]),
+            ]
+            assert parser.executor is executor
+        assert parser._executor is None  # pylint: disable=protected-access
@@ -0,0 +1,119 @@
+"""Test the processing of the comments to the release data"""
+import random
+import sys
+import pytest
+
+sys.path.insert(0, ".")
+from rnotes.process import Issue, IssueTable, ReleaseData
+
+
+def make_issue(ticket_number: str, topic: str, type_of_issue: str, highlight: bool = False, author: str = None) -> Issue:
+    "Make an issue with the given fields"
+    return Issue(
+        description=f"Description {ticket_number}",
+        ticket_number=ticket_number,
+        ticket_url=f"https://hsd/#/{ticket_number}",
+        ticket_title=f"Title {ticket_number}",
+        highlight=highlight,
+        topic=topic,
+        type=type_of_issue,
+        image=None,
+        author=author,
+    )
+
+
+class TestReleaseData:
+    """Test the views and the lookups of the release data"""
+
+    def test_order(self):
+        "Test the order of the topics and the types (names that are not in the ordering lists are ordered last)"
+        issues = [
+            make_issue("3", "Reset", "Bug"),
+            make_issue("1", "Clock", "Enhancement", highlight=True),
+            make_issue("2", "Clock", "Bug", highlight=True),
+            make_issue("4", "Other", "Task"),
+            make_issue("0", "Clock", "Task"),
+        ]
+        release_data = ReleaseData(issues, order_by_topics=["Reset", "Clock"], order_by_types=["Bug", "Enhancement"])
+        assert [topic.name for topic in release_data.topics] == ["Reset", "Clock", "Other"]
+        clock = release_data.topics[1].type_to_issues
+        assert list(clock) == ["Bug", "Enhancement", "Task"]
+        assert [issue.ticket_number for issues in clock.values() for issue in issues] == ["2", "1", "0"]
+        assert [issue.ticket_number for issue in release_data.highlights] == ["1", "2"]
+
+    def test_lookups(self):
+        "Test the lookups of the issues by type, topic and author"
+        issues = [
+            make_issue("1", "Clock", "Bug", author="alice"),
+            make_issue("2", "Reset", "Bug", author="bob"),
+            make_issue("3", "Clock", "Enhancement", author="alice"),
+        ]
+        release_data = ReleaseData(issues)
+        assert release_data.issues_by_type("Bug") == issues[:2]
+        assert release_data.issues_by_topic("Clock") == [issues[0], issues[2]]
+        assert release_data.issues_by_author("alice") == [issues[0], issues[2]]
+        assert release_data.issues_by_type("Task") == []
+        assert list(release_data.type_to_issue) == ["Bug", "Enhancement"]
+
+    def test_incremental(self):
+        "Test that adding and removing issues gives the same views as building, and rebuilds only the affected topic"
+        issues = [
+            make_issue("3", "Reset", "Bug"),
+            make_issue("1", "Clock", "Enhancement", highlight=True),
+            make_issue("2", "Clock", "Bug", highlight=True),
+            make_issue("0", "Other", "Task", highlight=True),
+        ]
+        release_data = ReleaseData(issues[:2], order_by_types=["Bug", "Enhancement"])
+        reset = release_data.get_topic("Reset")
+        for issue in issues[2:]:
+            release_data.add_issue(issue)
+        assert release_data.get_topic("Reset") is reset
+        release_data.remove_issue(issues[1])
+        expected = ReleaseData([issues[0], *issues[2:]], order_by_types=["Bug", "Enhancement"])
+        assert release_data.topics == expected.topics
+        assert release_data.highlights == expected.highlights == [issues[3], issues[2]]
+        assert release_data.issues_by_type("Enhancement") == []
+        assert release_data.table.count_by("topic") == {"Reset": 1, "Clock": 1, "Other": 1}
+
+    def test_random_updates(self):
+        "Test that random additions and removals (of equal issues too) give the same lookups as building from the rest"
+        rnd = random.Random(0)
+        release_data, present = ReleaseData([], order_by_types=["Bug"]), []
+        for number in range(300):
+            if present and rnd.random() < 0.4:
+                release_data.remove_issue(present.pop(rnd.randrange(len(present))))
+            else:
+                topic, type_of_issue, author = rnd.choice("AB"), rnd.choice(["Bug", "Task"]), rnd.choice("xy")
+                issue = make_issue(str(number % 7), topic, type_of_issue, number % 3 == 0, author)
+                release_data.add_issue(issue)
+                present.append(issue)
+        expected = ReleaseData(present, order_by_types=["Bug"])
+        assert list(map(id, release_data.issues)) == list(map(id, present))
+        for name in ("Bug", "Task"):
+            assert release_data.issues_by_type(name) == expected.issues_by_type(name)
+        for name in "xy":
+            assert release_data.issues_by_author(name) == expected.issues_by_author(name)
+        assert release_data.topics == expected.topics and release_data.highlights == expected.highlights
+        with pytest.raises(AssertionError):
+            release_data.remove_issue(make_issue("0", "A", "Bug"))
+
+
+class TestIssueTable:
+    """Test the statistics of the columnar table of the issues"""
+
+    def test_statistics(self):
+        "Test the counts by columns, the highlights and the statistics of every release"
+        table = IssueTable()
+        table.add_issues([make_issue("1", "Clock", "Bug", True, "alice"), make_issue("2", "Reset", "Bug", False, "bob")], "v1")
+        table.add_issues([make_issue("3", "Clock", "Enhancement", True, "alice")], "v2")
+        assert len(table) == 3
+        assert table.count_by("type") == {"Bug": 2, "Enhancement": 1}
+        assert table.count_by("release", "author") == {("v1", "alice"): 1, ("v1", "bob"): 1, ("v2", "alice"): 1}
+        assert table.count_by("topic", highlights=True) == {"Clock": 2}
+        assert table.histogram("author") == [("alice", 2), ("bob", 1)]
+        assert table.highlight_ratio("release") == {"v1": 0.5, "v2": 1.0}
+        statistics = table.statistics()
+        assert statistics["issues"] == 3 and statistics["highlights"] == 2
+        assert statistics["by_release"]["v2"] == dict(
+            issues=1, highlights=1, highlight_ratio=1.0, by_type={"Enhancement": 1}, by_topic={"Clock": 1}, by_author={"alice": 1}
+        )
@@ -0,0 +1,635 @@
+"""Test the query of the pull requests from GitHub, against a local fake GitHub server"""
+import base64
+import hashlib
+import json
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qsl, unquote, urlparse
+import pytest
+from github import Github
+from github.Requester import Requester
+
+sys.path.insert(0, ".")
+from rnotes.query import (
+    NOT_LOADED,
+    BodyLoader,
+    GithubPullRequest,
+    GithubRepository,
+    PullRequestStore,
+    QueryEngine,
+    ResponseCache,
+    TagIndex,
+    cached_connections,
+)
+from rnotes.rnotes import generate_release_notes_batch
+from rnotes.transport import GithubClient
+from rnotes.utils import ContentStore
+
+
+OWNER, NAME = "octocat", "tool"
+
+
+def make_pull_request(number: int, merged_at: str, login: str = "octocat", body: str = None, updated_at: str = None) -> dict:
+    "Make a merged pull request, as returned by the REST API"
+    return {
+        "number": number,
+        "title": f"PR {number}",
+        "html_url": f"https://github.com/{OWNER}/{NAME}/pull/{number}",
+        "url": f"/repos/{OWNER}/{NAME}/pulls/{number}",
+        "user": {"login": login},
+        "body": f"Body {number}" if body is None else body,
+        "state": "closed",
+        "merged_at": merged_at,
+        "closed_at": merged_at,
+        "updated_at": updated_at or merged_at,
+    }
+
+
+def to_graphql_node(item: dict, fields: str) -> dict:
+    "Convert a pull request of the REST API to a GraphQL node (with the body only if it's in the queried fields)"
+    login = item["user"]["login"]
+    node = {
+        "number": item["number"],
+        "title": item["title"],
+        "url": item["html_url"],
+        "author": {"__typename": "Bot", "login": login[: -len("[bot]")]}
+        if login.endswith("[bot]")
+        else {"__typename": "User", "login": login},
+        "mergedAt": item["merged_at"],
+        "updatedAt": item["updated_at"],
+    }
+    if re.search(r"\bbody\b", fields):
+        node["body"] = item["body"]
+    return node
+
+
+class FakeRepository:
+    """State of the fake GitHub repository: its pull requests, tags, commits and files"""
+
+    def __init__(self) -> None:
+        self.pull_requests: list[dict] = []
+        self.tags: dict[str, str] = {}
+        self.commits: dict[str, str] = {}
+        self.compare: dict[tuple[str, str], list[str]] = {}
+        self.commit_pull_requests: dict[str, list[int]] = {}
+        self.trees: dict[str, dict[str, str]] = {}
+        "Files of every reference: {reference: {path: content}}"
+        self.search_limit = 1000
+        self.blob_limit = 1000
+
+    def get_pull_request(self, number: int) -> dict:
+        "The pull request of the given number"
+        return next(item for item in self.pull_requests if item["number"] == number)
+
+    def merged(self, key: str) -> list[dict]:
+        "The merged pull requests, ordered by the given field (the most recent first)"
+        return sorted((item for item in self.pull_requests if item["merged_at"]), key=lambda item: item[key], reverse=True)
+
+
+class FakeGithub(BaseHTTPRequestHandler):
+    """Fake GitHub server of a single repository (REST and GraphQL), that serves the state in `repository` (the responses
+    of the REST requests have an ETag, and not modified responses are answered with 304)"""
+
+    repository = FakeRepository()
+    requests = []
+
+    def log_message(self, *args):
+        "Silent log"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        "Serve a REST request"
+        self._serve("GET")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        "Serve a GraphQL request"
+        self._serve("POST")
+
+    def _serve(self, method: str) -> None:
+        url = urlparse(self.path)
+        path, params = unquote(url.path), dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        FakeGithub.requests.append((method, path, params, dict(self.headers), body))
+        status, data = 404, {"message": "Not Found"}
+        for route_method, pattern, handler in ROUTES:
+            if route_method == method and (match := re.fullmatch(pattern, path)):
+                status, data = 200, handler(FakeGithub.repository, *match.groups(), params=params, body=body)
+                if data is None:
+                    status, data = 404, {"message": "Not Found"}
+                break
+        content = json.dumps(data).encode()
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        if method == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+            status, content = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if method == "GET":
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def get_repository(repository: FakeRepository, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>"
+    base_url = f"{FakeGithub.base_url}/repos/{OWNER}/{NAME}"
+    return {"url": base_url, "full_name": f"{OWNER}/{NAME}", "name": NAME, "owner": {"login": OWNER}, "default_branch": "main"}
+
+
+def get_pages(items: list, params: dict) -> list:
+    "The requested page of the given items"
+    per_page, page = int(params.get("per_page", 30)), int(params.get("page", 1))
+    return items[(page - 1) * per_page : page * per_page]
+
+
+def get_pulls(repository: FakeRepository, params: dict, body: dict) -> list:
+    "GET /repos/<owner>/<name>/pulls (state=closed)"
+    key = "updated_at" if params.get("sort") == "updated" else "merged_at"
+    items = sorted(repository.pull_requests, key=lambda item: item[key] or "", reverse=True)
+    return get_pages(items, params)
+
+
+def get_pull(repository: FakeRepository, number: str, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>/pulls/<number>"
+    return next((item for item in repository.pull_requests if item["number"] == int(number)), None)
+
+
+def get_tags(repository: FakeRepository, params: dict, body: dict) -> list:
+    "GET /repos/<owner>/<name>/tags"
+    tags = [
+        {"name": name, "commit": {"sha": sha, "url": f"/repos/{OWNER}/{NAME}/commits/{sha}"}}
+        for name, sha in repository.tags.items()
+    ]
+    return get_pages(tags, params)
+
+
+def get_tag_ref(repository: FakeRepository, tag_name: str, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>/git/ref/tags/<tag>"
+    sha = repository.tags.get(tag_name)
+    return {"ref": f"refs/tags/{tag_name}", "object": {"sha": sha, "type": "commit"}} if sha else None
+
+
+def get_commit(repository: FakeRepository, sha: str, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>/git/commits/<sha>"
+    if sha not in repository.commits:
+        return None
+    author = {"name": "octocat", "email": "octocat@github.com", "date": repository.commits[sha]}
+    return {"sha": sha, "url": f"/repos/{OWNER}/{NAME}/git/commits/{sha}", "author": author, "committer": author, "message": sha}
+
+
+def get_compare(repository: FakeRepository, base: str, head: str, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>/compare/<base>...<head>"
+    shas = repository.compare.get((base, head))
+    return {"total_commits": len(shas), "commits": [{"sha": sha} for sha in get_pages(shas, params)]} if shas is not None else None
+
+
+def get_contents(repository: FakeRepository, path: str, params: dict, body: dict) -> dict:
+    "GET /repos/<owner>/<name>/contents/<path>"
+    content = repository.trees.get(params.get("ref", "HEAD"), {}).get(path)
+    if content is None:
+        return None
+    sha = ContentStore.blob_sha(content.encode())
+    url = f"/repos/{OWNER}/{NAME}/contents/{path}"
+    encoded = base64.b64encode(content.encode()).decode()
+    name = path.split("/")[-1]
+    return {"type": "file", "encoding": "base64", "content": encoded, "name": name, "path": path, "sha": sha, "url": url}
+
+
+def get_tree(repository: FakeRepository, expression: str) -> dict:
+    "The entries of a directory (expression: '<reference>:<directory>'), with the texts of the blobs up to `blob_limit`"
+    reference, directory = expression.split(":", 1)
+    prefix = f"{directory}/" if directory else ""
+    entries = {}
+    for path, content in repository.trees.get(reference, {}).items():
+        if not path.startswith(prefix):
+            continue
+        name, _, rest = path[len(prefix) :].partition("/")
+        if rest:
+            entries.setdefault(name, {"name": name, "type": "tree", "oid": name, "object": {}})
+            continue
+        truncated = len(content) > repository.blob_limit
+        blob = {"text": None if truncated else content, "isBinary": False, "isTruncated": truncated}
+        entries[name] = {"name": name, "type": "blob", "oid": ContentStore.blob_sha(content.encode()), "object": blob}
+    return {"entries": list(entries.values())} if entries else None
+
+
+def search_issues(repository: FakeRepository, params: dict, body: dict) -> dict:
+    "GET /search/issues (merged pull requests in a window: merged:<start>..<end>, up to `search_limit` results)"
+    start, end = re.search(r"merged:(\S+)\.\.(\S+)", params["q"]).groups()
+    start, end = (datetime.fromisoformat(date).replace(tzinfo=None) for date in (start, end))
+    items = [
+        dict(item, pull_request={"merged_at": item["merged_at"]})
+        for item in repository.merged("merged_at")
+        if start <= datetime.fromisoformat(item["merged_at"][:-1]) <= end
+    ]
+    return {"total_count": len(items), "items": get_pages(items[: repository.search_limit], params)}
+
+
+def graphql(repository: FakeRepository, params: dict, body: dict) -> dict:
+    "POST /graphql (the queries of rnotes.query)"
+    query, variables = body["query"], body.get("variables") or {}
+    if "object(expression:" in query:
+        return {"data": {"repository": {"object": get_tree(repository, variables["expression"])}}}
+    if "pullRequests(" in query:
+        fields = re.search(r"nodes \{(.*)\}", query).group(1)
+        items = repository.merged("updated_at")
+        start = int(variables.get("cursor") or 0)
+        page = items[start : start + 100]
+        return {
+            "data": {
+                "repository": {
+                    "pullRequests": {
+                        "pageInfo": {"hasNextPage": start + 100 < len(items), "endCursor": str(start + 100)},
+                        "nodes": [to_graphql_node(item, fields) for item in page],
+                    }
+                }
+            }
+        }
+    data = {}
+    for alias, sha, fields in re.findall(r'(c\d+): object\(oid: "(\w+)"\).*?nodes \{(.*?)\} \}', query):
+        numbers = repository.commit_pull_requests.get(sha, [])
+        nodes = [to_graphql_node(repository.get_pull_request(number), fields) for number in numbers]
+        data[alias] = {"associatedPullRequests": {"nodes": nodes}}
+    for alias, number, fields in re.findall(r"(p\d+): pullRequest\(number: (\d+)\) \{(.*)\}", query):
+        item = next((item for item in repository.pull_requests if item["number"] == int(number)), None)
+        data[alias] = to_graphql_node(item, fields) if item else None
+    return {"data": {"repository": data}}
+
+
+ROUTES = [
+    ("GET", rf"/repos/{OWNER}/{NAME}", get_repository),
+    ("GET", rf"/repos/{OWNER}/{NAME}/pulls", get_pulls),
+    ("GET", rf"/repos/{OWNER}/{NAME}/pulls/(\d+)", get_pull),
+    ("GET", rf"/repos/{OWNER}/{NAME}/tags", get_tags),
+    ("GET", rf"/repos/{OWNER}/{NAME}/git/ref/tags/(.+)", get_tag_ref),
+    ("GET", rf"/repos/{OWNER}/{NAME}/git/commits/(\w+)", get_commit),
+    ("GET", rf"/repos/{OWNER}/{NAME}/compare/(.+)\.\.\.(.+)", get_compare),
+    ("GET", rf"/repos/{OWNER}/{NAME}/contents/(.+)", get_contents),
+    ("GET", r"/search/issues", search_issues),
+    ("POST", r"/graphql", graphql),
+]
+"The routes of the fake server: (method, path pattern, handler)"
+
+
+@pytest.fixture(name="fake_repository")
+def fixture_fake_repository():
+    "Run the fake GitHub server with an empty repository (the state of the repository is returned)"
+    FakeGithub.repository = FakeRepository()
+    FakeGithub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGithub)
+    FakeGithub.base_url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield FakeGithub.repository
+    server.shutdown()
+    Requester.resetConnectionClasses()
+
+
+@pytest.fixture(name="github_repository")
+def fixture_github_repository(fake_repository):
+    "Returns a function that creates a GithubRepository of the fake repository (with the given cache, page size and arguments)"
+
+    def get_github_repository(cache: ResponseCache = None, per_page: int = 30, **kwargs) -> GithubRepository:
+        with cached_connections(cache=cache):
+            github = Github("token", base_url=FakeGithub.base_url, per_page=per_page)
+        return GithubRepository(repository=github.get_repo(f"{OWNER}/{NAME}"), **kwargs)
+
+    return get_github_repository
+
+
+def get_requested_paths(method: str = "GET") -> list[str]:
+    "The paths of the requests of the given method that were sent to the fake server"
+    return [path for request_method, path, _, _, _ in FakeGithub.requests if request_method == method]
+
+
+def get_graphql_queries() -> list[str]:
+    "The GraphQL queries that were sent to the fake server"
+    return [body["query"] for method, _, _, _, body in FakeGithub.requests if method == "POST"]
+
+
+class TestPullRequest:
+    """Test the record of a pull request (lazy body, equality and hashing)"""
+
+    def test_lazy_comment(self):
+        "Test that a NOT_LOADED comment is loaded once, on the first access"
+        load_comment = mock.Mock(return_value="Body 1")
+        pull_request = GithubPullRequest("PR 1", "url", "octocat", NOT_LOADED, number=1, load_comment=load_comment)
+        assert not pull_request.is_loaded
+        assert pull_request.comment == pull_request.comment == "Body 1"
+        assert pull_request.is_loaded
+        load_comment.assert_called_once_with(1)
+
+    def test_equality(self):
+        "Test that the pull requests are equal by their fields (as the dataclass it was), and are not hashable"
+        merged_at = datetime(2023, 1, 1)
+        pull_request = GithubPullRequest("PR 1", "url", "octocat", "Body 1", number=1, merged_at=merged_at)
+        assert pull_request == GithubPullRequest("PR 1", "url", "octocat", "Body 1", number=1, merged_at=merged_at)
+        assert pull_request != GithubPullRequest("PR 1", "url", "octocat", "Body 2", number=1, merged_at=merged_at)
+        assert pull_request != ("PR 1", "url", "octocat", "Body 1", 1, merged_at)
+        lazy = GithubPullRequest("PR 1", "url", "octocat", NOT_LOADED, 1, merged_at, load_comment=lambda number: f"Body {number}")
+        assert lazy.comment == "Body 1" and lazy == pull_request
+        with pytest.raises(TypeError):
+            hash(pull_request)
+
+
+class TestBodyLoader:
+    """Test the loading of the bodies on demand"""
+
+    def test_lazy_bodies(self, fake_repository, github_repository):
+        "Test that only the bodies of the pull requests that passed the filter are fetched, in a single batch"
+        fake_repository.pull_requests = [
+            make_pull_request(number, f"2023-01-0{number}T10:00:00Z", login="dependabot[bot]" if number % 2 else "octocat")
+            for number in range(1, 7)
+        ]
+        repository = github_repository(
+            engine=QueryEngine.GRAPHQL, lazy_bodies=True, pull_request_filter=lambda pr: "[bot]" not in pr.author
+        )
+        pull_requests = repository.fetch_pull_requests(from_date=datetime(2023, 1, 1), to_date=datetime(2023, 1, 10))
+        assert [pull_request.number for pull_request in pull_requests] == [2, 4, 6]
+        assert not any(pull_request.is_loaded for pull_request in pull_requests)
+        assert [pull_request.comment for pull_request in pull_requests] == ["Body 2", "Body 4", "Body 6"]
+        queries = get_graphql_queries()
+        assert " body " not in queries[0] and len(queries) == 2
+        assert sorted(re.findall(r"pullRequest\(number: (\d+)\)", queries[1])) == ["2", "4", "6"]
+
+    def test_concurrent_access(self):
+        "Test that the batch is fetched outside the lock, and once (threads that access its bodies wait for the fetch)"
+        started, release = threading.Event(), threading.Event()
+
+        def fetch(numbers):
+            started.set()
+            release.wait(timeout=10)
+            return {number: f"Body {number}" for number in numbers}
+
+        fetch = mock.Mock(side_effect=fetch)
+        loader = BodyLoader(fetch, batch_size=2)
+        pull_requests = [GithubPullRequest(f"PR {number}", "url", "octocat", NOT_LOADED, number) for number in range(4)]
+        for pull_request in pull_requests:
+            loader.attach(pull_request)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(lambda: pull_requests[0].comment)
+            assert started.wait(timeout=10)
+            second = executor.submit(lambda: pull_requests[1].comment)
+            loader.attach(GithubPullRequest("PR 4", "url", "octocat", NOT_LOADED, 4))
+            release.set()
+            assert (first.result(), second.result()) == ("Body 0", "Body 1")
+        assert pull_requests[2].comment == "Body 2"
+        assert [call.args[0] for call in fetch.call_args_list] == [[0, 1], [2, 3]]
+
+
+class TestEngines:
+    """Test that the engines return the same pull requests"""
+
+    def test_rest_graphql_parity(self, fake_repository, github_repository):
+        "Test that the REST and the GraphQL engines return the same pull requests (and the same logins of bots)"
+        fake_repository.pull_requests = [
+            make_pull_request(1, "2023-01-01T10:00:00Z"),
+            make_pull_request(2, "2023-01-02T10:00:00Z", login="dependabot[bot]"),
+            make_pull_request(3, "2023-01-03T10:00:00Z", updated_at="2023-02-10T10:00:00Z"),
+            make_pull_request(4, None, updated_at="2023-01-04T10:00:00Z"),
+            make_pull_request(5, "2023-01-20T10:00:00Z"),
+        ]
+        from_date, to_date = datetime(2023, 1, 1, 12), datetime(2023, 1, 10)
+        rest = github_repository(engine=QueryEngine.REST).fetch_pull_requests(from_date=from_date, to_date=to_date)
+        graphql = github_repository(engine=QueryEngine.GRAPHQL).fetch_pull_requests(from_date=from_date, to_date=to_date)
+        assert [pull_request.number for pull_request in rest] == [2, 3]
+        assert graphql == rest
+        assert graphql[0].author == "dependabot[bot]"
+
+    def test_search_windows(self, fake_repository, github_repository, monkeypatch, caplog):
+        "Test that the search windows with too many results are split, and listed with GraphQL if they can't be split"
+        monkeypatch.setattr("rnotes.query.SEARCH_RESULTS_LIMIT", 2)
+        fake_repository.search_limit = 2
+        fake_repository.pull_requests = [
+            make_pull_request(1, "2023-01-01T10:00:00Z"),
+            make_pull_request(2, "2023-01-02T10:00:00Z"),
+            make_pull_request(3, "2023-01-03T10:00:00Z"),
+            *(make_pull_request(number, "2023-01-04T10:00:00Z") for number in (4, 5, 6)),
+            make_pull_request(7, "2023-01-05T10:00:00Z"),
+            make_pull_request(8, "2023-01-20T10:00:00Z"),
+        ]
+        repository = github_repository(engine=QueryEngine.SEARCH)
+        pull_requests = repository.fetch_pull_requests(from_date=datetime(2023, 1, 1), to_date=datetime(2023, 1, 10))
+        assert sorted(pull_request.number for pull_request in pull_requests) == [1, 2, 3, 4, 5, 6, 7]
+        assert len(get_requested_paths()) > 2
+        assert get_graphql_queries()
+        assert "listing it with the GraphQL engine instead" in caplog.text
+
+    def test_compare(self, fake_repository, github_repository):
+        "Test that the compare engine selects the pull requests by the commits between the tags (not by their dates)"
+        fake_repository.tags = {"v1": "a1", "v2": "b1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z", "b1": "2023-01-10T10:00:00Z"}
+        fake_repository.compare = {("v1", "v2"): ["c1", "c2", "b1"]}
+        fake_repository.commit_pull_requests = {"c1": [1], "c2": [2]}
+        fake_repository.pull_requests = [
+            make_pull_request(1, "2023-01-05T10:00:00Z"),
+            make_pull_request(2, "2023-01-12T10:00:00Z"),
+            make_pull_request(3, "2023-01-06T10:00:00Z"),
+        ]
+        by_dates = github_repository(engine=QueryEngine.REST).get_pull_requests("v1", "v2")
+        by_commits = github_repository(engine=QueryEngine.COMPARE).get_pull_requests("v1", "v2")
+        assert [pull_request.number for pull_request in by_dates] == [1, 3]
+        assert [pull_request.number for pull_request in by_commits] == [1, 2]
+        assert by_commits[0] == by_dates[0]
+
+    def test_compare_ranges(self, fake_repository, github_repository):
+        "Test that the compare engine buckets the pull requests to the ranges by their commits (the first range wins)"
+        fake_repository.tags = {"v1": "a1", "v2": "b1", "v3": "c1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z", "b1": "2023-01-10T10:00:00Z", "c1": "2023-01-20T10:00:00Z"}
+        fake_repository.compare = {("v1", "v2"): ["x1", "x2", "b1"], ("v2", "v3"): ["x3", "x2", "c1"]}
+        fake_repository.commit_pull_requests = {"x1": [1], "x2": [2], "x3": [3], "c1": [3]}
+        fake_repository.pull_requests = [
+            make_pull_request(1, "2023-01-12T10:00:00Z"),
+            make_pull_request(2, "2023-01-08T10:00:00Z"),
+            make_pull_request(3, "2023-01-15T10:00:00Z"),
+        ]
+        ranges = github_repository(engine=QueryEngine.COMPARE).get_pull_requests_by_ranges(["v1", "v2", "v3"])
+        assert [[pull_request.number for pull_request in pull_requests] for pull_requests in ranges] == [[2, 1], [3]]
+
+
+class TestTagIndex:
+    """Test the index of the tags and the commits dates"""
+
+    def test_tag_names(self, fake_repository, github_repository):
+        "Test that the tags are ordered by the commits of the tags listing, and that only the missing dates are fetched"
+        fake_repository.tags = {"v2": "b1", "v1": "a1", "v1.1": "a1", "nightly": "c1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z", "b1": "2023-01-10T10:00:00Z", "c1": "2023-01-05T10:00:00Z"}
+        tag_index = TagIndex()
+        tag_index.add_commit("a1", datetime(2023, 1, 1, 10))
+        assert github_repository(tag_index=tag_index).get_tag_names("v*") == ["v1", "v1.1", "v2"]
+        assert [path for path in get_requested_paths() if "/git/" in path] == [f"/repos/{OWNER}/{NAME}/git/commits/b1"]
+
+    def test_moved_tag(self, fake_repository, github_repository, tmp_path):
+        "Test that only the commits dates are persistent (a moved tag is resolved again), and that the index is saved once"
+        fake_repository.tags = {"v1": "a1", "nightly": "b1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z", "b1": "2023-01-02T10:00:00Z", "b2": "2023-01-03T10:00:00Z"}
+        cache, path = ResponseCache(tmp_path / "responses"), tmp_path / "tags.json"
+        with github_repository(cache=cache, tag_index=TagIndex(path)) as repository:
+            assert repository.get_tag_date("v1") == datetime(2023, 1, 1, 10)
+            assert repository.get_tag_date("nightly") == repository.get_tag_date("nightly") == datetime(2023, 1, 2, 10)
+            assert not path.exists()
+        assert json.loads(path.read_text()) == {"commits": {"a1": "2023-01-01T10:00:00", "b1": "2023-01-02T10:00:00"}}
+        fake_repository.tags["nightly"] = "b2"
+        FakeGithub.requests = []
+        with github_repository(cache=cache, tag_index=TagIndex(path)) as repository:
+            assert repository.get_tag_date("v1") == datetime(2023, 1, 1, 10)
+            assert repository.get_tag_date("nightly") == datetime(2023, 1, 3, 10)
+        assert [path for path in get_requested_paths() if "/git/" in path] == [
+            f"/repos/{OWNER}/{NAME}/git/ref/tags/v1",
+            f"/repos/{OWNER}/{NAME}/git/ref/tags/nightly",
+            f"/repos/{OWNER}/{NAME}/git/commits/b2",
+        ]
+        assert "If-None-Match" in FakeGithub.requests[1][3]
+        assert set(TagIndex(path).get_date(sha) for sha in ("a1", "b1", "b2")) == {
+            datetime(2023, 1, 1, 10),
+            datetime(2023, 1, 2, 10),
+            datetime(2023, 1, 3, 10),
+        }
+
+
+class TestTransport:
+    """Test the repository with the asyncio transport"""
+
+    def test_client_lifetime(self, fake_repository, github_repository):
+        "Test that the client of the repository is used for the commits dates, and that it is closed with the repository"
+        fake_repository.tags = {"v1": "a1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z"}
+        client = GithubClient("token", base_url=FakeGithub.base_url)
+        with github_repository(client=client) as repository:
+            assert repository.get_tag_date("v1") == datetime(2023, 1, 1, 10)
+        assert client._loop.is_closed()  # pylint: disable=protected-access
+
+    def test_batch_lazy_bodies(self, fake_repository, github_repository, monkeypatch, tmp_path):
+        "Test that the batch loads the lazy bodies with the client, before the repository (and its client) is closed"
+        input_dir = Path("./tests/collaterals")
+        body = (input_dir / "pull_request_template.md").read_text().replace("```text\n  A", "> A").replace("  ```\n", "")
+        fake_repository.tags = {"v1": "a1", "v2": "b1", "v3": "c1"}
+        fake_repository.commits = {"a1": "2023-01-01T10:00:00Z", "b1": "2023-01-10T10:00:00Z", "c1": "2023-01-20T10:00:00Z"}
+        fake_repository.pull_requests = [
+            make_pull_request(1, "2023-01-05T10:00:00Z", body=body),
+            make_pull_request(2, "2023-01-15T10:00:00Z", body=body),
+        ]
+        client = GithubClient("token", base_url=FakeGithub.base_url)
+        repository = github_repository(client=client, engine=QueryEngine.GRAPHQL, lazy_bodies=True)
+        monkeypatch.setattr("rnotes.rnotes.get_github_repository", lambda **kwargs: repository)
+        paths = generate_release_notes_batch(
+            repository_name=f"{OWNER}/{NAME}",
+            tags=["v1", "v2", "v3"],
+            output_dir=tmp_path,
+            grammar_path=input_dir / "grammar.py",
+            release_notes_path=input_dir / "release_notes.j2",
+            additional_content_path=input_dir / "additional_content.py",
+            html=False,
+        )
+        assert len(paths) == 2 and all(path.is_file() for path in paths)
+        assert sorted(path for path in get_requested_paths() if "/pulls/" in path) == [
+            f"/repos/{OWNER}/{NAME}/pulls/1",
+            f"/repos/{OWNER}/{NAME}/pulls/2",
+        ]
+        assert client._loop.is_closed()  # pylint: disable=protected-access
+
+
+class TestFiles:
+    """Test the reading of the files of the repository (a GraphQL query per directory)"""
+
+    def test_directories(self, fake_repository, github_repository):
+        "Test nested directories, the reuse of the stored contents across references, and the fallback of truncated blobs"
+        fake_repository.blob_limit = 10
+        fake_repository.trees = {
+            "HEAD": {".rnotes/grammar.py": "grammar", ".rnotes/big.txt": "x" * 20, ".rnotes/sub/nested.py": "nested"},
+            "v1": {".rnotes/grammar.py": "grammar", ".rnotes/big.txt": "x" * 20, "README.md": "readme"},
+        }
+        repository = github_repository()
+        assert repository.read_file(".rnotes/grammar.py") == "grammar"
+        assert set(repository.get_directory(".rnotes")) == {".rnotes/grammar.py", ".rnotes/big.txt"}
+        assert repository.read_file(".rnotes/sub/nested.py") == "nested"
+        assert repository.read_file(".rnotes/big.txt") == "x" * 20
+        assert repository.read_file(".rnotes/big.txt", reference="v1") == "x" * 20
+        assert repository.read_file(".rnotes/grammar.py", reference="v1") == "grammar"
+        assert repository.read_file(".rnotes/sub/nested.py", reference="v1") is None
+        assert repository.read_file("README.md", reference="v1") == "readme"
+        expressions = [body["variables"]["expression"] for method, _, _, _, body in FakeGithub.requests if method == "POST"]
+        assert expressions == ["HEAD:.rnotes", "HEAD:.rnotes/sub", "v1:.rnotes", "v1:.rnotes/sub", "v1:"]
+        contents_paths = [path for path in get_requested_paths() if "/contents/" in path]
+        assert contents_paths == [f"/repos/{OWNER}/{NAME}/contents/.rnotes/big.txt"]
+
+    def test_download_file(self, fake_repository, github_repository):
+        "Test that the downloaded files are removed when the repository is closed"
+        fake_repository.trees = {"HEAD": {".rnotes/grammar.py": "grammar"}}
+        with github_repository() as repository:
+            path = repository.download_file(".rnotes/grammar.py")
+            assert path.read_text() == "grammar"
+        assert not path.parent.exists()
+        repository.close()
+
+
+class TestStore:
+    """Test the local store of the pull requests (coverage and incremental syncs)"""
+
+    def test_fetch_before_covered_from(self, fake_repository, github_repository):
+        "Test that a fetch before the covered date syncs the store again, and a fetch inside it doesn't"
+        fake_repository.pull_requests = [make_pull_request(number, f"2023-01-0{number}T10:00:00Z") for number in range(1, 6)]
+        store = PullRequestStore()
+        repository = github_repository(store=store)
+        pull_requests = repository.fetch_pull_requests(from_date=datetime(2023, 1, 3), to_date=datetime(2023, 1, 10))
+        assert [pull_request.number for pull_request in pull_requests] == [3, 4, 5]
+        assert store.covered_from == datetime(2023, 1, 3)
+        FakeGithub.requests = []
+        pull_requests = repository.fetch_pull_requests(from_date=datetime(2023, 1, 1), to_date=datetime(2023, 1, 10))
+        assert [pull_request.number for pull_request in pull_requests] == [1, 2, 3, 4, 5]
+        assert store.covered_from == datetime(2023, 1, 1)
+        assert get_requested_paths()
+        FakeGithub.requests = []
+        pull_requests = repository.fetch_pull_requests(from_date=datetime(2023, 1, 2), to_date=datetime(2023, 1, 4))
+        assert [pull_request.number for pull_request in pull_requests] == [2, 3]
+        assert not FakeGithub.requests
+
+    def test_resync(self, fake_repository, github_repository):
+        "Test that a resync fetches only the pull requests updated after `synced_until` (new and edited pull requests)"
+        fake_repository.pull_requests = [make_pull_request(number, f"2023-01-0{number}T10:00:00Z") for number in range(1, 6)]
+        store = PullRequestStore()
+        github_repository(store=store, per_page=2).fetch_pull_requests(from_date=datetime(2023, 1, 1))
+        assert store.synced_until == datetime(2023, 1, 5, 10)
+        fake_repository.get_pull_request(1).update(body="Edited body 1", updated_at="2023-02-01T10:00:00Z")
+        fake_repository.pull_requests.append(make_pull_request(6, "2023-01-06T10:00:00Z"))
+        FakeGithub.requests = []
+        pull_requests = github_repository(store=store, per_page=2).fetch_pull_requests(from_date=datetime(2023, 1, 1))
+        assert [pull_request.number for pull_request in pull_requests] == [1, 2, 3, 4, 5, 6]
+        assert pull_requests[0].comment == "Edited body 1"
+        assert store.synced_until == datetime(2023, 2, 1, 10)
+        assert len([path for path in get_requested_paths() if path.endswith("/pulls")]) == 2
+
+
+class TestCache:
+    """Test the cache of the responses"""
+
+    def test_not_modified(self, fake_repository, tmp_path):
+        "Test that conditional requests are sent, and that not modified responses are served from the cache"
+        with cached_connections(cache=ResponseCache(tmp_path)):
+            github = Github("token", base_url=FakeGithub.base_url)
+        assert github.get_repo(f"{OWNER}/{NAME}").full_name == github.get_repo(f"{OWNER}/{NAME}").full_name
+        assert "If-None-Match" not in FakeGithub.requests[0][3]
+        assert FakeGithub.requests[1][3]["If-None-Match"].startswith('"')
+
+    def test_scoped_connections(self, fake_repository, tmp_path):
+        "Test that only the GitHub instances that created under the context use the cache (also after the context)"
+        with cached_connections(cache=ResponseCache(tmp_path)):
+            cached_github = Github("token", base_url=FakeGithub.base_url)
+        github = Github("token", base_url=FakeGithub.base_url)
+        for client in (cached_github, github, cached_github, github):
+            client.get_repo(f"{OWNER}/{NAME}")
+        assert ["If-None-Match" in headers for _, _, _, headers, _ in FakeGithub.requests] == [False, False, True, False]
+
+    def test_threads(self, fake_repository, tmp_path):
+        "Test that a GitHub instance that created under the context can be used from many threads (after the context)"
+        fake_repository.pull_requests = [make_pull_request(number, "2023-01-01T10:00:00Z") for number in range(1, 33)]
+        with cached_connections(cache=ResponseCache(tmp_path)):
+            repository = Github("token", base_url=FakeGithub.base_url).get_repo(f"{OWNER}/{NAME}")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            titles = list(executor.map(lambda number: repository.get_pull(number).title, range(1, 33)))
+        assert titles == [f"PR {number}" for number in range(1, 33)]
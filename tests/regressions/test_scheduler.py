@@ -0,0 +1,198 @@
+"""Test the requests to GitHub (scheduler and cache), against a local fake GitHub server"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from github import Github
+from github.Requester import Requester
+
+sys.path.insert(0, ".")
+from rnotes.query import ResponseCache, cached_connections
+from rnotes.scheduler import RateLimitBudget, RequestScheduler
+from rnotes.transport import GithubClient
+
+
+class FakeGithub(BaseHTTPRequestHandler):
+    """Fake GitHub server, that serves the responses in `responses` by their order (the last one is repeated, and bodies
+    of bytes are served as is), after `delay` seconds (the maximal number of requests in flight is kept in `max_active`)"""
+
+    responses = []
+    requests = []
+    delay = 0.0
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        "Silent log"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        "Serve the next response"
+        with FakeGithub.lock:
+            FakeGithub.requests.append(dict(self.headers))
+            status, headers, body = FakeGithub.responses[min(len(FakeGithub.requests), len(FakeGithub.responses)) - 1]
+            FakeGithub.active += 1
+            FakeGithub.max_active = max(FakeGithub.max_active, FakeGithub.active)
+        time.sleep(FakeGithub.delay)
+        with FakeGithub.lock:
+            FakeGithub.active -= 1
+        data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+USER = {"login": "octocat", "id": 1, "url": "/users/octocat"}
+
+
+@pytest.fixture(name="github")
+def fixture_github():
+    "Run the fake GitHub server, and returns a Github instance (or a GithubClient) that connected to it"
+    FakeGithub.requests, FakeGithub.delay, FakeGithub.max_active = [], 0.0, 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGithub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield lambda transport=False, **kwargs: (GithubClient if transport else Github)(
+        "token", base_url=f"http://127.0.0.1:{server.server_port}", **kwargs
+    )
+    server.shutdown()
+    Requester.resetConnectionClasses()
+
+
+class TestScheduler:
+    """Test the scheduler of the requests"""
+
+    def test_secondary_rate_limit(self, github):
+        "Test that a request that throttled by a secondary rate limit, is retried after the requested time"
+        FakeGithub.responses = [
+            (403, {"Retry-After": "1"}, {"message": "You have exceeded a secondary rate limit."}),
+            (200, {}, USER),
+        ]
+        with cached_connections(scheduler=RequestScheduler()):
+            client = github()
+        start = time.monotonic()
+        assert client.get_user("octocat").login == "octocat"
+        assert len(FakeGithub.requests) == 2
+        assert time.monotonic() - start >= 1
+
+    def test_exhausted_budget(self, github):
+        "Test that requests wait for the reset of the rate limit, when the budget is exhausted"
+        reset = str(int(time.time()) + 2)
+        FakeGithub.responses = [
+            (200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": reset}, USER),
+        ]
+        scheduler = RequestScheduler()
+        with cached_connections(scheduler=scheduler):
+            client = github()
+        client.get_user("octocat")
+        assert scheduler.budget.get("core")[0] == 0
+        start = time.monotonic()
+        client.get_user("octocat")
+        assert time.monotonic() - start >= 1
+
+    def test_adaptive_concurrency(self):
+        "Test that the concurrency increases on fast requests, and decreases on slow or throttled requests"
+        scheduler = RequestScheduler(initial_concurrency=2, target_latency=0.05, backoff=0.01)
+
+        def response(status, delay=0.0):
+            def send():
+                time.sleep(delay)
+                result = requests.Response()
+                result.status_code = status
+                result._content = b"{}"  # pylint: disable=protected-access
+                return result
+
+            return send
+
+        for _ in range(20):
+            scheduler.execute("/users/octocat", response(200))
+        assert scheduler.concurrency > 2
+        increased = scheduler.concurrency
+        scheduler.execute("/users/octocat", response(200, delay=0.1))
+        assert scheduler.concurrency < increased
+        decreased = scheduler.concurrency
+        scheduler.execute("/users/octocat", response(429))
+        assert scheduler.concurrency < decreased
+
+    def test_concurrent_updates(self):
+        "Test that concurrent updates of the concurrency are not lost (the same as the serial updates)"
+        serial, concurrent = (RequestScheduler(initial_concurrency=2, max_concurrency=10**6) for _ in range(2))
+        for _ in range(8 * 50):
+            serial.on_response("core", latency=0.0)
+
+        def update():
+            for _ in range(50):
+                concurrent.on_response("core", latency=0.0)
+
+        threads = [threading.Thread(target=update) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert concurrent._limit == serial._limit  # pylint: disable=protected-access
+
+    def test_budget_reserve(self):
+        "Test that the budget is reserved per request, until it is exhausted"
+        budget = RateLimitBudget()
+        budget.update("core", {"x-ratelimit-remaining": "2", "x-ratelimit-limit": "5000", "x-ratelimit-reset": str(time.time() + 60)})
+        assert budget.reserve("core") == 0
+        assert budget.reserve("core") == 0
+        assert budget.reserve("core") > 0
+        assert budget.reserve("search") == 0
+
+
+class TestTransport:
+    """Test the asyncio transport"""
+
+    def test_concurrent_requests(self, github):
+        "Test that many requests are sent concurrently (and throttled requests are retried), in the order of the requests"
+        FakeGithub.responses = [(429, {"Retry-After": "0"}, {}), (200, {}, USER)]
+        client = github(transport=True)
+        try:
+            users = client.get_many([f"/users/octocat{index}" for index in range(20)])
+        finally:
+            client.close()
+        assert [user["login"] for user in users] == ["octocat"] * 20
+        assert len(FakeGithub.requests) == 21
+
+    def test_scheduler_concurrency(self, github):
+        "Test that the requests in flight are bounded by the concurrency of the scheduler, which their responses update"
+        FakeGithub.responses, FakeGithub.delay = [(200, {}, USER)], 0.05
+        scheduler = RequestScheduler(initial_concurrency=2, max_concurrency=4, target_latency=1.0)
+        client = github(transport=True, scheduler=scheduler)
+        try:
+            client.get_many([f"/users/octocat{index}" for index in range(40)])
+            assert 2 <= FakeGithub.max_active <= 4 and scheduler.concurrency == 4
+            FakeGithub.requests, FakeGithub.responses = [], [(429, {"Retry-After": "0"}, {}), (200, {}, USER)]
+            client.get_json("/users/octocat")
+        finally:
+            client.close()
+        assert scheduler.concurrency < 4
+
+    def test_not_modified(self, github, tmp_path):
+        "Test that the not modified responses of the transport are served from the cache"
+        FakeGithub.responses = [(200, {"ETag": '"v1"'}, USER), (304, {"ETag": '"v1"'}, None)]
+        client = github(transport=True, cache=ResponseCache(tmp_path))
+        try:
+            assert client.get_json("/users/octocat") == client.get_json("/users/octocat") == USER
+        finally:
+            client.close()
+        assert FakeGithub.requests[1]["If-None-Match"] == '"v1"'
+
+    def test_raw(self, github, tmp_path):
+        "Test that the raw content is returned as is (not decoded), also when it is served from the cache"
+        content = b"\x89PNG\r\n\x1a\n\xff\x00"
+        FakeGithub.responses = [(200, {"ETag": '"v1"'}, content), (304, {"ETag": '"v1"'}, None)]
+        client = github(transport=True, cache=ResponseCache(tmp_path))
+        try:
+            assert client.get_raw("/repos/octocat/tool/contents/logo.png") == content
+            assert client.get_raw("/repos/octocat/tool/contents/logo.png") == content
+        finally:
+            client.close()
+        client.close()
+        assert FakeGithub.requests[1]["If-None-Match"] == '"v1"'
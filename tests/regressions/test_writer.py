@@ -0,0 +1,79 @@
+"""Test the writer of the release notes"""
+import sys
+from pathlib import Path
+from unittest import mock
+import markdown
+from jinja2 import Environment
+
+sys.path.insert(0, ".")
+from rnotes.process import Issue, ReleaseData
+from rnotes.utils import iter_markdown_sections, to_html
+from rnotes.writer import ReleaseNotesWriter, _get_environment, compile_templates, load_template
+
+TEMPLATE_PATH = Path("./tests/collaterals/release_notes.j2")
+
+
+class TestTemplates:
+    """Test the loading of the templates (shared environment, bytecode cache and precompiled templates)"""
+
+    def test_bytecode_cache(self, tmp_path, monkeypatch):
+        "Test that the template is compiled once in the process, and that the compiled template is cached on the disk"
+        monkeypatch.setenv("RNOTES_CACHE_DIR", str(tmp_path))
+        _get_environment.cache_clear()
+        template = load_template(TEMPLATE_PATH, use_cache=True)
+        assert load_template(TEMPLATE_PATH, use_cache=True) is template
+        _get_environment.cache_clear()
+        with mock.patch.object(Environment, "compile", side_effect=AssertionError("compiled again")):
+            cached_template = load_template(TEMPLATE_PATH, use_cache=True)
+        assert cached_template is not template
+        content = dict(topics=[], highlights=[], type_to_issue={}, len=len, version_name="v1", name_to_url={}, contacts=[])
+        assert cached_template.render(**content) == template.render(**content)
+
+    def test_compiled_templates(self, tmp_path):
+        "Test that a precompiled template renders the same as the template"
+        compiled_path = compile_templates(TEMPLATE_PATH.parent, tmp_path / "templates.zip")
+        template = load_template(TEMPLATE_PATH)
+        compiled_template = load_template(TEMPLATE_PATH, compiled_path=compiled_path)
+        content = dict(topics=[], highlights=[], type_to_issue={}, len=len, version_name="v1", name_to_url={}, contacts=[])
+        assert compiled_template.render(**content) == template.render(**content)
+
+
+class TestStreamWriter:
+    """Test the writing of the release notes while the template is rendered"""
+
+    def test_same_as_write(self, tmp_path):
+        "Test that the streamed release notes file and HTML file are the same as the rendered files"
+        issues = [
+            Issue(
+                description=f"Description {number}",
+                ticket_number=str(number),
+                ticket_url=f"https://hsd/#/{number}",
+                ticket_title=f"Title {number}",
+                highlight=number % 3 == 0,
+                topic=f"Topic {number % 4}",
+                type="Bug",
+                image="",
+            )
+            for number in range(100)
+        ]
+        release_data = ReleaseData(issues)
+        additional_content = dict(tool_name="tool", version_name="v1", name_to_url={"Docs": "https://docs"}, contacts=[])
+        writer = ReleaseNotesWriter(template=load_template(TEMPLATE_PATH))
+        writer.write(tmp_path / "rendered", "release_notes.md", release_data, dict(additional_content))
+        html_path = writer.write_stream(tmp_path / "streamed", "release_notes.md", release_data, dict(additional_content))
+        assert (tmp_path / "streamed" / "release_notes.md").read_text() == (tmp_path / "rendered" / "release_notes.md").read_text()
+        assert html_path.read_text() == to_html(tmp_path / "rendered" / "release_notes.md").read_text()
+
+    def test_sections(self):
+        "Test that the sections are split only before the headings that start a new block (not in lists or raw HTML)"
+        texts = [
+            "* a\n\n    para\n# H\n## H2\n",
+            "<div>\n\n# H\n</div>\n\n# H2\n",
+            "<!-- a\n\n# H\n-->\n# H2\n",
+            "# H\n## H2\n\ntext\n\n### T\n",
+        ]
+        sections = [list(iter_markdown_sections([text[:5], text[5:]])) for text in texts]
+        assert [len(text_sections) for text_sections in sections] == [1, 1, 1, 3]
+        for text, text_sections in zip(texts, sections):
+            html_sections = (markdown.markdown(section) for section in text_sections)
+            assert "\n".join(html for html in html_sections if html) == markdown.markdown(text)